@@ -11,11 +11,28 @@ if __PKG_SETUP__:
 else:
 	from . import alg
 	from . import bench
-	from . import distutils
-	from . import plotter
 
 	__all__ = []
 	__all__.extend(['alg'])
 	__all__.extend(['bench'])
 	__all__.extend(['distutils'])
 	__all__.extend(['plotter'])
+	__all__.extend(['serve'])
+
+	# These submodules are not required for evaluation, and they depend on
+	# modules which take a long time to be imported (`distutils`,
+	# `matplotlib`, `multiprocessing`). So that they are loaded on first
+	# access.
+	_LAZY_SUBMODULES = ['distutils', 'plotter', 'serve']
+
+	if sys.version_info >= (3, 7):
+		def __getattr__(name):
+			if name in _LAZY_SUBMODULES:
+				import importlib
+				return importlib.import_module('.' + name, __name__)
+			raise AttributeError(
+				'module {0!r} has no attribute {1!r}'.format(__name__, name))
+	else:
+		from . import distutils
+		from . import plotter
+		from . import serve
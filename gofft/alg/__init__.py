@@ -1,5 +1,11 @@
 from . import dsp
 from .dsp import *
+from . import chunked
+from .chunked import *
+from . import instrument
+from .instrument import *
 
 __all__ = []
 __all__.extend(dsp.__all__)
+__all__.extend(chunked.__all__)
+__all__.extend(instrument.__all__)
@@ -1,9 +1,56 @@
 import os
 import sys
 import numpy as np
-from gofft.alg import (goertzel, goertzel_m, goertzel_st, goertzel_st_m, 
-                       fft_eval, stfft_eval)
-from gofft.bench import BenchmarkCase
+from gofft.alg import (goertzel, goertzel_m, goertzel_m_ragged,
+                       goertzel_harmonics, goertzel_st, goertzel_st_m,
+                       goertzel_st_mw, goertzel_st_detect,
+                       goertzel_st_m_partial, finalize_partial, fft_eval,
+                       stfft_eval)
+from gofft.bench import (BenchmarkCase, StreamingBenchmarkCase, cached_signal,
+                         multitone, dtmf, noise, DTMF_FREQS)
+
+
+def _load_data():
+    """
+    Synthetic signal (1 minute sampled at 1 kHz) with a slow baseline,
+    power-line interference and noise. It is generated once and cached in
+    `bench_data/`.
+    """
+    return cached_signal('bench_dsp', multitone, n=60000, fs=1000,
+                         freqs=[1.2, 50, 60, 70, 180],
+                         amps=[1, .2, .2, .1, .05],
+                         noise_level=0.05, seed=0)
+
+
+def _sparse_audio(n_repeats, fs, noise_level, seed):
+    """
+    DTMF keys (40 ms tones followed by 360 ms pauses, i.e. 90% silence) with
+    a low noise floor.
+    """
+    sig = np.tile(dtmf('0123456789*#ABCD', fs=fs, tone_duration=0.04,
+                       pause_duration=0.36), n_repeats)
+    return sig + noise_level*noise(len(sig), seed=seed)
+
+
+def _work_goertzel(n, n_bins, passes=1, itemsize=8):
+    """
+    Op-count model of Goertzel algorithm: 1 multiplication and 2 additions
+    per sample per bin. Data is read once per pass, kernels read a float64
+    copy of input regardless of its dtype.
+    """
+    return {'bins': n_bins, 'flops': 3*n*n_bins, 'bytes': passes*n*itemsize}
+
+
+def _work_fft(n, n_bins, width=None, itemsize=8):
+    """
+    Op-count model of FFT (`5 N log2(N)` for each block of width `N`). Data
+    is read once and a complex spectrum (16 bytes per sample) is written.
+    """
+    width = n if width is None else width
+    n_blocks = n // width if width > 0 else 0
+    flops = 5*width*np.log2(width)*n_blocks if width > 1 else 0
+    return {'bins': n_bins, 'flops': flops,
+            'bytes': n_blocks*width*(itemsize + 16)}
 
 
 class BenchDSP(BenchmarkCase):    
@@ -15,7 +62,7 @@ class BenchDSP(BenchmarkCase):
         """
         self.enable_logging = True
         self.step = 100
-        self.rd = 3
+        self.rd = 5
 
         self.fs = 1000
         self.ft = np.array([50, 60, 70])
@@ -23,9 +70,7 @@ class BenchDSP(BenchmarkCase):
 
     @classmethod
     def set_up_class(cls):
-        dir_data = os.path.join(os.getcwd(), 'data')
-        fn = os.path.join(dir_data, 'rawecg.csv')
-        cls.data = np.loadtxt(fn, delimiter=',')
+        cls.data = _load_data()
 
     def time_goertzel(self, data):
         for f in self.ft:
@@ -39,10 +84,475 @@ class BenchDSP(BenchmarkCase):
             goertzel_st(data, self.fs, f, self.width)
 
     def time_goertzel_st_m(self, data):
-        goertzel_st_m(data, self.fs, self.ft, self.width)
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='loop')
+
+    def time_goertzel_st_m_gemm(self, data):
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='gemm')
 
     def time_fft_eval(self, data):
         fft_eval(data, self.fs, self.ft)
 
     def time_stfft_eval(self, data):
         stfft_eval(data, self.fs, self.ft, self.width)
+
+    def work_goertzel(self, n):
+        return _work_goertzel(n, len(self.ft), passes=len(self.ft))
+
+    def work_goertzel_m(self, n):
+        return _work_goertzel(n, len(self.ft))
+
+    def work_goertzel_st(self, n):
+        return _work_goertzel(n, len(self.ft), passes=len(self.ft))
+
+    def work_goertzel_st_m(self, n):
+        return _work_goertzel(n, len(self.ft))
+
+    def work_goertzel_st_m_gemm(self, n):
+        # A multiply-add per sample per cos/sin column of basis
+        work = _work_goertzel(n, len(self.ft))
+        work['flops'] = 4*n*len(self.ft)
+        return work
+
+    def work_fft_eval(self, n):
+        return _work_fft(n, len(self.ft))
+
+    def work_stfft_eval(self, n):
+        return _work_fft(n, len(self.ft), width=self.width)
+
+
+class BenchGoertzelEngine(BenchmarkCase):
+    def set_up(self):
+        """
+        NOTE
+        ----
+        Lots of target frequencies are evaluated at once to compare the
+        per-frequency loop with the tiled engine of `goertzel_m`.
+        """
+        self.enable_logging = True
+        self.step = 20
+        self.rd = 3
+
+        self.fs = 1000
+        self.ft = np.arange(10, 490, 2)
+        self.width = self.fs
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = _load_data()
+
+    def time_goertzel_m_loop(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width, engine='loop')
+
+    def time_goertzel_m_tiled(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width, engine='tiled')
+
+    def work_goertzel_m_loop(self, n):
+        # Data is read once per target frequency by the loop engine
+        return _work_goertzel(n, len(self.ft), passes=len(self.ft))
+
+    def work_goertzel_m_tiled(self, n):
+        # ... but only once by the tiled engine (a tile stays in cache while
+        # all frequencies are evaluated)
+        return _work_goertzel(n, len(self.ft))
+
+
+class BenchSpectrogram(BenchmarkCase):
+    def set_up(self):
+        """
+        NOTE
+        ----
+        Lots of target frequencies are evaluated over lots of short blocks,
+        to compare engines of `goertzel_st_m` with `stfft_eval`.
+        """
+        self.enable_logging = True
+        self.step = 20
+        self.rd = 3
+
+        self.fs = 1000
+        self.ft = np.arange(10, 490, 2)
+        self.width = 250
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = _load_data()
+
+    def time_goertzel_st_m_loop(self, data):
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='loop')
+
+    def time_goertzel_st_m_tiled(self, data):
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='tiled')
+
+    def time_goertzel_st_m_gemm(self, data):
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='gemm')
+
+    def time_stfft_eval(self, data):
+        stfft_eval(data, self.fs, self.ft, self.width)
+
+    def work_goertzel_st_m_loop(self, n):
+        return _work_goertzel(n, len(self.ft), passes=len(self.ft))
+
+    def work_goertzel_st_m_tiled(self, n):
+        return _work_goertzel(n, len(self.ft))
+
+    def work_goertzel_st_m_gemm(self, n):
+        # A multiply-add per sample per cos/sin column of basis
+        work = _work_goertzel(n, len(self.ft))
+        work['flops'] = 4*n*len(self.ft)
+        return work
+
+    def work_stfft_eval(self, n):
+        return _work_fft(n, len(self.ft), width=self.width)
+
+
+class BenchMultiWidth(BenchmarkCase):
+    def set_up(self):
+        """
+        NOTE
+        ----
+        Target frequencies are evaluated at several block widths, either in
+        a single pass by `goertzel_st_mw` or by a `goertzel_st_m` call per
+        width.
+        """
+        self.enable_logging = True
+        self.step = 20
+        self.rd = 3
+
+        self.fs = 1000
+        self.ft = np.arange(10, 490, 16)
+        self.widths = [250, 500, 1000, 2000]
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = _load_data()
+
+    def time_goertzel_st_mw(self, data):
+        goertzel_st_mw(data, self.fs, self.ft, self.widths)
+
+    def time_goertzel_st_m_per_width_loop(self, data):
+        for width in self.widths:
+            goertzel_st_m(data, self.fs, self.ft, width, engine='loop')
+
+    def time_goertzel_st_m_per_width_auto(self, data):
+        for width in self.widths:
+            goertzel_st_m(data, self.fs, self.ft, width)
+
+    def work_goertzel_st_mw(self, n):
+        work = _work_goertzel(n, len(self.ft)*len(self.widths))
+        work['bins'] = len(self.ft)*len(self.widths)
+        return work
+
+    def work_goertzel_st_m_per_width_loop(self, n):
+        n_bins = len(self.ft)*len(self.widths)
+        return _work_goertzel(n, n_bins, passes=n_bins)
+
+    def work_goertzel_st_m_per_width_auto(self, n):
+        return _work_goertzel(n, len(self.ft)*len(self.widths),
+                              passes=len(self.widths))
+
+
+class BenchHarmonics(BenchmarkCase):
+    def set_up(self):
+        """
+        NOTE
+        ----
+        The fundamental of power line (50 Hz) and its first 50 harmonics are
+        evaluated over windows of 10 cycles, as IEC 61000-4-7.
+        """
+        self.enable_logging = True
+        self.step = 20
+        self.rd = 3
+
+        self.fs = 10240
+        self.f0 = 50.0
+        self.n_harmonics = 51
+        self.ft = self.f0*np.arange(1, self.n_harmonics + 1)
+        self.width = 2048
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = cached_signal('bench_harmonics', multitone, n=1024000,
+                                 fs=10240, freqs=50.0*np.arange(1, 52),
+                                 amps=1.0/np.arange(1, 52)**2,
+                                 noise_level=0.01, seed=0)
+
+    def time_goertzel_harmonics(self, data):
+        goertzel_harmonics(data, self.fs, self.f0, self.n_harmonics,
+                           self.width)
+
+    def time_goertzel_m_loop(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width, engine='loop')
+
+    def time_goertzel_m_tiled(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width, engine='tiled')
+
+    def work_goertzel_harmonics(self, n):
+        return _work_goertzel(n, self.n_harmonics)
+
+    def work_goertzel_m_loop(self, n):
+        return _work_goertzel(n, self.n_harmonics, passes=self.n_harmonics)
+
+    def work_goertzel_m_tiled(self, n):
+        return _work_goertzel(n, self.n_harmonics)
+
+
+class BenchComplex(BenchmarkCase):
+    def set_up(self):
+        """
+        NOTE
+        ----
+        IQ samples are evaluated either directly by the complex kernel, or by
+        splitting them into real and imaginary parts (two passes). Positive
+        and negative frequencies are distinguished only in the former.
+        """
+        self.enable_logging = True
+        self.step = 100
+        self.rd = 5
+
+        self.fs = 1000
+        self.ft = np.array([-60, 50, 60, 70])
+        self.width = self.fs
+
+    @classmethod
+    def set_up_class(cls):
+        # Baseband signal shifted by -100 Hz
+        data = np.asarray(_load_data())
+        cls.data = data*np.exp(-2j*np.pi*100*np.arange(len(data))/1000)
+
+    def time_goertzel_m(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width)
+
+    def time_goertzel_m_split(self, data):
+        goertzel_m(data.real, self.fs, self.ft, self.width)
+        goertzel_m(data.imag, self.fs, self.ft, self.width)
+
+    def work_goertzel_m(self, n):
+        # Real and imaginary parts are 2 recurrences over 2 doubles
+        return _work_goertzel(2*n, len(self.ft), passes=len(self.ft))
+
+    def work_goertzel_m_split(self, n):
+        return _work_goertzel(2*n, len(self.ft), passes=len(self.ft))
+
+
+class BenchRagged(BenchmarkCase):
+    def set_up(self):
+        """
+        NOTE
+        ----
+        Lots of clips of 1 ~ 3 seconds are evaluated, either by a Python loop
+        over `goertzel_m` or a single call of `goertzel_m_ragged`.
+        """
+        self.enable_logging = True
+        self.step = 10
+        self.rd = 3
+
+        self.fs = 1000
+        self.ft = np.array([50, 60, 70])
+        rng = np.random.RandomState(0)
+        lengths = rng.randint(self.fs, 3*self.fs, len(self.data)//self.fs)
+        self.bounds = np.concatenate([[0], np.cumsum(lengths)])
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = cached_signal('bench_ragged', multitone, n=2000000,
+                                 fs=1000, freqs=[50, 60, 70],
+                                 noise_level=0.05, seed=0)
+
+    def _offsets(self, data):
+        return self.bounds[:np.searchsorted(self.bounds, len(data), 'right')]
+
+    def time_goertzel_m_loop(self, data):
+        offsets = self._offsets(data)
+        for st, ed in zip(offsets[:-1], offsets[1:]):
+            goertzel_m(data[st:ed], self.fs, self.ft, ed - st)
+
+    def time_goertzel_m_ragged(self, data):
+        goertzel_m_ragged(data, self._offsets(data), self.fs, self.ft)
+
+    def work_goertzel_m_loop(self, n):
+        return _work_goertzel(n, len(self.ft), passes=len(self.ft))
+
+    def work_goertzel_m_ragged(self, n):
+        return _work_goertzel(n, len(self.ft), passes=len(self.ft))
+
+
+class BenchSparseAudio(BenchmarkCase):
+    def set_up(self):
+        """
+        NOTE
+        ----
+        DTMF frequencies are evaluated over mostly silent audio, to compare
+        `goertzel_st_m` with and without the energy gate, and detection with
+        and without early exit.
+        """
+        self.enable_logging = True
+        self.step = 10
+        self.rd = 3
+
+        self.fs = 8000
+        self.ft = np.unique(np.ravel(list(DTMF_FREQS.values())))
+        self.width = 205
+        self.gate = 1e-2
+        self.threshold = 0.05
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = cached_signal('bench_sparse', _sparse_audio, n_repeats=8,
+                                 fs=8000, noise_level=1e-3, seed=0)
+
+    def time_goertzel_st_m(self, data):
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='loop')
+
+    def time_goertzel_st_m_gated(self, data):
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='loop',
+                      gate=self.gate)
+
+    def time_goertzel_st_detect_full(self, data):
+        goertzel_st_detect(data, self.fs, self.ft, self.width,
+                           self.threshold, early_exit=False)
+
+    def time_goertzel_st_detect(self, data):
+        goertzel_st_detect(data, self.fs, self.ft, self.width,
+                           self.threshold)
+
+
+class BenchDSPGrid(BenchmarkCase):
+    # Each combination of parameters is run as a separated case, results are
+    # also collected into `bench_log/tidy/BenchDSPGrid.csv`. There is no
+    # axis of dtype, since all functions evaluate a float64 copy of input.
+    param_grid = {
+        'n_targets': [3, 30, 300],
+        'width': [250, 1000],
+    }
+
+    def set_up(self):
+        self.enable_logging = True
+        self.step = 10
+        self.rd = 3
+
+        self.fs = 1000
+        self.width = self.params['width']
+        self.ft = np.linspace(10, 490, self.params['n_targets'])
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = _load_data()
+
+    def time_goertzel_m(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width)
+
+    def time_goertzel_st_m(self, data):
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='loop')
+
+    def time_goertzel_st_m_gemm(self, data):
+        goertzel_st_m(data, self.fs, self.ft, self.width, engine='gemm')
+
+    def time_fft_eval(self, data):
+        fft_eval(data, self.fs, self.ft)
+
+    def work_goertzel_m(self, n):
+        return _work_goertzel(n, len(self.ft))
+
+    def work_goertzel_st_m(self, n):
+        return _work_goertzel(n, len(self.ft))
+
+    def work_goertzel_st_m_gemm(self, n):
+        work = _work_goertzel(n, len(self.ft))
+        work['flops'] = 4*n*len(self.ft)
+        return work
+
+    def work_fft_eval(self, n):
+        return _work_fft(n, len(self.ft))
+
+
+class BenchDecimate(BenchmarkCase):
+    # Cost of the anti-aliasing filter is paid off only when there are enough
+    # target frequencies, results are collected into
+    # `bench_log/tidy/BenchDecimate.csv`.
+    param_grid = {'n_targets': [1, 4, 16, 64]}
+
+    def set_up(self):
+        """
+        NOTE
+        ----
+        Targets are far below `fs`, so that 'auto' could decimate by 10.
+        """
+        self.enable_logging = True
+        self.step = 10
+        self.rd = 3
+
+        self.fs = 1000
+        self.width = self.fs
+        self.ft = np.linspace(5, 25, self.params['n_targets'])
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = _load_data()
+
+    def time_goertzel_m(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width)
+
+    def time_goertzel_m_decimate_auto(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width, decimate='auto')
+
+    def time_goertzel_m_decimate_2(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width, decimate=2)
+
+    def time_goertzel_m_decimate_10(self, data):
+        goertzel_m(data, self.fs, self.ft, self.width, decimate=10)
+
+
+class BenchGoertzelStream(StreamingBenchmarkCase):
+    def set_up(self):
+        """
+        NOTE
+        ----
+        Data is fed in chunks, and target frequencies are evaluated over
+        blocks (or a sliding window) of `width` samples. In block mode,
+        complete blocks within a chunk are evaluated at once, and samples of
+        a block straddling chunks are carried in the partial state until
+        the block is complete.
+        """
+        self.enable_logging = True
+        self.chunk_sizes = [10, 50, 250, 1000]
+        self.rd = 3
+
+        self.fs = 1000
+        self.ft = np.array([50, 60, 70])
+        self.width = self.fs
+
+    @classmethod
+    def set_up_class(cls):
+        cls.data = _load_data()
+
+    def reset_stream(self):
+        self.buf = np.zeros(self.width)
+        self.state = goertzel_st_m_partial(self.buf[:0], self.fs, self.ft,
+                                           self.width)
+        self.mag = None
+
+    def time_goertzel_st_m_partial(self, chunk):
+        # Result is finalized at block boundaries, then only samples of the
+        # incomplete block are carried over to the next chunk
+        partial = self.state.merge(goertzel_st_m_partial(
+            chunk, self.fs, self.ft, self.width, start=self.state.stop))
+        if partial.count > 0:
+            self.mag = finalize_partial(partial)
+        tail = partial.tail
+        self.state = goertzel_st_m_partial(tail, self.fs, self.ft,
+                                           self.width,
+                                           start=partial.stop - len(tail))
+
+    def time_goertzel_m_sliding(self, chunk):
+        # Window of the latest `width` samples is evaluated for each chunk
+        n = min(len(chunk), self.width)
+        self.buf[:self.width-n] = self.buf[n:]
+        self.buf[self.width-n:] = chunk[-n:]
+        self.mag = goertzel_m(self.buf, self.fs, self.ft, self.width)
+
+    def work_goertzel_st_m_partial(self, n):
+        # Each sample is evaluated once, i.e. work of blocks is amortized
+        # over chunks
+        return _work_goertzel(n, len(self.ft))
+
+    def work_goertzel_m_sliding(self, n):
+        return _work_goertzel(self.width, len(self.ft))
@@ -0,0 +1,250 @@
+from __future__ import absolute_import, division
+
+from functools import reduce
+import numpy as np
+from .dsp import (GOERTZEL_ST_M_ENGINES, _as_input, _goertzel_m,
+                  _goertzel_st_m_blocks, _select_st_m_engine)
+
+__all__ = ['GoertzelPartial', 'goertzel_st_m_partial', 'merge_partials',
+           'finalize_partial', 'goertzel_st_m_chunked']
+
+
+class GoertzelPartial(object):
+    """
+    Partial state of `goertzel_st_m` over a contiguous range
+    `[start, stop)` of a signal, e.g. a chunk of a zarr/HDF5/dask array.
+    Blocks are aligned to multiples of `width` of the whole signal.
+
+    States of adjacent ranges are merged by `merge()`, which is associative,
+    so that chunks can be evaluated in any order (e.g. in parallel) and
+    merged in any grouping.
+
+    Attributes
+    ----------
+    start, stop : int
+        Range of samples in the whole signal.
+    head : ndarray
+        Samples before the first block boundary, which belong to a block
+        starting in a previous range.
+    tail : ndarray
+        Samples after the last block boundary, which belong to a block
+        ending in a following range. Empty if `bounded` is False.
+    bounded : bool
+        Whether there is any block boundary within `[start, stop]`. If not,
+        all samples are kept in `head`.
+    mag_sum : ndarray
+        Sum of magnitudes of complete blocks.
+    count : int
+        Number of complete blocks.
+    """
+    def __init__(self, fs, ft, width, start, stop, head, tail, bounded,
+                 mag_sum, count):
+        self.fs = fs
+        self.ft = ft
+        self.width = width
+        self.start = start
+        self.stop = stop
+        self.head = head
+        self.tail = tail
+        self.bounded = bounded
+        self.mag_sum = mag_sum
+        self.count = count
+
+    def merge(self, other):
+        """
+        Merge with the state of the following range.
+
+        Returns
+        -------
+        merged : GoertzelPartial
+            State of `[self.start, other.stop)`.
+        """
+        if other.start != self.stop:
+            raise ValueError('Ranges are not adjacent: [{0}, {1}) and '
+                             '[{2}, {3}).'.format(self.start, self.stop,
+                                                  other.start, other.stop))
+        if (self.fs != other.fs or self.width != other.width or
+                not np.array_equal(self.ft, other.ft)):
+            raise ValueError('States of different parameters can not be '
+                             'merged.')
+
+        mag_sum = self.mag_sum + other.mag_sum
+        count = self.count + other.count
+        if not self.bounded:
+            head = _concat(self.head, other.head)
+            tail = other.tail
+        elif not other.bounded:
+            head = self.head
+            tail = _concat(self.tail, other.head)
+        else:
+            # Samples between the last boundary of `self` and the first one
+            # of `other` are either nothing or exactly a block
+            middle = _concat(self.tail, other.head)
+            if len(middle) == self.width:
+                mag_sum = mag_sum + _goertzel_m(middle, self.fs, self.ft,
+                                                self.width)
+                count += 1
+            head = self.head
+            tail = other.tail
+        return GoertzelPartial(self.fs, self.ft, self.width, self.start,
+                               other.stop, head, tail,
+                               self.bounded or other.bounded, mag_sum, count)
+
+
+def goertzel_st_m_partial(chunk, fs, ft, width, start=0, engine='auto',
+                          block_info=None):
+    """
+    Evaluate a chunk of signal by `goertzel_st_m`, only complete blocks
+    within the chunk are evaluated, and samples of blocks straddling edges
+    of the chunk are carried over to `merge_partials()`.
+
+    Parameters
+    ----------
+    chunk : ndarray
+        A chunk of signal (1-D).
+    fs : int
+        Sampling frequency.
+    ft : ndarray
+        Target frequency.
+    width : int
+        Width of filter. (related to frequency resolution)
+    start : int, optional
+        Offset of the chunk in the whole signal.
+    engine : str, optional
+        Engine for evaluation, see also `goertzel_st_m`.
+    block_info : dict, optional
+        Information of block given by `dask.array.map_blocks`, `start` is
+        taken from it if it's given.
+
+    Returns
+    -------
+    partial : GoertzelPartial
+    """
+    if engine not in GOERTZEL_ST_M_ENGINES:
+        raise ValueError('Invalid `engine`: {0}'.format(engine))
+    if width < 1:
+        raise ValueError('Width should be a positive integer.')
+    if block_info is not None:
+        start = block_info[0]['array-location'][0][0]
+
+    chunk = _as_input(np.asarray(chunk))
+    if chunk.ndim != 1:
+        raise ValueError('Only 1-D data is supported.')
+    ft = np.ascontiguousarray(np.atleast_1d(ft), dtype='float')
+    stop = start + len(chunk)
+
+    # Offsets of the first and the last block boundaries within the chunk
+    first = (-start) % width
+    if first > len(chunk):
+        return GoertzelPartial(fs, ft, width, start, stop, chunk.copy(),
+                               chunk[:0].copy(), False, np.zeros(ft.shape),
+                               0)
+    count = (len(chunk) - first)//width
+    last = first + count*width
+
+    mag_sum = np.zeros(ft.shape)
+    if count > 0:
+        if engine == 'auto':
+            engine = _select_st_m_engine(ft.size, count)
+        mean, _ = _goertzel_st_m_blocks(chunk[first:last], fs, ft, width,
+                                        engine=engine)
+        mag_sum = mean*count
+    # Carried samples are copied, so that states don't keep whole chunks
+    # (e.g. memory-mapped ones) alive.
+    return GoertzelPartial(fs, ft, width, start, stop, chunk[:first].copy(),
+                           chunk[last:].copy(), True, mag_sum, count)
+
+
+def merge_partials(partials):
+    """
+    Merge states of adjacent ranges (in order of the signal).
+
+    Returns
+    -------
+    merged : GoertzelPartial
+    """
+    partials = list(partials)
+    if len(partials) == 0:
+        raise ValueError('No state to be merged.')
+    return reduce(lambda a, b: a.merge(b), partials)
+
+
+def finalize_partial(partial, padding=False):
+    """
+    Get the result of `goertzel_st_m` from the state of the whole signal.
+
+    Parameters
+    ----------
+    partial : GoertzelPartial
+        State of the whole signal, i.e. merged states of all chunks.
+    padding : bool
+        Apply padding for this algorithm.
+
+    Returns
+    -------
+    val : ndarray
+        Same as `goertzel_st_m(data, fs, ft, width, padding)`.
+    """
+    if partial.start % partial.width != 0:
+        raise ValueError('State should start at a block boundary.')
+    mag_sum = partial.mag_sum
+    count = partial.count
+    # A state starting at a boundary is bounded, remaining samples of an
+    # incomplete block are kept in `tail`
+    rest = partial.tail
+    if padding and len(rest) > 0:
+        pdata = np.zeros(partial.width, dtype=rest.dtype)
+        pdata[:len(rest)] = rest
+        mag_sum = mag_sum + _goertzel_m(pdata, partial.fs, partial.ft,
+                                        partial.width)
+        count += 1
+    if count == 0:
+        raise ValueError(
+            'Size of Goertzel block(N) should be less than data length.')
+    return mag_sum/count
+
+
+def goertzel_st_m_chunked(chunks, fs, ft, width, padding=False,
+                          engine='auto', map_func=map):
+    """
+    Chunked version of `goertzel_st_m`, the signal is never materialized as
+    a whole.
+
+    Parameters
+    ----------
+    chunks : iterable of ndarray
+        Consecutive chunks of signal (1-D), e.g. slices of an HDF5 dataset.
+    map_func : callable, optional
+        Function to evaluate chunks, e.g. `map` of a process pool
+        (`multiprocessing.Pool.map` or `Executor.map`).
+
+    Returns
+    -------
+    val : ndarray
+        Same as `goertzel_st_m(np.concatenate(chunks), fs, ft, width,
+        padding)`.
+    """
+    tasks = _chunk_tasks(chunks, fs, ft, width, engine)
+    partial = merge_partials(map_func(_evaluate_task, tasks))
+    return finalize_partial(partial, padding)
+
+
+def _chunk_tasks(chunks, fs, ft, width, engine):
+    start = 0
+    for chunk in chunks:
+        yield (chunk, fs, ft, width, start, engine)
+        start += len(chunk)
+
+
+def _evaluate_task(task):
+    # Module-level function, so that it can be pickled by process pools
+    chunk, fs, ft, width, start, engine = task
+    return goertzel_st_m_partial(chunk, fs, ft, width, start, engine)
+
+
+def _concat(a, b):
+    if len(a) == 0:
+        return b
+    if len(b) == 0:
+        return a
+    return np.concatenate([a, b])
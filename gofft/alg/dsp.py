@@ -1,12 +1,52 @@
+import os
+from collections import OrderedDict
 import numpy as np
-from scipy.fftpack import fft as scipyfft
 from . import dsp_ext as cext
 
 
-__all__ = ['goertzel', 'goertzel_m', 'goertzel_st', 
-           'goertzel_st_m', 'fft_eval', 'stfft_eval']
-
-def goertzel(data, fs, ft, width, rng=None):
+__all__ = ['goertzel', 'goertzel_m', 'goertzel_m_ragged', 'pack_ragged',
+           'goertzel_harmonics', 'goertzel_st', 'goertzel_st_m',
+           'goertzel_st_mw', 'goertzel_st_detect', 'fft_eval', 'stfft_eval',
+           'Decimator']
+
+# Available engines for `goertzel_m`.
+# - loop: evaluate target frequencies one by one, data is re-read for each
+#   target frequency.
+# - tiled: evaluate all target frequencies tile by tile, data is read only
+#   once. It is faster when there are lots of target frequencies.
+GOERTZEL_M_ENGINES = {
+    'loop': cext.goertzel_m,
+    'tiled': cext.goertzel_m_tiled,
+}
+
+# Available engines for `goertzel_st_m`.
+# - loop, tiled: evaluate blocks one by one with the engine of `goertzel_m`.
+# - gemm: evaluate all blocks at once as a matrix multiplication (by BLAS) of
+#   blocks (n_blocks x width) and a cached cos/sin basis (width x 2K).
+# - auto: 'gemm' if there are at least `GEMM_MIN_BINS` target frequencies
+#   and `GEMM_MIN_BLOCKS` blocks, otherwise 'loop'. A few target frequencies
+#   are left to Goertzel algorithm, and a basis (width x 2K) is only built
+#   for enough blocks to amortize it.
+GOERTZEL_ST_M_ENGINES = ['auto', 'loop', 'tiled', 'gemm']
+GEMM_MIN_BINS = 16
+GEMM_MIN_BLOCKS = 8
+
+# Maximal number of bases cached by gemm engine, they are keyed by
+# `(fs, ft, width)`.
+GEMM_BASIS_CACHE_SIZE = 16
+
+# Minimal ratio of sampling frequency to the highest target frequency when
+# decimation factor is selected automatically.
+DECIMATION_OVERSAMPLING = 4
+# Cost of a tap of the anti-aliasing filter, relative to an iteration of
+# Goertzel algorithm (measured). Filter (`8*factor + 1` taps, evaluated for
+# every `factor`-th sample) costs about `8 * DECIMATION_TAP_COST` per input
+# sample, so 'auto' only decimates when there are enough target frequencies
+# to amortize it.
+DECIMATION_TAP_COST = 0.25
+
+
+def goertzel(data, fs, ft, width, rng=None, decimate=None):
     """
     Goertzel algorithm, an efficiency method to evaluate specific terms of a
     discrecte Fourier transform.
@@ -14,15 +54,21 @@ def goertzel(data, fs, ft, width, rng=None):
     Parameters
     ----------
     data : ndarray
-        Input signal.
+        Input signal, real or complex (e.g. IQ samples).
     fs : int
         Sampling frequency.
     ft : int
-        Target frequency.
+        Target frequency. For complex data, negative frequencies are
+        distinguished from positive ones.
     width : int
         Width of filter. (related to frequency resolution)
     rng : ndarray
-        Frequency range for evaluation.
+        Frequency range for evaluation. (real data only)
+    decimate : int or str, optional
+        Decimation factor applied before evaluation, `fs` and `width` should
+        be divisible by it. 'auto' selects a factor only if filtering is
+        cheaper than evaluating target frequencies at full rate (see
+        `goertzel_m`), which is never the case for a single one.
 
     Returns
     -------
@@ -44,59 +90,221 @@ def goertzel(data, fs, ft, width, rng=None):
         raise ValueError(
             'Size of Goertzel block(N) should be less than data length.')
 
-    if data.dtype != np.dtype('float'):
-        data = data.astype('float')
+    data = _as_input(data)
     ft = np.asfarray(ft)
+    # Filter gain of a range is compensated at its centre
+    data, fs, width, gain = _decimate(
+        data, fs, ft + (rng or 0)/2.0, width, decimate,
+        ft_max=np.max(np.abs(ft + (rng or 0))))
 
     try:
-        if rng:
+        if np.iscomplexobj(data):
+            if rng:
+                raise ValueError('`rng` is not supported for complex data.')
+            val = cext.goertzel_m_cplx(data, fs, np.atleast_1d(ft), width)[0]
+        elif rng:
             val = cext.goertzel_rng(data, fs, ft, width, rng)
         else:
             val = cext.goertzel(data, fs, ft, width)
     except:
         raise
 
+    if gain is not None:
+        val /= gain[0]
     return val
 
 
-def goertzel_m(data, fs, ft, width):
+def goertzel_m(data, fs, ft, width, engine='loop', decimate=None, axis=-1):
     """
     Modified Goertzel algorithm. This method evaluate all `ft` at once.
 
     Parameters
     ----------
     data : ndarray
-        Input signal.
+        Input signal, real or complex (e.g. IQ samples).
     fs : int
         Sampling frequency.
     ft : ndarray
-        Target frequency.
+        Target frequency. For complex data, negative frequencies are
+        distinguished from positive ones.
     width : int
         Width of filter. (related to frequency resolution)
+    engine : str, optional
+        Engine for evaluation, available engines: ['loop', 'tiled'].
+        'tiled' is preferred when there are hundreds of target frequencies.
+        Complex data is always evaluated by a dedicated kernel.
+    decimate : int or str, optional
+        Decimation factor applied before evaluation, `fs` and `width` should
+        be divisible by it. If 'auto', the largest factor that keeps
+        `fs / factor >= 4 * max(ft)` is selected, but only if filtering is
+        estimated to be cheaper than evaluating the target frequencies at
+        full rate (i.e. a few target frequencies are evaluated at once).
+    axis : int, optional
+        Axis of `data` along which the evaluation is performed. Shape of
+        output is the same as `data`, except along `axis` where the length
+        is the number of target frequencies.
 
     Returns
     -------
     mag : ndarray
         Magnitude of a single DFT term corresponding to target frequency.
     """
-    if fs > len(data):
+    if engine not in GOERTZEL_M_ENGINES:
+        raise ValueError('Invalid `engine`: {0}'.format(engine))
+
+    dlen = data.shape[axis]
+    if fs > dlen:
         raise ValueError(
-            'Data length is too short:{0}'.format(len(data)))
+            'Data length is too short:{0}'.format(dlen))
 
-    if width > len(data):
+    if width > dlen:
         raise ValueError(
             'Size of Goertzel block(N) should be less than data length.')
 
-    if data.dtype != np.dtype('float'):
-        data = np.asarray(data, dtype='float')
+    data = _as_input(data)
     ft = np.asfarray(ft)
+    data, fs, width, gain = _decimate(data, fs, ft, width, decimate, axis)
 
     try:
-        val = cext.goertzel_m(data, fs, ft, width)
+        val = _goertzel_m(data, fs, ft, width, engine, axis)
     except:
         raise
 
-    return val
+    return _compensate(val, gain, axis)
+
+
+def goertzel_m_ragged(data, offsets, fs, ft, width=None, engine='loop'):
+    """
+    Batched version of `goertzel_m` for lots of clips of different lengths,
+    which are evaluated by a single call into C without padding them. The
+    GIL is released while clips are evaluated.
+
+    Parameters
+    ----------
+    data : ndarray
+        Concatenated clips (1-D).
+    offsets : array_like of int
+        Offsets of clips in `data` (CSR-style), clip `i` is
+        `data[offsets[i]:offsets[i+1]]`. See also `pack_ragged()`.
+    fs : int
+        Sampling frequency.
+    ft : ndarray
+        Target frequency.
+    width : int, optional
+        Width of filter. (related to frequency resolution) Default: length
+        of each clip.
+    engine : str, optional
+        Engine for evaluation, available engines: ['loop', 'tiled'].
+
+    Returns
+    -------
+    mag : ndarray
+        Shape: `(len(offsets) - 1, len(ft))`. Row `i` is the same as
+        `goertzel_m(clip_i, fs, ft, width or len(clip_i))`, empty clips give
+        zeros.
+
+    Note
+    ----
+    Unlike `goertzel_m`, clips shorter than `fs` or `width` are accepted.
+    """
+    if engine not in GOERTZEL_M_ENGINES:
+        raise ValueError('Invalid `engine`: {0}'.format(engine))
+    if data.ndim != 1:
+        raise ValueError('Only 1-D data is supported.')
+    if width is not None and width < 1:
+        raise ValueError('Width should be a positive integer.')
+
+    offsets = np.ascontiguousarray(offsets, dtype='long')
+    if offsets.ndim != 1 or len(offsets) == 0:
+        raise ValueError('Offsets should be a non-empty 1-D array.')
+    data = _as_input(data, allow_complex=False)
+    ft = np.ascontiguousarray(np.atleast_1d(ft), dtype='float')
+
+    return cext.goertzel_m_ragged(data, offsets, fs, ft,
+                                  0 if width is None else int(width),
+                                  int(engine == 'tiled'))
+
+
+def goertzel_harmonics(data, fs, f0, n_harmonics, width):
+    """
+    Evaluate a fundamental frequency and its harmonics (e.g. for monitoring
+    power quality) within a single pass over data. Coefficients of all
+    harmonics are derived from the fundamental by Chebyshev recurrence, so
+    only a pair of `sin`/`cos` is computed.
+
+    Parameters
+    ----------
+    data : ndarray
+        Input signal (1-D).
+    fs : int
+        Sampling frequency.
+    f0 : float
+        Fundamental frequency.
+    n_harmonics : int
+        Number of evaluated harmonics, including the fundamental. e.g. 51 for
+        the fundamental and its first 50 harmonics.
+    width : int
+        Width of filter. (related to frequency resolution)
+
+    Returns
+    -------
+    mag : ndarray
+        Magnitudes of harmonics, `mag[h-1]` is the one of `h*f0`.
+    thd : float
+        Total harmonic distortion, `sqrt(sum(mag[1:]**2)) / mag[0]`. NaN if
+        magnitude of the fundamental is zero.
+
+    Note
+    ----
+    Bin of harmonic `h` is `h` times the bin of `f0`, which is the same as
+    `goertzel_m(data, fs, h*f0, width)` if `width` covers an integer number
+    of cycles of `f0` (e.g. 10 cycles as IEC 61000-4-7).
+    """
+    if data.ndim != 1:
+        raise ValueError('Only 1-D data is supported.')
+    if width > len(data):
+        raise ValueError(
+            'Size of Goertzel block(N) should be less than data length.')
+    if n_harmonics < 1:
+        raise ValueError('`n_harmonics` should be a positive integer.')
+    k = np.floor(0.5 + width*f0/float(fs))
+    if k < 1 or 2*n_harmonics*k >= width:
+        raise ValueError('Harmonics should be in (0, fs/2) at the frequency '
+                         'resolution of `width`.')
+
+    data = _as_input(data, allow_complex=False)
+    mag = cext.goertzel_harmonics(data, fs, float(f0), int(n_harmonics),
+                                  width)
+    if mag[0] > 0:
+        thd = np.sqrt(np.sum(mag[1:]**2))/mag[0]
+    else:
+        thd = float('nan')
+    return mag, thd
+
+
+def pack_ragged(clips):
+    """
+    Concatenate clips into the layout of `goertzel_m_ragged`.
+
+    Parameters
+    ----------
+    clips : list of ndarray
+        1-D clips.
+
+    Returns
+    -------
+    data : ndarray
+        Concatenated clips.
+    offsets : ndarray
+        Offsets of clips, its length is `len(clips) + 1`.
+    """
+    lengths = [len(c) for c in clips]
+    offsets = np.zeros(len(clips) + 1, dtype='long')
+    np.cumsum(lengths, out=offsets[1:])
+    if len(clips) == 0:
+        return np.zeros(0, dtype='float'), offsets
+    data = np.concatenate([np.asarray(c, dtype='float') for c in clips])
+    return data, offsets
 
 
 def goertzel_st(data, fs, ft, width, rng=None, padding=False):
@@ -131,8 +339,7 @@ def goertzel_st(data, fs, ft, width, rng=None, padding=False):
         raise ValueError(
             'Size of Goertzel block(N) should be less than data length.')
 
-    if data.dtype != np.dtype('float'):
-        data = np.asarray(data, dtype='float')
+    data = _as_input(data, allow_complex=False)
     ft = np.asfarray(ft)
 
     rem = len(data)%width
@@ -152,7 +359,8 @@ def goertzel_st(data, fs, ft, width, rng=None, padding=False):
     return val
 
 
-def goertzel_st_m(data, fs, ft, width, padding=False):
+def goertzel_st_m(data, fs, ft, width, padding=False, decimate=None,
+                  axis=-1, engine='auto', gate=None, return_info=False):
     """
     Modified short-time Goertzel algorithm. This method evaluates all `ft` 
     at once.
@@ -160,51 +368,327 @@ def goertzel_st_m(data, fs, ft, width, padding=False):
     Parameters
     ----------
     data : ndarray
-        Input signal.
+        Input signal, real or complex (e.g. IQ samples).
     fs : int
         Sampling frequency.
     ft : ndarray
-        Target frequency.
+        Target frequency. For complex data, negative frequencies are
+        distinguished from positive ones.
     width : int
         Width of filter. (related to frequency resolution)
     padding : bool
         Apply padding for this algorithm.
+    decimate : int or str, optional
+        Decimation factor applied before evaluation, `fs` and `width` should
+        be divisible by it. If 'auto', the largest factor that keeps
+        `fs / factor >= 4 * max(ft)` is selected, but only if filtering is
+        estimated to be cheaper than evaluating the target frequencies at
+        full rate (i.e. a few target frequencies are evaluated at once).
+    axis : int, optional
+        Axis of `data` along which the evaluation is performed. Shape of
+        output is the same as `data`, except along `axis` where the length
+        is the number of target frequencies.
+    engine : str, optional
+        Engine for evaluation, available engines: ['auto', 'loop', 'tiled',
+        'gemm']. 'gemm' evaluates all blocks at once by BLAS, which is the
+        fastest when there are lots of target frequencies and blocks. 'auto'
+        selects it according to `GEMM_MIN_BINS` and `GEMM_MIN_BLOCKS`.
+    gate : float, optional
+        Energy gate. Blocks whose RMS is below `gate` (e.g. silence) are
+        skipped and taken as zero magnitude. Since magnitude of a block is
+        bounded by its RMS, the error of each skipped block is less than
+        `gate`.
+    return_info : bool, optional
+        If True, also return a dict of the number of evaluated blocks
+        ('blocks', counted in all lanes of N-D data) and skipped blocks
+        ('skipped').
 
     Returns
     -------
     val : ndarray
         Magnitude of a single DFT term corresponding to target frequency.
+    info : dict
+        Only returned if `return_info` is True.
+
+    Note
+    ----
+    Number of threads used by BLAS can be limited by environment variable
+    `GOFFT_BLAS_THREADS` if `threadpoolctl` is installed, otherwise it's
+    controlled by BLAS itself (e.g. `OPENBLAS_NUM_THREADS`).
     """
-    if fs > len(data):
+    if engine not in GOERTZEL_ST_M_ENGINES:
+        raise ValueError('Invalid `engine`: {0}'.format(engine))
+
+    if fs > data.shape[axis]:
         raise ValueError(
-            'Data length is too short:{0}'.format(len(data)))
+            'Data length is too short:{0}'.format(data.shape[axis]))
 
-    if width > len(data):
+    if width > data.shape[axis]:
         raise ValueError(
             'Size of Goertzel block(N) should be less than data length.')
 
-    if data.dtype != np.dtype('float'):
-        data = np.asarray(data, dtype='float')
+    data = _as_input(data)
     ft = np.asfarray(ft)
-
-    rem = len(data)%width
-    dlen = len(data)-rem
-    cnt = len(data)//width
+    data, fs, width, gain = _decimate(data, fs, ft, width, decimate, axis,
+                                      blocks=True, padding=padding)
+
+    cnt = data.shape[axis]//width
+    if engine == 'auto':
+        engine = _select_st_m_engine(ft.size, cnt)
+    if engine == 'gemm' or gate is not None:
+        val, info = _goertzel_st_m_blocks(data, fs, ft, width, padding, axis,
+                                          engine, gate)
+        val = _compensate(val, gain, axis)
+        return (val, info) if return_info else val
+
+    # Blocks are taken as views of `data` along `axis`
+    index = [slice(None)]*data.ndim
+    rem = data.shape[axis]%width
+    dlen = data.shape[axis]-rem
     val = 0.0
     for i in range(0, dlen, width):
-        val += cext.goertzel_m(data[i:i+width], fs, ft, width)
+        index[axis] = slice(i, i+width)
+        val += _goertzel_m(data[tuple(index)], fs, ft, width, engine, axis)
 
     if rem!=0 and padding:
         cnt += 1
-        pdata = np.zeros(width-rem, dtype='float')
-        pdata = np.append(data[i+width:], pdata)
-        val += cext.goertzel_m(pdata, fs, ft, width)
-
-    val /= cnt
+        index[axis] = slice(dlen, None)
+        shape = list(data.shape)
+        shape[axis] = width-rem
+        pdata = np.zeros(shape, dtype=data.dtype)
+        pdata = np.concatenate([data[tuple(index)], pdata], axis=axis)
+        val += _goertzel_m(pdata, fs, ft, width, engine, axis)
+
+    val = _compensate(val / cnt, gain, axis)
+    if return_info:
+        lanes = data.size//data.shape[axis]
+        return val, {'blocks': cnt*lanes, 'skipped': 0}
     return val
 
 
-def fft_eval(sig, fs, ft):
+def goertzel_st_mw(data, fs, ft, widths, padding=False):
+    """
+    Multi-resolution version of `goertzel_st_m`. All target frequencies are
+    evaluated at several block widths within a single pass over data, states
+    of recurrences are reset at block boundaries of each width.
+
+    Parameters
+    ----------
+    data : ndarray
+        Input signal (1-D).
+    fs : int
+        Sampling frequency.
+    ft : ndarray
+        Target frequency.
+    widths : list of int
+        Widths of filter. (related to frequency resolution)
+    padding : bool
+        Apply padding for this algorithm.
+
+    Returns
+    -------
+    val : ndarray
+        Magnitude of DFT terms, shape: `(len(widths), len(ft))`. Row `i` is
+        the same as `goertzel_st_m(data, fs, ft, widths[i], padding)`.
+    """
+    if data.ndim != 1:
+        raise ValueError('Only 1-D data is supported.')
+    if fs > len(data):
+        raise ValueError(
+            'Data length is too short:{0}'.format(len(data)))
+
+    widths = np.ascontiguousarray(widths, dtype='intc').ravel()
+    if len(widths) == 0 or widths.min() < 1:
+        raise ValueError('Widths should be positive integers.')
+    if widths.max() > len(data):
+        raise ValueError(
+            'Size of Goertzel block(N) should be less than data length.')
+
+    data = _as_input(data, allow_complex=False)
+    ft = np.ascontiguousarray(np.atleast_1d(ft), dtype='float')
+
+    return cext.goertzel_st_mw(data, fs, ft, widths, int(bool(padding)))
+
+
+def goertzel_st_detect(data, fs, ft, width, threshold, early_exit=True,
+                       check_every=32, return_info=False):
+    """
+    Detect target frequencies in each block of short-time Goertzel algorithm,
+    i.e. whether magnitude (as `goertzel_st_m` for a single block) is not less
+    than `threshold`.
+
+    Blocks whose RMS is below `threshold` can not be detected, they are
+    skipped by an energy gate before running recurrences. With `early_exit`,
+    recurrence of a target frequency stops once the result is decided: every
+    `check_every` samples, magnitude of the partial DFT term is compared with
+    `threshold` plus/minus the largest change that remaining samples could
+    make (sum of their absolute values). Hence results are the same as
+    evaluating whole blocks.
+
+    Parameters
+    ----------
+    data : ndarray
+        Input signal (1-D). Samples of the last incomplete block are ignored.
+    fs : int
+        Sampling frequency.
+    ft : ndarray
+        Target frequency.
+    width : int
+        Width of filter. (related to frequency resolution)
+    threshold : float
+        Threshold of magnitude.
+    early_exit : bool, optional
+        Stop recurrences once the result is decided.
+    check_every : int, optional
+        Interval (in samples) of checking whether the result is decided.
+    return_info : bool, optional
+        If True, also return a dict of the number of blocks ('blocks'),
+        skipped blocks ('skipped'), recurrences stopped early ('early_exits')
+        and the fraction of samples processed by recurrences relative to
+        evaluating all blocks ('work').
+
+    Returns
+    -------
+    detected : ndarray of bool
+        Shape: `(len(data) // width, len(ft))`.
+    info : dict
+        Only returned if `return_info` is True.
+    """
+    if data.ndim != 1:
+        raise ValueError('Only 1-D data is supported.')
+    if width < 1 or width > len(data):
+        raise ValueError(
+            'Size of Goertzel block(N) should be less than data length.')
+    if check_every < 1:
+        raise ValueError('`check_every` should be a positive integer.')
+
+    data = _as_input(data, allow_complex=False)
+    ft = np.ascontiguousarray(np.atleast_1d(ft), dtype='float')
+
+    cnt = len(data)//width
+    rows = data[:cnt*width].reshape(cnt, width)
+    energy = np.einsum('ij,ij->i', rows, rows)/width
+    active = (energy >= threshold*threshold).view('uint8')
+
+    detected, n_samples, n_exits = cext.goertzel_st_detect(
+        data, fs, ft, width, float(threshold), int(check_every),
+        int(bool(early_exit)), np.ascontiguousarray(active))
+    detected = detected.view('bool')
+    if not return_info:
+        return detected
+    full = cnt*ft.size*width
+    info = {
+        'blocks': cnt,
+        'skipped': cnt - int(np.count_nonzero(active)),
+        'early_exits': n_exits,
+        'work': float(n_samples)/full if full > 0 else 0.0,
+    }
+    return detected, info
+
+
+def _select_st_m_engine(n_bins, n_blocks):
+    """ Engine selected by 'auto' of `goertzel_st_m`. """
+    if n_bins >= GEMM_MIN_BINS and n_blocks >= GEMM_MIN_BLOCKS:
+        return 'gemm'
+    return 'loop'
+
+
+def _goertzel_st_m_blocks(data, fs, ft, width, padding=False, axis=-1,
+                          engine='gemm', gate=None, basis=None):
+    # Blocks are laid out as rows of a matrix (a view if `data` is contiguous
+    # along `axis`). Magnitudes of all blocks are given by a single GEMM, or
+    # by a single call of `goertzel_m_nd` over rows.
+    x = np.moveaxis(data, axis, -1)
+    rem = x.shape[-1]%width
+    dlen = x.shape[-1]-rem
+    cnt = x.shape[-1]//width
+    blocks = x[..., :dlen].reshape(x.shape[:-1] + (cnt, width))
+    if rem != 0 and padding:
+        pdata = np.zeros(x.shape[:-1] + (1, width), dtype=x.dtype)
+        pdata[..., 0, :rem] = x[..., dlen:]
+        blocks = np.concatenate([blocks, pdata], axis=-2)
+        cnt += 1
+
+    rows = blocks.reshape(-1, width)
+    n_rows = rows.shape[0]
+    if gate is not None:
+        # Mean-square energy of all blocks in one vectorized pass
+        energy = np.einsum('ij,ij->i', rows, rows.conj()).real/width
+        active = energy >= gate*gate
+        rows = rows[active]
+
+    n_bins = ft.size
+    if rows.shape[0] == 0:
+        mag = np.zeros((0, n_bins))
+    elif engine == 'gemm':
+        if basis is None:
+            basis = _gemm_basis(fs, ft, width)
+        with _blas_threads():
+            y = np.dot(rows, basis)
+        if np.iscomplexobj(rows):
+            # Both products are complex, DFT term is `x.cos - j x.sin`
+            mag = np.abs(y[:, :n_bins] - 1j*y[:, n_bins:])/width
+        else:
+            mag = np.hypot(y[:, :n_bins], y[:, n_bins:])/width
+    else:
+        mag = cext.goertzel_m_nd(np.ascontiguousarray(rows), fs,
+                                 np.atleast_1d(ft), width, 1,
+                                 int(engine == 'tiled'))
+    if gate is not None:
+        full = np.zeros((n_rows, n_bins))
+        full[active] = mag
+        mag = full
+
+    mag = mag.reshape(blocks.shape[:-2] + (cnt, n_bins)).sum(axis=-2)
+    mag /= cnt
+    info = {'blocks': n_rows, 'skipped': n_rows - len(rows)}
+    return np.moveaxis(mag.reshape(x.shape[:-1] + ft.shape), -1, axis), info
+
+
+_gemm_bases = OrderedDict()
+
+
+def _gemm_basis(fs, ft, width):
+    """
+    Basis of gemm engine, columns are cos and sin of DFT terms (the same
+    bins as Goertzel algorithm) of target frequencies, shape: (width, 2K).
+    Recently used bases are cached.
+    """
+    ft = np.atleast_1d(ft)
+    key = (fs, width, ft.tobytes())
+    basis = _gemm_bases.pop(key, None)
+    if basis is None:
+        k = np.floor(0.5 + width*ft/float(fs))
+        phase = np.outer(np.arange(width), 2.0*np.pi*k/width)
+        basis = np.hstack([np.cos(phase), np.sin(phase)])
+        basis.flags.writeable = False
+        while len(_gemm_bases) >= GEMM_BASIS_CACHE_SIZE:
+            _gemm_bases.popitem(last=False)
+    _gemm_bases[key] = basis
+    return basis
+
+
+def _blas_threads():
+    n_threads = os.environ.get('GOFFT_BLAS_THREADS')
+    if n_threads:
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            pass
+        else:
+            return threadpool_limits(limits=int(n_threads), user_api='blas')
+    return _NullContext()
+
+
+class _NullContext(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+def fft_eval(sig, fs, ft, axis=-1):
     """
     Evaluate DFT terms of given tagert frequency.
 
@@ -216,17 +700,21 @@ def fft_eval(sig, fs, ft):
         Sampling frequency.
     ft : int, float or array-like
         Target frequency to be evaluated.
+    axis : int, optional
+        Axis of `sig` along which the evaluation is performed.
 
     Returns
     -------
     mag : ndarray
         Evaluated DFT terms.
     """
+    # Single precision input would be transformed in single precision
+    sig = _as_input(np.asarray(sig))
     ft = np.asfarray(ft)
-    dlen = sig.size
-    spec = scipyfft(sig) / dlen
+    dlen = sig.shape[axis]
+    spec = _scipyfft(sig, axis=axis) / dlen
     idx = (ft/fs*dlen).astype('int')
-    mag = np.abs(spec[idx])
+    mag = np.abs(np.take(spec, idx, axis=axis))
     return mag
 
 
@@ -250,6 +738,7 @@ def stfft_eval(sig, fs, ft, width):
     mag : ndarray
         Evaluated DFT terms.
     """
+    sig = _as_input(np.asarray(sig))
     ft = np.asfarray(ft)
     rem = sig.size % width
     dlen = sig.size - rem
@@ -257,8 +746,229 @@ def stfft_eval(sig, fs, ft, width):
     mag = 0.0
 
     for i in range(0, dlen, width):
-        spec = scipyfft(sig[i:i+width]) / width
+        spec = _scipyfft(sig[i:i+width]) / width
         idx = (ft/fs*width).astype('int')
         mag += np.abs(spec[idx])
     mag /= cnt
     return mag
+
+
+def _scipyfft(x, axis=-1):
+    # `scipy.fftpack` is imported on first use, since importing scipy takes
+    # much longer than anything else in this module.
+    from scipy.fftpack import fft
+    return fft(x, axis=axis)
+
+
+def _as_input(data, allow_complex=True):
+    """ Cast input signal to float64, or complex128 for complex data. """
+    if np.iscomplexobj(data):
+        if not allow_complex:
+            raise TypeError('Complex data is not supported.')
+        dtype = np.dtype('complex')
+    else:
+        dtype = np.dtype('float')
+    if data.dtype != dtype:
+        data = np.asarray(data, dtype=dtype)
+    return data
+
+
+def _goertzel_m(data, fs, ft, width, engine='loop', axis=-1):
+    if data.ndim == 1:
+        if np.iscomplexobj(data):
+            return cext.goertzel_m_cplx(data, fs, ft, width)
+        return GOERTZEL_M_ENGINES[engine](data, fs, ft, width)
+    return cext.goertzel_m_nd(data, fs, ft, width, axis,
+                              int(engine == 'tiled'))
+
+
+class Decimator(object):
+    """
+    Decimator with a FIR anti-aliasing filter (Hamming-windowed sinc).
+
+    State of the filter is preserved between calls of `process()`, so that a
+    long signal can be fed in chunks and the output is identical to the one
+    of feeding it at once.
+
+    Parameters
+    ----------
+    factor : int
+        Decimation factor.
+    n_taps : int, optional
+        Number of taps of the anti-aliasing filter. Default: `8*factor + 1`.
+
+    Note
+    ----
+    1. Filter state is initialized with zeros, so that the first
+       `n_taps // factor` output samples are affected by the transient of
+       filter.
+    2. Output is delayed by `(n_taps - 1) / 2` input samples (group delay of
+       filter).
+    """
+    def __init__(self, factor, n_taps=None):
+        if factor < 1:
+            raise ValueError('Decimation factor should not be less than 1.')
+        if n_taps is None:
+            n_taps = 8*factor + 1
+        if n_taps < 1:
+            raise ValueError('Number of taps should not be less than 1.')
+        self.factor = int(factor)
+        self.taps = _design_lowpass(self.factor, int(n_taps))
+        self.reset()
+
+    def reset(self):
+        """ Reset state of the filter. """
+        self.state = np.zeros(len(self.taps) - 1, dtype='float')
+        # State of imaginary part, only used by complex input
+        self.state_imag = np.zeros(len(self.taps) - 1, dtype='float')
+        self.phase = 0
+
+    def process(self, data):
+        """
+        Parameters
+        ----------
+        data : ndarray
+            Input signal (or a chunk of it), real or complex.
+
+        Returns
+        -------
+        out : ndarray
+            Decimated signal.
+        """
+        if np.iscomplexobj(data):
+            data = np.asarray(data, dtype='complex')
+        elif data.dtype != np.dtype('float'):
+            data = np.asarray(data, dtype='float')
+        if self.factor == 1:
+            return data.copy()
+        phase = self.phase
+        out, self.phase = cext.decimate(np.ascontiguousarray(data.real),
+                                        self.taps, self.factor, self.state,
+                                        phase)
+        # Taps are real, so imaginary part is filtered by the same kernel
+        # (sharing the phase). A real chunk following complex ones is fed as
+        # zero imaginary part, so that the tail of filter is kept.
+        if np.iscomplexobj(data) or self.state_imag.any():
+            imag, _ = cext.decimate(np.ascontiguousarray(data.imag),
+                                    self.taps, self.factor, self.state_imag,
+                                    phase)
+            out = out + 1j*imag
+        return out
+
+
+def _design_lowpass(factor, n_taps):
+    """ Design a low-pass filter with cutoff at Nyquist frequency / factor. """
+    n = np.arange(n_taps) - (n_taps - 1) / 2.0
+    taps = np.sinc(n / factor) * np.hamming(n_taps)
+    return taps / np.sum(taps)
+
+
+def _select_decimation(fs, ft_max, width, n_bins=1):
+    if ft_max > 0:
+        q_max = int(fs // (DECIMATION_OVERSAMPLING * ft_max))
+    else:
+        q_max = width
+    for q in range(min(q_max, width), 1, -1):
+        if fs % q == 0 and width % q == 0:
+            break
+    else:
+        return 1
+    # Cost per input sample (in iterations of Goertzel algorithm) decreases
+    # with the factor, so the largest one is taken if it pays off at all.
+    cost = (n_bins + DECIMATION_TAP_COST*(8*q + 1)) / q
+    return q if cost < n_bins else 1
+
+
+def _decimate(data, fs, ft, width, decimate, axis=-1, ft_max=None,
+              blocks=False, padding=False):
+    """
+    Apply decimation to data before evaluation. If `blocks` is True, data is
+    evaluated block by block (see `goertzel_st_m`) and each block of `width`
+    samples is decimated separately.
+
+    Returns
+    -------
+    data : ndarray
+        Decimated signal.
+    fs : int
+        Sampling frequency of decimated signal.
+    width : int
+        Width of filter for decimated signal.
+    gain : ndarray or None
+        Gain of anti-aliasing filter at (the bin of) each target frequency,
+        magnitudes should be divided by it. None if data is not decimated.
+    """
+    if decimate is None:
+        return data, fs, width, None
+
+    if ft_max is None:
+        ft_max = np.max(np.abs(ft))
+    if decimate == 'auto':
+        q = _select_decimation(fs, ft_max, width, np.size(ft))
+    else:
+        q = int(decimate)
+        if q < 1:
+            raise ValueError('Decimation factor should not be less than 1.')
+        if fs % q != 0 or width % q != 0:
+            raise ValueError('Both `fs` and `width` should be divisible by '
+                             'decimation factor: {0}'.format(q))
+        if 2 * ft_max >= fs / q:
+            raise ValueError('Decimation factor is too large, target '
+                             'frequency will be aliased: {0}'.format(q))
+    if q == 1:
+        return data, fs, width, None
+    decimator = Decimator(q)
+    gain = _passband_gain(decimator.taps, fs, ft, width)
+    block_width = width if blocks else None
+    if data.ndim == 1:
+        decimated = _decimate_lane(data, decimator, block_width, padding)
+    else:
+        # Every lane along `axis` is an independent signal
+        decimated = np.apply_along_axis(_decimate_lane, axis, data,
+                                        decimator, block_width, padding)
+    return decimated, fs // q, width // q, gain
+
+
+def _decimate_lane(x, decimator, width=None, padding=False):
+    # Signal is taken as periodic, as it is by DFT: the period is the whole
+    # lane, or each block of `width` samples (the last partial one is
+    # zero-padded if `padding`, otherwise dropped). Filter wraps around the
+    # ends of a period and is centred on kept samples (i.e. its group delay
+    # is dropped), so that DFT terms of decimated signal are the ones of
+    # original signal scaled by filter gain, plus aliases of stop-band.
+    q = decimator.factor
+    delay = (len(decimator.taps) - 1) // 2
+    if width is None:
+        blocks = x[np.newaxis]
+    else:
+        rem = len(x) % width
+        if rem != 0 and padding:
+            x = np.concatenate([x, np.zeros(width - rem, dtype=x.dtype)])
+        blocks = x[:len(x) - len(x) % width].reshape(-1, width)
+    n_out = -(-blocks.shape[1] // q)
+    # Blocks are filtered by a single pass, each padded block is a multiple
+    # of factor long (`width` and `2*delay` are), so that kept samples are
+    # aligned in all of them.
+    padded = np.pad(blocks, ((0, 0), (delay, delay)), mode='wrap')
+    decimator.reset()
+    out = decimator.process(padded.ravel())
+    skip = 2*delay // q
+    if len(blocks) == 1:
+        return out[skip:skip + n_out]
+    return out.reshape(len(blocks), -1)[:, skip:skip + n_out].ravel()
+
+
+def _passband_gain(taps, fs, ft, width):
+    # Frequency response of a symmetric filter (centred) is real
+    f = np.floor(0.5 + np.abs(np.atleast_1d(ft))/fs*width)/width
+    n = np.arange(len(taps)) - (len(taps) - 1) / 2.0
+    return np.abs(np.cos(2*np.pi*np.outer(f, n)).dot(taps))
+
+
+def _compensate(val, gain, axis=-1):
+    """ Divide magnitudes (target frequencies along `axis`) by `gain`. """
+    if gain is None:
+        return val
+    shape = [1]*np.ndim(val)
+    shape[axis] = -1
+    return val / gain.reshape(shape)
@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+import os
+from . import dsp_ext as cext
+
+
+__all__ = ['stats', 'enable_stats', 'reset_stats']
+
+# Instrumentation can also be enabled without changing code, e.g.
+# `GOFFT_STATS=1 python worker.py`
+STATS_ENV_VAR = 'GOFFT_STATS'
+
+
+def enable_stats(flag=True):
+    """
+    Enable or disable instrumentation of functions in `dsp_ext`.
+
+    Parameters
+    ----------
+    flag : bool
+        Enable instrumentation if it's true.
+
+    Returns
+    -------
+    previous : bool
+        Previous state of instrumentation.
+    """
+    return cext.stats_enable(int(bool(flag)))
+
+
+def reset_stats():
+    """ Reset all counters of instrumentation. """
+    cext.stats_reset()
+
+
+def stats(reset=False):
+    """
+    Get a snapshot of counters of instrumentation.
+
+    Parameters
+    ----------
+    reset : bool, optional
+        Reset counters after taking the snapshot.
+
+    Returns
+    -------
+    snapshot : dict
+        Counters of each function in `dsp_ext`, keyed by function name:
+        - calls: number of calls.
+        - samples: number of processed samples.
+        - copies: number of copies made for non-contiguous input.
+        - setup_ns: time of parsing arguments and copying input.
+        - alloc_ns: time of allocating output.
+        - kernel_ns: time of running the algorithm.
+
+    Note
+    ----
+    Counters are updated only when instrumentation is enabled, see also
+    `enable_stats()`.
+    """
+    snapshot = cext.stats_snapshot()
+    if reset:
+        cext.stats_reset()
+    return snapshot
+
+
+if os.environ.get(STATS_ENV_VAR, '0') not in ('', '0'):
+    enable_stats(True)
@@ -10,7 +10,7 @@ def configuration():
 
 	NP_DEP = numpy.distutils.misc_util.get_numpy_include_dirs()
 	name = 'gofft.alg.dsp_ext'
-	files = ['main.c', 'dsp.c']
+	files = ['main.c', 'dsp.c', 'stats.c']
 	this_dir = op.dirname(op.abspath(__file__))
 	sources = [absjoin(this_dir, 'src', f) for f in files]
 	deps = [NP_DEP]
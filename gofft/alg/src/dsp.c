@@ -87,6 +87,49 @@ void goertzel_m(double* data, long int data_len, int fs, double* ft,
     }
 }
 
+void goertzel_m_cplx(double* data, long int data_len, int fs, double* ft,
+                     int ft_num, int filter_size, double* mag)
+{
+    double k;
+    double omega;
+    double sine, cosine, coeff, sf;
+    double p0, p1, p2, q0, q1, q2, real, imag;
+    long int i;
+    int cnt;
+
+    for (cnt = 0; cnt < ft_num; cnt++)
+    {
+        // Negative `ft` gives negative `k`, i.e. a negative frequency bin
+        k = floor(0.5 + ((double)(filter_size*ft[cnt]) / (double)fs));
+        omega = 2.0*M_PI*k/(double)filter_size;
+        sine = sin(omega);
+        cosine = cos(omega);
+        coeff = 2.0*cosine;
+        sf = (double)data_len;
+
+        // Coefficient of the recurrence is real, so real (p) and imaginary
+        // (q) parts are independent recurrences, which are run together.
+        p1 = 0.0;
+        p2 = 0.0;
+        q1 = 0.0;
+        q2 = 0.0;
+        for (i = 0; i < data_len; i++)
+        {
+            p0 = coeff*p1 - p2 + data[2*i];
+            q0 = coeff*q1 - q2 + data[2*i+1];
+            p2 = p1;
+            p1 = p0;
+            q2 = q1;
+            q1 = q0;
+        }
+
+        // y = s1 - exp(-j*omega)*s2, |y| is the magnitude of DFT term
+        real = (p1 - cosine*p2 - sine*q2)/sf;
+        imag = (q1 - cosine*q2 + sine*p2)/sf;
+        mag[cnt] = sqrt(real*real + imag*imag);
+    }
+}
+
 double goertzel_rng(double* data, long data_len, int fs, double ft, 
                     int filter_size, double rng)
 {
@@ -140,4 +183,476 @@ double goertzel_rng(double* data, long data_len, int fs, double ft,
 
     }
     return mag;
-}
\ No newline at end of file
+}
+
+static void _goertzel_update4(double* tile, long int tlen, double* coeff,
+                              double* s1, double* s2)
+{
+    double a0, a1, a2, b0, b1, b2, c0, c1, c2, d0, d1, d2;
+    double ca, cb, cc, cd, x;
+    long int i;
+
+    ca = coeff[0]; cb = coeff[1]; cc = coeff[2]; cd = coeff[3];
+    a1 = s1[0]; b1 = s1[1]; c1 = s1[2]; d1 = s1[3];
+    a2 = s2[0]; b2 = s2[1]; c2 = s2[2]; d2 = s2[3];
+
+    for (i = 0; i < tlen; i++)
+    {
+        x = tile[i];
+        a0 = ca*a1 - a2 + x;
+        b0 = cb*b1 - b2 + x;
+        c0 = cc*c1 - c2 + x;
+        d0 = cd*d1 - d2 + x;
+        a2 = a1; a1 = a0;
+        b2 = b1; b1 = b0;
+        c2 = c1; c1 = c0;
+        d2 = d1; d1 = d0;
+    }
+
+    s1[0] = a1; s1[1] = b1; s1[2] = c1; s1[3] = d1;
+    s2[0] = a2; s2[1] = b2; s2[2] = c2; s2[3] = d2;
+}
+
+static void _goertzel_update_bins(double* tile, long int tlen, double* coeff,
+                                  double* s1, double* s2, int ft_num)
+{
+    double q0, q1, q2, c;
+    long int i, dlen;
+    int cnt;
+
+    dlen = tlen - tlen%3;
+
+    // Update 4 target frequencies at a time. These recurrences are
+    // independent of each other, so that they can be pipelined by CPU.
+    for (cnt = 0; cnt + 4 <= ft_num; cnt += 4)
+    {
+        _goertzel_update4(tile, tlen, coeff + cnt, s1 + cnt, s2 + cnt);
+    }
+    for (; cnt < ft_num; cnt++)
+    {
+        c = coeff[cnt];
+        q1 = s1[cnt];
+        q2 = s2[cnt];
+
+        for (i = 0; i < dlen; i+=3)
+        {
+            q0 = c*q1 - q2 + tile[i];
+            q2 = c*q0 - q1 + tile[i+1];
+            q1 = c*q2 - q0 + tile[i+2];
+        }
+        for (; i < tlen; i++)
+        {
+            q0 = c*q1 - q2 + tile[i];
+            q2 = q1;
+            q1 = q0;
+        }
+
+        s1[cnt] = q1;
+        s2[cnt] = q2;
+    }
+}
+
+int goertzel_m_tiled(double* data, long int data_len, int fs, double* ft, 
+                     int ft_num, int filter_size, double* mag)
+{
+    double k;
+    double omega;
+    double sine, cosine, sf;
+    double real, imag;
+    double *coeff, *s1, *s2;
+    long int start, tlen;
+    int cnt;
+
+    // Recurrence states of all target frequencies are kept in a single
+    // buffer, so that each tile of data is loaded into cache only once and
+    // then reused by every target frequency.
+    coeff = (double *)malloc(3*ft_num*sizeof(double));
+    if (coeff == NULL) return -1;
+    s1 = coeff + ft_num;
+    s2 = s1 + ft_num;
+
+    for (cnt = 0; cnt < ft_num; cnt++)
+    {
+        k = floor(0.5 + ((double)(filter_size*ft[cnt]) / (double)fs));
+        omega = 2.0*M_PI*k/(double)filter_size;
+        coeff[cnt] = 2.0*cos(omega);
+        s1[cnt] = 0.0;
+        s2[cnt] = 0.0;
+    }
+
+    for (start = 0; start < data_len; start += GOERTZEL_TILE_SIZE)
+    {
+        tlen = data_len - start;
+        if (tlen > GOERTZEL_TILE_SIZE) tlen = GOERTZEL_TILE_SIZE;
+        _goertzel_update_bins(data + start, tlen, coeff, s1, s2, ft_num);
+    }
+
+    sf = (double)data_len;
+    for (cnt = 0; cnt < ft_num; cnt++)
+    {
+        k = floor(0.5 + ((double)(filter_size*ft[cnt]) / (double)fs));
+        omega = 2.0*M_PI*k/(double)filter_size;
+        sine = sin(omega);
+        cosine = cos(omega);
+
+        real = (s1[cnt] - s2[cnt]*cosine)/sf;
+        imag = (s2[cnt]*sine)/sf;
+        mag[cnt] = sqrt(real*real + imag*imag);
+    }
+
+    free(coeff);
+    return 0;
+}
+
+
+int goertzel_harmonics(double* data, long int data_len, int fs, double f0,
+                       int n_harmonics, int filter_size, double* mag)
+{
+    double k, omega, sf, real, imag;
+    double *coeff, *s1, *s2, *cosine, *sine;
+    long int start, tlen;
+    int h;
+
+    coeff = (double *)malloc(5*n_harmonics*sizeof(double));
+    if (coeff == NULL) return -1;
+    s1 = coeff + n_harmonics;
+    s2 = s1 + n_harmonics;
+    cosine = s2 + n_harmonics;
+    sine = cosine + n_harmonics;
+
+    // Bin of harmonic `h` is `h*k`, so that cos/sin of all harmonics are
+    // derived from the fundamental by Chebyshev recurrence:
+    //   cos(h*w) = 2*cos(w)*cos((h-1)*w) - cos((h-2)*w)
+    //   sin(h*w) = 2*cos(w)*sin((h-1)*w) - sin((h-2)*w)
+    k = floor(0.5 + ((double)filter_size*f0 / (double)fs));
+    omega = 2.0*M_PI*k/(double)filter_size;
+    for (h = 0; h < n_harmonics; h++)
+    {
+        if (h == 0) {
+            cosine[h] = cos(omega);
+            sine[h] = sin(omega);
+        } else if (h == 1) {
+            cosine[h] = 2.0*cosine[0]*cosine[0] - 1.0;
+            sine[h] = 2.0*cosine[0]*sine[0];
+        } else {
+            cosine[h] = 2.0*cosine[0]*cosine[h-1] - cosine[h-2];
+            sine[h] = 2.0*cosine[0]*sine[h-1] - sine[h-2];
+        }
+        coeff[h] = 2.0*cosine[h];
+        s1[h] = 0.0;
+        s2[h] = 0.0;
+    }
+
+    // All harmonics are updated tile by tile within a single pass over data
+    for (start = 0; start < data_len; start += GOERTZEL_TILE_SIZE)
+    {
+        tlen = data_len - start;
+        if (tlen > GOERTZEL_TILE_SIZE) tlen = GOERTZEL_TILE_SIZE;
+        _goertzel_update_bins(data + start, tlen, coeff, s1, s2, n_harmonics);
+    }
+
+    sf = (double)data_len;
+    for (h = 0; h < n_harmonics; h++)
+    {
+        real = (s1[h] - s2[h]*cosine[h])/sf;
+        imag = (s2[h]*sine[h])/sf;
+        mag[h] = sqrt(real*real + imag*imag);
+    }
+
+    free(coeff);
+    return 0;
+}
+
+
+// Accumulate magnitudes of a finished block into `mag`, then reset states.
+static void _goertzel_flush(double* s1, double* s2, double* cosine,
+                            double* sine, int ft_num, int width, double* mag)
+{
+    double real, imag;
+    int cnt;
+
+    for (cnt = 0; cnt < ft_num; cnt++)
+    {
+        real = (s1[cnt] - s2[cnt]*cosine[cnt])/(double)width;
+        imag = (s2[cnt]*sine[cnt])/(double)width;
+        mag[cnt] += sqrt(real*real + imag*imag);
+        s1[cnt] = 0.0;
+        s2[cnt] = 0.0;
+    }
+}
+
+int goertzel_st_mw(double* data, long int data_len, int fs, double* ft,
+                   int ft_num, int* widths, int n_widths, int padding,
+                   double* mag)
+{
+    double k, omega;
+    double zeros[GOERTZEL_TILE_SIZE];
+    double *coeff, *s1, *s2, *cosine, *sine;
+    long int start, tlen, pos, end, seg_end, boundary, rem, n_blocks, n_zeros;
+    long int i;
+    int w, cnt, width, off, n;
+
+    // States of all (width, target frequency) pairs, row `w` belongs to
+    // `widths[w]`. Each tile of data is loaded into cache only once, and
+    // it's consumed by the recurrences of every width. Recurrences of all
+    // rows are updated together (4 at a time) between block boundaries.
+    n = n_widths*ft_num;
+    coeff = (double *)malloc(5*n*sizeof(double));
+    if (coeff == NULL) return -1;
+    s1 = coeff + n;
+    s2 = s1 + n;
+    cosine = s2 + n;
+    sine = cosine + n;
+
+    for (w = 0; w < n_widths; w++)
+    {
+        for (cnt = 0; cnt < ft_num; cnt++)
+        {
+            off = w*ft_num + cnt;
+            k = floor(0.5 + ((double)(widths[w]*ft[cnt]) / (double)fs));
+            omega = 2.0*M_PI*k/(double)widths[w];
+            cosine[off] = cos(omega);
+            sine[off] = sin(omega);
+            coeff[off] = 2.0*cosine[off];
+            s1[off] = 0.0;
+            s2[off] = 0.0;
+            mag[off] = 0.0;
+        }
+    }
+
+    for (start = 0; start < data_len; start += GOERTZEL_TILE_SIZE)
+    {
+        tlen = data_len - start;
+        if (tlen > GOERTZEL_TILE_SIZE) tlen = GOERTZEL_TILE_SIZE;
+        end = start + tlen;
+
+        // Tile is split at the nearest block boundary of all widths, where
+        // magnitudes of that width are taken and its states are reset.
+        // Samples after the last complete block of a width are consumed as
+        // well, but they are discarded unless padding is applied.
+        for (pos = start; pos < end; pos = seg_end)
+        {
+            seg_end = end;
+            for (w = 0; w < n_widths; w++)
+            {
+                boundary = (pos/widths[w] + 1)*widths[w];
+                if (boundary < seg_end) seg_end = boundary;
+            }
+            _goertzel_update_bins(data + pos, seg_end - pos, coeff, s1, s2, n);
+            for (w = 0; w < n_widths; w++)
+            {
+                if (seg_end%widths[w] != 0) continue;
+                off = w*ft_num;
+                _goertzel_flush(s1 + off, s2 + off, cosine + off, sine + off,
+                                ft_num, widths[w], mag + off);
+            }
+        }
+    }
+
+    for (i = 0; i < GOERTZEL_TILE_SIZE; i++) zeros[i] = 0.0;
+
+    for (w = 0; w < n_widths; w++)
+    {
+        width = widths[w];
+        off = w*ft_num;
+        rem = data_len%width;
+        n_blocks = data_len/width;
+
+        // Last block is padded with zeros
+        if (padding && rem != 0)
+        {
+            for (n_zeros = width - rem; n_zeros > 0; n_zeros -= tlen)
+            {
+                tlen = n_zeros < GOERTZEL_TILE_SIZE ? n_zeros : GOERTZEL_TILE_SIZE;
+                _goertzel_update_bins(zeros, tlen, coeff + off, s1 + off,
+                                      s2 + off, ft_num);
+            }
+            _goertzel_flush(s1 + off, s2 + off, cosine + off, sine + off,
+                            ft_num, width, mag + off);
+            n_blocks += 1;
+        }
+
+        for (cnt = 0; cnt < ft_num; cnt++)
+        {
+            if (n_blocks > 0) mag[off + cnt] /= (double)n_blocks;
+        }
+    }
+
+    free(coeff);
+    return 0;
+}
+
+
+int goertzel_m_ragged(double* data, long int* offsets, long int n_clips,
+                      int fs, double* ft, int ft_num, int filter_size,
+                      int tiled, double* mag)
+{
+    long int i, clip_len;
+    int cnt, width;
+
+    for (i = 0; i < n_clips; i++)
+    {
+        clip_len = offsets[i+1] - offsets[i];
+        if (clip_len <= 0)
+        {
+            for (cnt = 0; cnt < ft_num; cnt++) mag[i*ft_num + cnt] = 0.0;
+            continue;
+        }
+        // Frequency bins follow the length of each clip by default
+        width = filter_size > 0 ? filter_size : (int)clip_len;
+        if (tiled)
+        {
+            if (goertzel_m_tiled(data + offsets[i], clip_len, fs, ft, ft_num,
+                                 width, mag + i*ft_num) != 0) return -1;
+        }
+        else
+        {
+            goertzel_m(data + offsets[i], clip_len, fs, ft, ft_num, width,
+                       mag + i*ft_num);
+        }
+    }
+    return 0;
+}
+
+
+int goertzel_st_detect(double* data, long int data_len, int fs, double* ft,
+                       int ft_num, int width, double threshold,
+                       int check_every, int early_exit,
+                       unsigned char* active, unsigned char* detected,
+                       long int* n_samples, long int* n_exits)
+{
+    double k, omega, c, q0, q1, q2, power, rem, bound;
+    double *coeff, *abs_sum, *block;
+    long int n_blocks, b, i, end;
+    int cnt, decided;
+
+    n_blocks = data_len/width;
+    coeff = (double *)malloc((ft_num + width + 1)*sizeof(double));
+    if (coeff == NULL) return -1;
+    // abs_sum[i]: sum of |x| of the first `i` samples of a block
+    abs_sum = coeff + ft_num;
+
+    for (cnt = 0; cnt < ft_num; cnt++)
+    {
+        k = floor(0.5 + ((double)(width*ft[cnt]) / (double)fs));
+        omega = 2.0*M_PI*k/(double)width;
+        coeff[cnt] = 2.0*cos(omega);
+    }
+    if (check_every < 1) check_every = width;
+    threshold *= (double)width;
+    *n_samples = 0;
+    *n_exits = 0;
+
+    for (b = 0; b < n_blocks; b++)
+    {
+        for (cnt = 0; cnt < ft_num; cnt++) detected[b*ft_num + cnt] = 0;
+        if (!active[b]) continue;
+
+        block = data + b*width;
+        abs_sum[0] = 0.0;
+        for (i = 0; i < width; i++)
+        {
+            abs_sum[i+1] = abs_sum[i] + fabs(block[i]);
+        }
+
+        for (cnt = 0; cnt < ft_num; cnt++)
+        {
+            c = coeff[cnt];
+            q1 = 0.0;
+            q2 = 0.0;
+            decided = 0;
+            for (i = 0; i < width && !decided; )
+            {
+                end = early_exit ? i + check_every : width;
+                if (end > width) end = width;
+                for (; i < end; i++)
+                {
+                    q0 = c*q1 - q2 + block[i];
+                    q2 = q1;
+                    q1 = q0;
+                }
+
+                // |partial DFT term|^2 of the first `i` samples, the rest of
+                // samples can change its magnitude by at most `rem`.
+                power = q1*q1 + q2*q2 - c*q1*q2;
+                rem = abs_sum[width] - abs_sum[i];
+                bound = threshold + rem;
+                if (power >= bound*bound)
+                {
+                    detected[b*ft_num + cnt] = 1;
+                    decided = 1;
+                }
+                else if (threshold > rem &&
+                         power < (threshold - rem)*(threshold - rem))
+                {
+                    decided = 1;
+                }
+            }
+            *n_samples += i;
+            if (i < width) *n_exits += 1;
+        }
+    }
+
+    free(coeff);
+    return 0;
+}
+
+
+long int decimate(double* data, long int data_len, double* taps, int n_taps,
+                  int factor, double* state, int* phase, double* out)
+{
+    double acc;
+    long int i, j, n_out, hist_len;
+    int t;
+
+    // `state` keeps the last `n_taps - 1` samples of previous call (the most
+    // recent one is the last element), so that a long signal can be fed in
+    // chunks and the output is the same as feeding it at once.
+    hist_len = n_taps - 1;
+    n_out = 0;
+
+    // Only the samples to be kept are evaluated, which is equivalent to a
+    // polyphase decimator: cost per input sample is `n_taps / factor`.
+    for (i = *phase; i < data_len; i += factor)
+    {
+        acc = 0.0;
+        if (i >= hist_len)
+        {
+            for (t = 0; t < n_taps; t++)
+            {
+                acc += taps[t]*data[i-t];
+            }
+        }
+        else
+        {
+            for (t = 0; t < n_taps; t++)
+            {
+                j = i - t;
+                acc += taps[t]*(j >= 0 ? data[j] : state[hist_len+j]);
+            }
+        }
+        out[n_out++] = acc;
+    }
+    *phase = (int)(i - data_len);
+
+    // Update history of filter
+    if (data_len >= hist_len)
+    {
+        for (j = 0; j < hist_len; j++)
+        {
+            state[j] = data[data_len-hist_len+j];
+        }
+    }
+    else
+    {
+        for (j = 0; j < hist_len - data_len; j++)
+        {
+            state[j] = state[j+data_len];
+        }
+        for (; j < hist_len; j++)
+        {
+            state[j] = data[j-(hist_len-data_len)];
+        }
+    }
+    return n_out;
+}
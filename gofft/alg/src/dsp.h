@@ -1,7 +1,57 @@
 #define _USE_MATH_DEFINES	// for C
 #include <math.h>
 
+// Number of samples in a tile of data. A tile of double (4 KB) should fit in
+// L1 cache of most of the modern CPUs.
+#define GOERTZEL_TILE_SIZE 512
+
 // Goertzel algorithm (for single tone detection)
 double goertzel(double* data, long data_len, int fs, double ft, int filter_size);
 void goertzel_m(double* data, long int data_len, int fs, double* ft, int ft_num, int filter_size, double* mag);
+// Same as `goertzel_m`, but for complex data. `data` is interleaved real
+// and imaginary parts of `data_len` samples (the layout of complex128), and
+// negative target frequencies are distinguished from positive ones.
+void goertzel_m_cplx(double* data, long int data_len, int fs, double* ft, int ft_num, int filter_size, double* mag);
+
 double goertzel_rng(double* data, long data_len, int fs, double ft, int filter_size, double rng);
+// Same as `goertzel_m`, but all target frequencies are updated tile by tile
+// within a single pass over data. Return 0 on success, -1 if memory
+// allocation failed.
+int goertzel_m_tiled(double* data, long int data_len, int fs, double* ft, int ft_num, int filter_size, double* mag);
+
+// Short-time Goertzel algorithm at several block widths within a single pass
+// over data. Magnitudes averaged over blocks of `widths[w]` are written into
+// `mag[w*ft_num:(w+1)*ft_num]`. If `padding` is non-zero, the last incomplete
+// block is padded with zeros. Return 0 on success, -1 if memory allocation
+// failed.
+int goertzel_st_mw(double* data, long int data_len, int fs, double* ft, int ft_num, int* widths, int n_widths, int padding, double* mag);
+
+// Magnitudes of the fundamental `f0` and its harmonics (`mag[h-1]` for
+// harmonic `h`, `h = 1..n_harmonics`), evaluated within a single pass over
+// data. Bin of harmonic `h` is `h` times the bin of `f0`.
+// Return 0 on success, -1 if memory allocation failed.
+int goertzel_harmonics(double* data, long int data_len, int fs, double f0, int n_harmonics, int filter_size, double* mag);
+
+// Goertzel algorithm for multiple target frequency over clips of different
+// lengths, which are concatenated in `data`. Clip `i` is
+// `data[offsets[i]:offsets[i+1]]` (size of `offsets`: `n_clips + 1`), and
+// its magnitudes are written into `mag[i*ft_num:(i+1)*ft_num]`. If
+// `filter_size` is not positive, length of each clip is used. Empty clips
+// give zeros. Return 0 on success, -1 if memory allocation failed.
+int goertzel_m_ragged(double* data, long int* offsets, long int n_clips, int fs, double* ft, int ft_num, int filter_size, int tiled, double* mag);
+
+// Detect target frequencies in each block of `width` samples, i.e.
+// magnitude (normalized as `goertzel_m`) is not less than `threshold`.
+// Blocks with `active[b] == 0` are skipped. If `early_exit` is non-zero,
+// recurrence of a block stops once the result is decided, which is checked
+// every `check_every` samples by bounding the contribution of remaining
+// samples. Size of `detected`: `(data_len/width)*ft_num`. Numbers of
+// processed samples and early exits are written into `n_samples` and
+// `n_exits`. Return 0 on success, -1 if memory allocation failed.
+int goertzel_st_detect(double* data, long int data_len, int fs, double* ft, int ft_num, int width, double threshold, int check_every, int early_exit, unsigned char* active, unsigned char* detected, long int* n_samples, long int* n_exits);
+
+// Decimation with a FIR anti-aliasing filter. `state` (size: `n_taps - 1`) and
+// `phase` are updated in place, so that it can be used for streaming. Size of
+// `out` should be at least `(data_len + factor - 1) / factor`. Return number
+// of output samples.
+long int decimate(double* data, long int data_len, double* taps, int n_taps, int factor, double* state, int* phase, double* out);
\ No newline at end of file
@@ -1,6 +1,10 @@
 #include "include.h"
+#include "stats.h"
 #include <math.h>
 
+// Number of copies made by `PyArray_GETCONTIGUOUS`
+#define N_COPIES(ap) (PyArray_ISCONTIGUOUS(ap) ? 0 : 1)
+
 static PyObject* dsp_goertzel(PyObject* self, PyObject* args)
 {
     PyArrayObject *ap;
@@ -9,7 +13,10 @@ static PyObject* dsp_goertzel(PyObject* self, PyObject* args)
     long int data_len;
     double *data;
     double mag;
+    long int copies;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
 
+    STATS_TIC(t0);
     if(!PyArg_ParseTuple(args, "O!idi",
         &PyArray_Type, &ap, &fs, &ft, &filter_size)) {
         return NULL;
@@ -18,12 +25,17 @@ static PyObject* dsp_goertzel(PyObject* self, PyObject* args)
 
     // Ensure the input array is contiguous.
     // PyArray_GETCONTIGUOUS will increase the reference count.
+    copies = N_COPIES(ap);
     ap = PyArray_GETCONTIGUOUS(ap);
 
     data = (double *)PyArray_DATA((PyArrayObject *)ap);
     data_len = (long int)PyArray_DIM(ap, 0);
+    STATS_TIC(t1);
+    STATS_TIC(t2);
 
     mag = goertzel(data, data_len, fs, ft, filter_size);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL, data_len, copies, t0, t1, t2, t3);
 
     // Decrease the reference count of ap.
     Py_DECREF(ap);
@@ -35,9 +47,11 @@ static PyObject* dsp_goertzel_m(PyObject* self, PyObject* args)
     PyArrayObject *ap1, *ap2;
     PyObject *output;
     int filter_size, fs, ft_num;
-    long int data_len;
+    long int data_len, copies;
     double *data, *ft, *mag;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
 
+    STATS_TIC(t0);
     if(!PyArg_ParseTuple(args, "O!iO!i",
         &PyArray_Type, &ap1, &fs, &PyArray_Type, &ap2, &filter_size)) {
         return NULL;
@@ -45,22 +59,507 @@ static PyObject* dsp_goertzel_m(PyObject* self, PyObject* args)
     if (ap1 == NULL) return NULL;
     if (ap2 == NULL) return NULL;
 
+    copies = N_COPIES(ap1);
     ap1 = PyArray_GETCONTIGUOUS(ap1);
 
     data = (double *)PyArray_DATA(ap1);
     data_len = (long int)PyArray_DIM(ap1, 0);
     ft = (double *)PyArray_DATA(ap2);
     ft_num = (int)PyArray_DIM(ap2, 0);
+    STATS_TIC(t1);
 
     output = PyArray_SimpleNew(1, PyArray_DIMS(ap2), NPY_DOUBLE);
     mag = (double *)PyArray_DATA((PyArrayObject *)output);
+    STATS_TIC(t2);
 
     goertzel_m(data, data_len, fs, ft, ft_num, filter_size, mag);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_M, data_len, copies, t0, t1, t2, t3);
+
+    Py_DECREF(ap1);
+    return output;
+}
+
+static PyObject* dsp_goertzel_m_cplx(PyObject* self, PyObject* args)
+{
+    PyArrayObject *ap1, *ap2;
+    PyObject *output;
+    int filter_size, fs, ft_num;
+    long int data_len, copies;
+    double *data, *ft, *mag;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
+
+    STATS_TIC(t0);
+    if(!PyArg_ParseTuple(args, "O!iO!i",
+        &PyArray_Type, &ap1, &fs, &PyArray_Type, &ap2, &filter_size)) {
+        return NULL;
+    }
+    if (PyArray_TYPE(ap1) != NPY_CDOUBLE) {
+        PyErr_SetString(PyExc_TypeError, "data should be an array of "
+                        "complex128.");
+        return NULL;
+    }
+
+    copies = N_COPIES(ap1);
+    ap1 = PyArray_GETCONTIGUOUS(ap1);
+
+    // complex128 is laid out as interleaved real and imaginary parts
+    data = (double *)PyArray_DATA(ap1);
+    data_len = (long int)PyArray_DIM(ap1, 0);
+    ft = (double *)PyArray_DATA(ap2);
+    ft_num = (int)PyArray_DIM(ap2, 0);
+    STATS_TIC(t1);
+
+    output = PyArray_SimpleNew(1, PyArray_DIMS(ap2), NPY_DOUBLE);
+    mag = (double *)PyArray_DATA((PyArrayObject *)output);
+    STATS_TIC(t2);
+
+    goertzel_m_cplx(data, data_len, fs, ft, ft_num, filter_size, mag);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_M_CPLX, data_len, copies, t0, t1, t2, t3);
+
+    Py_DECREF(ap1);
+    return output;
+}
+
+static PyObject* dsp_goertzel_m_tiled(PyObject* self, PyObject* args)
+{
+    PyArrayObject *ap1, *ap2;
+    PyObject *output;
+    int filter_size, fs, ft_num, status;
+    long int data_len, copies;
+    double *data, *ft, *mag;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
+
+    STATS_TIC(t0);
+    if(!PyArg_ParseTuple(args, "O!iO!i",
+        &PyArray_Type, &ap1, &fs, &PyArray_Type, &ap2, &filter_size)) {
+        return NULL;
+    }
+    if (ap1 == NULL) return NULL;
+    if (ap2 == NULL) return NULL;
+
+    copies = N_COPIES(ap1);
+    ap1 = PyArray_GETCONTIGUOUS(ap1);
+
+    data = (double *)PyArray_DATA(ap1);
+    data_len = (long int)PyArray_DIM(ap1, 0);
+    ft = (double *)PyArray_DATA(ap2);
+    ft_num = (int)PyArray_DIM(ap2, 0);
+    STATS_TIC(t1);
+
+    output = PyArray_SimpleNew(1, PyArray_DIMS(ap2), NPY_DOUBLE);
+    mag = (double *)PyArray_DATA((PyArrayObject *)output);
+    STATS_TIC(t2);
+
+    status = goertzel_m_tiled(data, data_len, fs, ft, ft_num, filter_size, mag);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_M_TILED, data_len, copies, t0, t1, t2, t3);
 
     Py_DECREF(ap1);
+    if (status != 0) {
+        Py_DECREF(output);
+        return PyErr_NoMemory();
+    }
     return output;
 }
 
+static PyObject* dsp_goertzel_st_mw(PyObject* self, PyObject* args)
+{
+    PyArrayObject *ap1, *ap2, *ap3;
+    PyObject *output;
+    int fs, ft_num, n_widths, padding, status;
+    npy_intp dims[2];
+    long int data_len, copies;
+    double *data, *ft, *mag;
+    int *widths;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
+
+    STATS_TIC(t0);
+    if(!PyArg_ParseTuple(args, "O!iO!O!i",
+        &PyArray_Type, &ap1, &fs, &PyArray_Type, &ap2,
+        &PyArray_Type, &ap3, &padding)) {
+        return NULL;
+    }
+    if (PyArray_TYPE(ap3) != NPY_INT || !PyArray_ISCARRAY_RO(ap3)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "widths should be a contiguous array of C int.");
+        return NULL;
+    }
+
+    copies = N_COPIES(ap1);
+    ap1 = PyArray_GETCONTIGUOUS(ap1);
+
+    data = (double *)PyArray_DATA(ap1);
+    data_len = (long int)PyArray_DIM(ap1, 0);
+    ft = (double *)PyArray_DATA(ap2);
+    ft_num = (int)PyArray_DIM(ap2, 0);
+    widths = (int *)PyArray_DATA(ap3);
+    n_widths = (int)PyArray_DIM(ap3, 0);
+    STATS_TIC(t1);
+
+    dims[0] = n_widths;
+    dims[1] = ft_num;
+    output = PyArray_SimpleNew(2, dims, NPY_DOUBLE);
+    mag = (double *)PyArray_DATA((PyArrayObject *)output);
+    STATS_TIC(t2);
+
+    status = goertzel_st_mw(data, data_len, fs, ft, ft_num, widths, n_widths,
+                            padding, mag);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_ST_MW, data_len, copies, t0, t1, t2, t3);
+
+    Py_DECREF(ap1);
+    if (status != 0) {
+        Py_DECREF(output);
+        return PyErr_NoMemory();
+    }
+    return output;
+}
+
+static PyObject* dsp_goertzel_harmonics(PyObject* self, PyObject* args)
+{
+    PyArrayObject *ap;
+    PyObject *output;
+    int filter_size, fs, n_harmonics, status;
+    npy_intp dims[1];
+    long int data_len, copies;
+    double f0;
+    double *data, *mag;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
+
+    STATS_TIC(t0);
+    if(!PyArg_ParseTuple(args, "O!idii",
+        &PyArray_Type, &ap, &fs, &f0, &n_harmonics, &filter_size)) {
+        return NULL;
+    }
+    if (n_harmonics < 1) {
+        PyErr_SetString(PyExc_ValueError,
+                        "n_harmonics should be a positive integer.");
+        return NULL;
+    }
+
+    copies = N_COPIES(ap);
+    ap = PyArray_GETCONTIGUOUS(ap);
+
+    data = (double *)PyArray_DATA(ap);
+    data_len = (long int)PyArray_DIM(ap, 0);
+    STATS_TIC(t1);
+
+    dims[0] = n_harmonics;
+    output = PyArray_SimpleNew(1, dims, NPY_DOUBLE);
+    mag = (double *)PyArray_DATA((PyArrayObject *)output);
+    STATS_TIC(t2);
+
+    status = goertzel_harmonics(data, data_len, fs, f0, n_harmonics,
+                                filter_size, mag);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_HARMONICS, data_len, copies, t0, t1, t2, t3);
+
+    Py_DECREF(ap);
+    if (status != 0) {
+        Py_DECREF(output);
+        return PyErr_NoMemory();
+    }
+    return output;
+}
+
+static PyObject* dsp_goertzel_m_ragged(PyObject* self, PyObject* args)
+{
+    PyArrayObject *ap1, *ap2, *ap3;
+    PyObject *output;
+    int filter_size, fs, ft_num, tiled, status;
+    npy_intp dims[2];
+    long int data_len, n_clips, copies, i;
+    long int *offsets;
+    double *data, *ft, *mag;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
+
+    STATS_TIC(t0);
+    if(!PyArg_ParseTuple(args, "O!O!iO!ii",
+        &PyArray_Type, &ap1, &PyArray_Type, &ap2, &fs, &PyArray_Type, &ap3,
+        &filter_size, &tiled)) {
+        return NULL;
+    }
+    if (PyArray_TYPE(ap1) != NPY_DOUBLE || PyArray_NDIM(ap1) != 1) {
+        PyErr_SetString(PyExc_TypeError, "data should be a 1-D array of "
+                        "float64.");
+        return NULL;
+    }
+    if (PyArray_TYPE(ap3) != NPY_DOUBLE || !PyArray_ISCARRAY_RO(ap3) ||
+        PyArray_NDIM(ap3) != 1) {
+        PyErr_SetString(PyExc_TypeError,
+                        "ft should be a 1-D contiguous array of float64.");
+        return NULL;
+    }
+    if (PyArray_TYPE(ap2) != NPY_LONG || !PyArray_ISCARRAY_RO(ap2) ||
+        PyArray_NDIM(ap2) != 1 || PyArray_DIM(ap2, 0) < 1) {
+        PyErr_SetString(PyExc_TypeError,
+                        "offsets should be a non-empty contiguous array of "
+                        "C long.");
+        return NULL;
+    }
+
+    data_len = (long int)PyArray_DIM(ap1, 0);
+    n_clips = (long int)PyArray_DIM(ap2, 0) - 1;
+    // Offsets are copied into a private buffer and checked here, the kernel
+    // runs without the GIL and trusts them. (the caller's array could be
+    // modified by other threads meanwhile)
+    offsets = (long int *)malloc((n_clips + 1)*sizeof(long int));
+    if (offsets == NULL) {
+        return PyErr_NoMemory();
+    }
+    memcpy(offsets, PyArray_DATA(ap2), (n_clips + 1)*sizeof(long int));
+    if (offsets[0] < 0 || offsets[n_clips] > data_len) {
+        free(offsets);
+        PyErr_SetString(PyExc_ValueError, "offsets are out of bounds.");
+        return NULL;
+    }
+    for (i = 0; i < n_clips; i++) {
+        if (offsets[i+1] < offsets[i]) {
+            free(offsets);
+            PyErr_SetString(PyExc_ValueError,
+                            "offsets should be non-decreasing.");
+            return NULL;
+        }
+    }
+
+    copies = N_COPIES(ap1);
+    ap1 = PyArray_GETCONTIGUOUS(ap1);
+
+    data = (double *)PyArray_DATA(ap1);
+    ft = (double *)PyArray_DATA(ap3);
+    ft_num = (int)PyArray_DIM(ap3, 0);
+    STATS_TIC(t1);
+
+    dims[0] = n_clips;
+    dims[1] = ft_num;
+    output = PyArray_SimpleNew(2, dims, NPY_DOUBLE);
+    mag = (double *)PyArray_DATA((PyArrayObject *)output);
+    STATS_TIC(t2);
+
+    // Only raw buffers are touched by the kernel, other threads can run
+    // while clips are evaluated.
+    Py_BEGIN_ALLOW_THREADS
+    status = goertzel_m_ragged(data, offsets, n_clips, fs, ft, ft_num,
+                               filter_size, tiled, mag);
+    Py_END_ALLOW_THREADS
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_M_RAGGED, offsets[n_clips] - offsets[0],
+                 copies, t0, t1, t2, t3);
+
+    free(offsets);
+    Py_DECREF(ap1);
+    if (status != 0) {
+        Py_DECREF(output);
+        return PyErr_NoMemory();
+    }
+    return output;
+}
+
+static PyObject* dsp_goertzel_st_detect(PyObject* self, PyObject* args)
+{
+    PyArrayObject *ap1, *ap2, *ap3;
+    PyObject *output;
+    int fs, ft_num, width, check_every, early_exit, status;
+    npy_intp dims[2];
+    long int data_len, copies, n_samples, n_exits;
+    double threshold;
+    double *data, *ft;
+    unsigned char *active, *detected;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
+
+    STATS_TIC(t0);
+    if(!PyArg_ParseTuple(args, "O!iO!idiiO!",
+        &PyArray_Type, &ap1, &fs, &PyArray_Type, &ap2, &width, &threshold,
+        &check_every, &early_exit, &PyArray_Type, &ap3)) {
+        return NULL;
+    }
+    if (width < 1) {
+        PyErr_SetString(PyExc_ValueError, "width should be positive.");
+        return NULL;
+    }
+    data_len = (long int)PyArray_DIM(ap1, 0);
+    if (PyArray_TYPE(ap3) != NPY_UINT8 || !PyArray_ISCARRAY_RO(ap3) ||
+        PyArray_NDIM(ap3) != 1 || PyArray_DIM(ap3, 0) != data_len/width) {
+        PyErr_SetString(PyExc_TypeError,
+                        "active should be a contiguous uint8 array of "
+                        "length `len(data)//width`.");
+        return NULL;
+    }
+
+    copies = N_COPIES(ap1);
+    ap1 = PyArray_GETCONTIGUOUS(ap1);
+
+    data = (double *)PyArray_DATA(ap1);
+    ft = (double *)PyArray_DATA(ap2);
+    ft_num = (int)PyArray_DIM(ap2, 0);
+    active = (unsigned char *)PyArray_DATA(ap3);
+    STATS_TIC(t1);
+
+    dims[0] = data_len/width;
+    dims[1] = ft_num;
+    output = PyArray_SimpleNew(2, dims, NPY_UINT8);
+    detected = (unsigned char *)PyArray_DATA((PyArrayObject *)output);
+    STATS_TIC(t2);
+
+    status = goertzel_st_detect(data, data_len, fs, ft, ft_num, width,
+                                threshold, check_every, early_exit, active,
+                                detected, &n_samples, &n_exits);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_ST_DETECT, data_len, copies, t0, t1, t2, t3);
+
+    Py_DECREF(ap1);
+    if (status != 0) {
+        Py_DECREF(output);
+        return PyErr_NoMemory();
+    }
+    return Py_BuildValue("Nll", output, n_samples, n_exits);
+}
+
+static PyObject* dsp_goertzel_m_nd(PyObject* self, PyObject* args)
+{
+    PyArrayObject *ap1, *ap2, *out;
+    PyArrayIterObject *it_in, *it_out;
+    int filter_size, fs, ft_num, axis, axis_out, ndim, tiled, status, i;
+    int cplx, n_parts;
+    npy_intp out_dims[NPY_MAXDIMS];
+    npy_intp lane_len, in_stride, out_stride, j;
+    long int copies;
+    char *lane;
+    double *data, *ft, *mag, *buf;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
+
+    STATS_TIC(t0);
+    if(!PyArg_ParseTuple(args, "O!iO!iii",
+        &PyArray_Type, &ap1, &fs, &PyArray_Type, &ap2, &filter_size,
+        &axis, &tiled)) {
+        return NULL;
+    }
+    if (ap1 == NULL) return NULL;
+    if (ap2 == NULL) return NULL;
+    if (PyArray_TYPE(ap1) != NPY_DOUBLE && PyArray_TYPE(ap1) != NPY_CDOUBLE) {
+        PyErr_SetString(PyExc_TypeError, "data should be an array of "
+                        "float64 or complex128.");
+        return NULL;
+    }
+    if (PyArray_TYPE(ap2) != NPY_DOUBLE || PyArray_NDIM(ap2) != 1) {
+        PyErr_SetString(PyExc_TypeError, "ft should be a 1-D array of "
+                        "float64.");
+        return NULL;
+    }
+
+    // Complex data (complex128) has 2 parts per sample
+    cplx = PyArray_TYPE(ap1) == NPY_CDOUBLE;
+    n_parts = cplx ? 2 : 1;
+
+    ndim = PyArray_NDIM(ap1);
+    if (axis < 0) axis += ndim;
+    if (axis < 0 || axis >= ndim) {
+        PyErr_SetString(PyExc_ValueError, "Invalid `axis`.");
+        return NULL;
+    }
+
+    ap2 = PyArray_GETCONTIGUOUS(ap2);
+    ft = (double *)PyArray_DATA(ap2);
+    ft_num = (int)PyArray_DIM(ap2, 0);
+
+    for (i = 0; i < ndim; i++)
+    {
+        out_dims[i] = PyArray_DIM(ap1, i);
+    }
+    out_dims[axis] = (npy_intp)ft_num;
+    lane_len = PyArray_DIM(ap1, axis);
+    in_stride = PyArray_STRIDE(ap1, axis);
+    STATS_TIC(t1);
+
+    out = (PyArrayObject *)PyArray_SimpleNew(ndim, out_dims, NPY_DOUBLE);
+    if (out == NULL) {
+        Py_DECREF(ap2);
+        return NULL;
+    }
+    out_stride = PyArray_STRIDE(out, axis);
+
+    // Lanes along `axis` are copied into `buf` one by one only if they are
+    // not contiguous, so that no copy of the whole array is required.
+    buf = (double *)malloc((n_parts*lane_len + ft_num + 1)*sizeof(double));
+    if (buf == NULL) {
+        Py_DECREF(ap2);
+        Py_DECREF(out);
+        return PyErr_NoMemory();
+    }
+    mag = buf + n_parts*lane_len;
+
+    axis_out = axis;
+    it_in = (PyArrayIterObject *)PyArray_IterAllButAxis((PyObject *)ap1, &axis);
+    it_out = (PyArrayIterObject *)PyArray_IterAllButAxis((PyObject *)out, &axis_out);
+    if (it_in == NULL || it_out == NULL) {
+        Py_XDECREF(it_in);
+        Py_XDECREF(it_out);
+        free(buf);
+        Py_DECREF(ap2);
+        Py_DECREF(out);
+        return NULL;
+    }
+    STATS_TIC(t2);
+
+    copies = 0;
+    status = 0;
+    while (it_in->index < it_in->size)
+    {
+        lane = (char *)PyArray_ITER_DATA(it_in);
+        if (in_stride == (npy_intp)(n_parts*sizeof(double)) &&
+            PyArray_ISALIGNED(ap1)) {
+            data = (double *)lane;
+        } else {
+            for (j = 0; j < lane_len; j++)
+            {
+                for (i = 0; i < n_parts; i++)
+                {
+                    buf[n_parts*j + i] =
+                        *((double *)(lane + j*in_stride) + i);
+                }
+            }
+            data = buf;
+            copies++;
+        }
+
+        if (cplx) {
+            goertzel_m_cplx(data, (long int)lane_len, fs, ft, ft_num,
+                            filter_size, mag);
+        } else if (tiled) {
+            status = goertzel_m_tiled(data, (long int)lane_len, fs, ft,
+                                      ft_num, filter_size, mag);
+            if (status != 0) break;
+        } else {
+            goertzel_m(data, (long int)lane_len, fs, ft, ft_num,
+                       filter_size, mag);
+        }
+
+        lane = (char *)PyArray_ITER_DATA(it_out);
+        for (i = 0; i < ft_num; i++)
+        {
+            *(double *)(lane + i*out_stride) = mag[i];
+        }
+
+        PyArray_ITER_NEXT(it_in);
+        PyArray_ITER_NEXT(it_out);
+    }
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_M_ND, (long int)PyArray_SIZE(ap1), copies,
+                 t0, t1, t2, t3);
+
+    Py_DECREF(it_in);
+    Py_DECREF(it_out);
+    free(buf);
+    Py_DECREF(ap2);
+    if (status != 0) {
+        Py_DECREF(out);
+        return PyErr_NoMemory();
+    }
+    return (PyObject *)out;
+}
+
 static PyObject* dsp_goertzel_rng(PyObject* self, PyObject* args)
 {
     PyArrayObject *ap;
@@ -71,24 +570,146 @@ static PyObject* dsp_goertzel_rng(PyObject* self, PyObject* args)
     double *data;
 	
     double magnitude;
+    long int copies;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
 	
+    STATS_TIC(t0);
     if(!PyArg_ParseTuple(args, "O!idid",
         &PyArray_Type, &ap, &fs, &ft, &filter_size, &rng)) {
         return NULL;
     }
     if (ap == NULL) return NULL;
 
+    copies = N_COPIES(ap);
     ap = PyArray_GETCONTIGUOUS(ap);
 
     data = (double *)PyArray_DATA(ap);
     data_len = (long)PyArray_DIM(ap, 0);
+    STATS_TIC(t1);
+    STATS_TIC(t2);
 
     magnitude = goertzel_rng(data, data_len, fs, ft, filter_size, rng);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_GOERTZEL_RNG, data_len, copies, t0, t1, t2, t3);
 
     Py_DECREF(ap);
     return Py_BuildValue("d", magnitude);
 }
 
+static PyObject* dsp_decimate(PyObject* self, PyObject* args)
+{
+    PyArrayObject *ap1, *ap2, *ap3;
+    PyObject *output;
+    int factor, phase, n_taps;
+    long int data_len, copies;
+    npy_intp out_len;
+    double *data, *taps, *state, *out;
+    unsigned long long t0 = 0, t1 = 0, t2 = 0, t3 = 0;
+
+    STATS_TIC(t0);
+    if(!PyArg_ParseTuple(args, "O!O!iO!i",
+        &PyArray_Type, &ap1, &PyArray_Type, &ap2, &factor,
+        &PyArray_Type, &ap3, &phase)) {
+        return NULL;
+    }
+    if (ap1 == NULL) return NULL;
+    if (ap2 == NULL) return NULL;
+    if (ap3 == NULL) return NULL;
+    if (PyArray_TYPE(ap1) != NPY_DOUBLE || PyArray_TYPE(ap2) != NPY_DOUBLE ||
+        PyArray_TYPE(ap3) != NPY_DOUBLE) {
+        PyErr_SetString(PyExc_TypeError,
+                        "data, taps and state should be arrays of float64.");
+        return NULL;
+    }
+
+    n_taps = (int)PyArray_DIM(ap2, 0);
+    if (factor < 1 || phase < 0 || phase >= factor) {
+        PyErr_SetString(PyExc_ValueError, "Invalid decimation factor or phase.");
+        return NULL;
+    }
+    if (PyArray_DIM(ap3, 0) != n_taps - 1 || !PyArray_ISCARRAY(ap3)) {
+        PyErr_SetString(PyExc_ValueError,
+            "State should be a writable contiguous array of size `n_taps - 1`.");
+        return NULL;
+    }
+
+    copies = N_COPIES(ap1) + N_COPIES(ap2);
+    ap1 = PyArray_GETCONTIGUOUS(ap1);
+    ap2 = PyArray_GETCONTIGUOUS(ap2);
+
+    data = (double *)PyArray_DATA(ap1);
+    data_len = (long int)PyArray_DIM(ap1, 0);
+    taps = (double *)PyArray_DATA(ap2);
+    state = (double *)PyArray_DATA(ap3);
+    STATS_TIC(t1);
+
+    out_len = (npy_intp)((data_len - phase + factor - 1) / factor);
+    if (out_len < 0) out_len = 0;
+    output = PyArray_SimpleNew(1, &out_len, NPY_DOUBLE);
+    if (output == NULL) {
+        Py_DECREF(ap1);
+        Py_DECREF(ap2);
+        return NULL;
+    }
+    out = (double *)PyArray_DATA((PyArrayObject *)output);
+    STATS_TIC(t2);
+
+    decimate(data, data_len, taps, n_taps, factor, state, &phase, out);
+    STATS_TIC(t3);
+    STATS_RECORD(STATS_DECIMATE, data_len, copies, t0, t1, t2, t3);
+
+    Py_DECREF(ap1);
+    Py_DECREF(ap2);
+    return Py_BuildValue("(Ni)", output, phase);
+}
+
+static PyObject* dsp_stats_enable(PyObject* self, PyObject* args)
+{
+    int flag, previous;
+
+    if(!PyArg_ParseTuple(args, "i", &flag)) {
+        return NULL;
+    }
+    previous = dsp_stats_enabled;
+    dsp_stats_enabled = flag ? 1 : 0;
+    return PyBool_FromLong(previous);
+}
+
+static PyObject* dsp_stats_snapshot(PyObject* self, PyObject* args)
+{
+    PyObject *snapshot, *entry;
+    dsp_stats_t *st;
+    int i;
+
+    snapshot = PyDict_New();
+    if (snapshot == NULL) return NULL;
+
+    for (i = 0; i < STATS_NUM; i++)
+    {
+        st = &dsp_stats[i];
+        entry = Py_BuildValue("{s:K,s:K,s:K,s:K,s:K,s:K}",
+            "calls", st->calls,
+            "samples", st->samples,
+            "copies", st->copies,
+            "setup_ns", st->setup_ns,
+            "alloc_ns", st->alloc_ns,
+            "kernel_ns", st->kernel_ns);
+        if (entry == NULL || PyDict_SetItemString(snapshot, st->name, entry) < 0) {
+            Py_XDECREF(entry);
+            Py_DECREF(snapshot);
+            return NULL;
+        }
+        Py_DECREF(entry);
+    }
+    return snapshot;
+}
+
+static PyObject* dsp_stats_reset_counters(PyObject* self, PyObject* args)
+{
+    dsp_stats_reset();
+    Py_RETURN_NONE;
+}
+
 /* Set up the methods table */
 static PyMethodDef methods[] = {
     {"goertzel", dsp_goertzel,  // Python name, C name
@@ -97,9 +718,42 @@ static PyMethodDef methods[] = {
     {"goertzel_m", dsp_goertzel_m,
     METH_VARARGS,
     "Goertzel algorithm for multiple target frequency."},
+    {"goertzel_m_cplx", dsp_goertzel_m_cplx,
+    METH_VARARGS,
+    "Goertzel algorithm for multiple target frequency of complex data."},
+    {"goertzel_m_tiled", dsp_goertzel_m_tiled,
+    METH_VARARGS,
+    "Goertzel algorithm for multiple target frequency (tiled over data)."},
+    {"goertzel_m_nd", dsp_goertzel_m_nd,
+    METH_VARARGS,
+    "Goertzel algorithm for multiple target frequency along an axis."},
+    {"goertzel_harmonics", dsp_goertzel_harmonics,
+    METH_VARARGS,
+    "Goertzel algorithm for a fundamental frequency and its harmonics."},
+    {"goertzel_m_ragged", dsp_goertzel_m_ragged,
+    METH_VARARGS,
+    "Goertzel algorithm for multiple target frequency over ragged clips."},
+    {"goertzel_st_mw", dsp_goertzel_st_mw,
+    METH_VARARGS,
+    "Short-time Goertzel algorithm at several block widths in a single pass."},
+    {"goertzel_st_detect", dsp_goertzel_st_detect,
+    METH_VARARGS,
+    "Detect target frequencies in each block with optional early exit."},
     {"goertzel_rng", dsp_goertzel_rng,
     METH_VARARGS,
     "Goertzel algorithm for specific frequency range."},
+    {"decimate", dsp_decimate,
+    METH_VARARGS,
+    "Decimation with a FIR anti-aliasing filter."},
+    {"stats_enable", dsp_stats_enable,
+    METH_VARARGS,
+    "Enable or disable instrumentation, return previous state."},
+    {"stats_snapshot", dsp_stats_snapshot,
+    METH_NOARGS,
+    "Get counters of instrumentation."},
+    {"stats_reset", dsp_stats_reset_counters,
+    METH_NOARGS,
+    "Reset counters of instrumentation."},
     {NULL, NULL, 0, NULL}       // Sentinel
 };
 
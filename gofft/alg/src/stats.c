@@ -0,0 +1,74 @@
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+#include "stats.h"
+
+int dsp_stats_enabled = 0;
+
+dsp_stats_t dsp_stats[STATS_NUM] = {
+    {"goertzel", 0, 0, 0, 0, 0, 0},
+    {"goertzel_m", 0, 0, 0, 0, 0, 0},
+    {"goertzel_m_tiled", 0, 0, 0, 0, 0, 0},
+    {"goertzel_m_nd", 0, 0, 0, 0, 0, 0},
+    {"goertzel_rng", 0, 0, 0, 0, 0, 0},
+    {"decimate", 0, 0, 0, 0, 0, 0},
+    {"goertzel_st_mw", 0, 0, 0, 0, 0, 0},
+    {"goertzel_st_detect", 0, 0, 0, 0, 0, 0},
+    {"goertzel_m_ragged", 0, 0, 0, 0, 0, 0},
+    {"goertzel_m_cplx", 0, 0, 0, 0, 0, 0},
+    {"goertzel_harmonics", 0, 0, 0, 0, 0, 0}
+};
+
+unsigned long long dsp_stats_now(void)
+{
+#ifdef _WIN32
+    static LARGE_INTEGER freq = {0};
+    LARGE_INTEGER cnt;
+
+    if (freq.QuadPart == 0) QueryPerformanceFrequency(&freq);
+    QueryPerformanceCounter(&cnt);
+    return (unsigned long long)((double)cnt.QuadPart*1e9/(double)freq.QuadPart);
+#else
+    struct timespec ts;
+
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (unsigned long long)ts.tv_sec*1000000000ULL
+        + (unsigned long long)ts.tv_nsec;
+#endif
+}
+
+void dsp_stats_reset(void)
+{
+    int i;
+
+    for (i = 0; i < STATS_NUM; i++)
+    {
+        dsp_stats[i].calls = 0;
+        dsp_stats[i].samples = 0;
+        dsp_stats[i].copies = 0;
+        dsp_stats[i].setup_ns = 0;
+        dsp_stats[i].alloc_ns = 0;
+        dsp_stats[i].kernel_ns = 0;
+    }
+}
+
+void dsp_stats_record(int func, long int samples, long int copies,
+                      unsigned long long t_start, unsigned long long t_setup,
+                      unsigned long long t_alloc, unsigned long long t_kernel)
+{
+    dsp_stats_t *st;
+
+    // Timestamps are not available if instrumentation was enabled during
+    // the call.
+    if (t_start == 0) return;
+
+    st = &dsp_stats[func];
+    st->calls += 1;
+    st->samples += (unsigned long long)samples;
+    st->copies += (unsigned long long)copies;
+    st->setup_ns += t_setup - t_start;
+    st->alloc_ns += t_alloc - t_setup;
+    st->kernel_ns += t_kernel - t_alloc;
+}
@@ -0,0 +1,49 @@
+// Opt-in instrumentation of functions in `dsp_ext`.
+// All counters are updated only if `dsp_stats_enabled` is non-zero, so the
+// overhead is a branch per checkpoint when instrumentation is disabled.
+
+enum {
+    STATS_GOERTZEL = 0,
+    STATS_GOERTZEL_M,
+    STATS_GOERTZEL_M_TILED,
+    STATS_GOERTZEL_M_ND,
+    STATS_GOERTZEL_RNG,
+    STATS_DECIMATE,
+    STATS_GOERTZEL_ST_MW,
+    STATS_GOERTZEL_ST_DETECT,
+    STATS_GOERTZEL_M_RAGGED,
+    STATS_GOERTZEL_M_CPLX,
+    STATS_GOERTZEL_HARMONICS,
+    STATS_NUM               // Number of instrumented functions
+};
+
+typedef struct {
+    const char* name;
+    unsigned long long calls;       // Number of calls
+    unsigned long long samples;     // Number of processed samples
+    unsigned long long copies;      // Number of copies of non-contiguous input
+    unsigned long long setup_ns;    // Parsing arguments and copying input
+    unsigned long long alloc_ns;    // Allocating output
+    unsigned long long kernel_ns;   // Running the algorithm
+} dsp_stats_t;
+
+extern int dsp_stats_enabled;
+extern dsp_stats_t dsp_stats[STATS_NUM];
+
+// Monotonic clock in nanoseconds
+unsigned long long dsp_stats_now(void);
+void dsp_stats_reset(void);
+void dsp_stats_record(int func, long int samples, long int copies,
+                      unsigned long long t_start, unsigned long long t_setup,
+                      unsigned long long t_alloc, unsigned long long t_kernel);
+
+// Take a timestamp only if instrumentation is enabled.
+#define STATS_TIC(t) \
+    do { if (dsp_stats_enabled) (t) = dsp_stats_now(); } while (0)
+
+#define STATS_RECORD(func, samples, copies, t0, t1, t2, t3) \
+    do { \
+        if (dsp_stats_enabled) \
+            dsp_stats_record((func), (samples), (copies), \
+                             (t0), (t1), (t2), (t3)); \
+    } while (0)
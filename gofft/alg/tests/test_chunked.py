@@ -0,0 +1,72 @@
+from __future__ import absolute_import, division
+
+import unittest
+import numpy as np
+
+from gofft.alg import (goertzel_st_m, goertzel_st_m_partial, merge_partials,
+                       finalize_partial, goertzel_st_m_chunked)
+
+__all__ = ['TestChunked']
+
+
+class TestChunked(unittest.TestCase):
+    def setUp(self):
+        self.fs = 1000
+        self.width = 500
+        self.ft = np.arange(10, 490, 7, dtype=float)
+        self.data = np.random.RandomState(0).randn(10537)
+        # Chunks of various sizes, some of them are shorter than a block
+        cuts = [3, 400, 410, 1500, 1999, 2000, 2001, 6000, 10000, 10536]
+        self.starts = [0] + cuts
+        self.chunks = np.split(self.data, cuts)
+
+    def _partials(self, engine='auto'):
+        return [goertzel_st_m_partial(c, self.fs, self.ft, self.width,
+                                      start=s, engine=engine)
+                for c, s in zip(self.chunks, self.starts)]
+
+    def test_cmp_with_gostm(self):
+        for padding in [False, True]:
+            expected = goertzel_st_m(self.data, self.fs, self.ft, self.width,
+                                     padding=padding, engine='loop')
+            result = goertzel_st_m_chunked(self.chunks, self.fs, self.ft,
+                                           self.width, padding=padding)
+            np.testing.assert_allclose(result, expected)
+
+    def test_associativity(self):
+        """ States can be merged in any grouping """
+        def merge_tree(partials):
+            if len(partials) == 1:
+                return partials[0]
+            mid = len(partials)//2
+            return merge_tree(partials[:mid]).merge(merge_tree(partials[mid:]))
+
+        for engine in ['loop', 'gemm']:
+            partials = self._partials(engine)
+            linear = merge_partials(partials)
+            tree = merge_tree(partials)
+            self.assertEqual(linear.count, tree.count)
+            np.testing.assert_allclose(finalize_partial(tree, padding=True),
+                                       finalize_partial(linear, padding=True))
+            self.assertEqual(tree.count, len(self.data)//self.width)
+            self.assertEqual(len(tree.tail), len(self.data) % self.width)
+
+    def test_block_info(self):
+        """ Offset of chunk given by `dask.array.map_blocks` """
+        chunk = self.chunks[4]
+        info = {0: {'array-location': [(self.starts[4],
+                                        self.starts[4] + len(chunk))]}}
+        a = goertzel_st_m_partial(chunk, self.fs, self.ft, self.width,
+                                  block_info=info)
+        b = goertzel_st_m_partial(chunk, self.fs, self.ft, self.width,
+                                  start=self.starts[4])
+        self.assertEqual((a.start, a.stop), (b.start, b.stop))
+        np.testing.assert_array_equal(a.head, b.head)
+
+    def test_invalid_merge(self):
+        partials = self._partials()
+        with self.assertRaises(ValueError):
+            partials[0].merge(partials[2])
+        with self.assertRaises(ValueError):
+            # Doesn't start at a block boundary
+            finalize_partial(merge_partials(partials[1:]))
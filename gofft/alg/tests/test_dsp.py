@@ -3,10 +3,14 @@ from __future__ import absolute_import, division
 import unittest
 import numpy as np
 
-from gofft.alg import (goertzel, goertzel_m, goertzel_st, goertzel_st_m, 
-                       fft_eval, stfft_eval)
+from gofft.alg import (goertzel, goertzel_m, goertzel_m_ragged, pack_ragged,
+                       goertzel_harmonics, goertzel_st, goertzel_st_m,
+                       goertzel_st_mw, goertzel_st_detect, fft_eval,
+                       stfft_eval, Decimator, stats, enable_stats,
+                       reset_stats)
+from gofft.alg import dsp_ext as cext
 
-__all__ = ['TestGoertzel']
+__all__ = ['TestGoertzel', 'TestGoertzelND', 'TestDecimator', 'TestStats']
 
 
 class TestGoertzel(unittest.TestCase):
@@ -41,6 +45,71 @@ class TestGoertzel(unittest.TestCase):
         mag_ft_gom = goertzel_m(self.data, self.fs, ft, self.data.size)
         np.testing.assert_allclose(mag_ft_fft, mag_ft_gom)
 
+    def test_cmp_gom_tiled_with_loop(self):
+        """ Tiled engine should give the same result as the default one """
+        ft = np.arange(10, 490, 7, dtype=float)
+        data = np.tile(self.data, 3)
+        mag_ft_loop = goertzel_m(data, self.fs, ft, self.fs, engine='loop')
+        mag_ft_tiled = goertzel_m(data, self.fs, ft, self.fs, engine='tiled')
+        np.testing.assert_allclose(mag_ft_loop, mag_ft_tiled)
+
+    def test_gom_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            goertzel_m(self.data, self.fs, [60], self.fs, engine='foo')
+
+    def test_cmp_gom_decimated_with_fft(self):
+        """ Targets are far below `fs`, so decimation should not matter """
+        ft = np.array([50, 60, 70], dtype=float)
+        mag_ft_fft = self._fft(self.data, self.fs, ft)
+        mag_ft_gom = goertzel_m(self.data, self.fs, ft, self.data.size,
+                                decimate=2)
+        np.testing.assert_allclose(mag_ft_fft, mag_ft_gom, rtol=1e-6, atol=1e-6)
+
+    def test_cmp_gom_decimated_with_full_rate(self):
+        """ In-band DFT terms are kept up to round-off, also for IQ data """
+        t = np.arange(2*self.fs) / self.fs
+        iq = np.exp(2j*np.pi*30*t) + 0.3*np.exp(-2j*np.pi*12*t + 1)
+        ft = np.array([30, -12, 12, 20], dtype=float)
+        expected = goertzel_m(iq, self.fs, ft, self.fs)
+        for q in [2, 5, 8]:
+            result = goertzel_m(iq, self.fs, ft, self.fs, decimate=q)
+            np.testing.assert_allclose(expected, result, rtol=1e-9,
+                                       atol=1e-12)
+
+    def test_gom_invalid_decimation(self):
+        with self.assertRaises(ValueError):
+            # `fs` is not divisible by 3
+            goertzel_m(self.data, self.fs, [60], self.fs, decimate=3)
+        with self.assertRaises(ValueError):
+            # 60 Hz will be aliased when `fs` is decimated to 100 Hz
+            goertzel_m(self.data, self.fs, [60], self.fs, decimate=10)
+
+    def test_cmp_gostm_decimated_with_fft(self):
+        width = self.fs
+        ft = np.array([50, 60, 70], dtype=float)
+        mag_ft_fftstm = self._fft_st(self.data, self.fs, ft, width)
+        mag_ft_gostm = goertzel_st_m(self.data, self.fs, ft, width,
+                                     decimate=4)
+        np.testing.assert_allclose(mag_ft_fftstm, mag_ft_gostm, rtol=1e-6,
+                                   atol=1e-6)
+
+    def test_cmp_gostm_decimated_with_full_rate(self):
+        """ Blocks of N-D data are decimated separately """
+        t = np.arange(2700) / self.fs
+        data = np.stack([np.sin(2*np.pi*20*t), np.cos(2*np.pi*36*t)])
+        ft = np.array([20, 24, 36], dtype=float)
+        for engine in ['loop', 'gemm']:
+            expected = goertzel_st_m(data, self.fs, ft, 500, engine=engine)
+            result = goertzel_st_m(data, self.fs, ft, 500, engine=engine,
+                                   decimate=5)
+            np.testing.assert_allclose(expected, result, rtol=1e-9,
+                                       atol=1e-12)
+        # Zero-padded block is not band-limited, only stop-band leaks
+        expected = goertzel_st_m(data, self.fs, ft, 500, padding=True)
+        result = goertzel_st_m(data, self.fs, ft, 500, padding=True,
+                               decimate=5)
+        np.testing.assert_allclose(expected, result, rtol=1e-6, atol=1e-6)
+
     def test_cmp_gost_with_fft(self):
         width = self.fs
         mag_ft_fftst = self._fft_st(self.data, self.fs, self.ft, width)
@@ -55,6 +124,175 @@ class TestGoertzel(unittest.TestCase):
         mag_ft_gostm = goertzel_st_m(self.data, self.fs, ft, width)
         np.testing.assert_allclose(mag_ft_fftstm, mag_ft_gostm)
 
+    def test_cmp_gostm_gemm_with_loop(self):
+        """ GEMM engine should give the same result as the default one """
+        ft = np.arange(10, 490, 7, dtype=float)
+        data = np.tile(self.data, 3)[:-150]
+        for padding in [False, True]:
+            mag_ft_loop = goertzel_st_m(data, self.fs, ft, 500,
+                                        padding=padding, engine='loop')
+            mag_ft_gemm = goertzel_st_m(data, self.fs, ft, 500,
+                                        padding=padding, engine='gemm')
+            np.testing.assert_allclose(mag_ft_loop, mag_ft_gemm)
+        with self.assertRaises(ValueError):
+            goertzel_st_m(data, self.fs, ft, 500, engine='foo')
+
+    def test_gostm_auto_engine(self):
+        """ GEMM is only selected for enough bins and blocks """
+        from gofft.alg.dsp import (_select_st_m_engine, GEMM_MIN_BINS,
+                                   GEMM_MIN_BLOCKS)
+        self.assertEqual(_select_st_m_engine(3, 1000), 'loop')
+        self.assertEqual(_select_st_m_engine(1000, GEMM_MIN_BLOCKS - 1),
+                         'loop')
+        self.assertEqual(_select_st_m_engine(GEMM_MIN_BINS, GEMM_MIN_BLOCKS),
+                         'gemm')
+
+    def test_cmp_gostmw_with_gostm(self):
+        """ Multi-width version should give the same result per width """
+        ft = np.arange(10, 490, 37, dtype=float)
+        widths = [250, 400, 1000]
+        data = np.tile(self.data, 2)[:-130]
+        for padding in [False, True]:
+            mag_ft_gostmw = goertzel_st_mw(data, self.fs, ft, widths,
+                                           padding=padding)
+            self.assertEqual(mag_ft_gostmw.shape, (len(widths), ft.size))
+            for i, width in enumerate(widths):
+                mag_ft_gostm = goertzel_st_m(data, self.fs, ft, width,
+                                             padding=padding, engine='loop')
+                np.testing.assert_allclose(mag_ft_gostm, mag_ft_gostmw[i])
+
+    def test_gostmw_invalid_widths(self):
+        ft = np.array([50, 60], dtype=float)
+        with self.assertRaises(ValueError):
+            goertzel_st_mw(self.data, self.fs, ft, [0, 100])
+        with self.assertRaises(ValueError):
+            goertzel_st_mw(self.data, self.fs, ft, [self.data.size + 1])
+
+    def test_cmp_harmonics_with_gom(self):
+        """ Harmonics at integer number of cycles, and THD """
+        fs, f0, width = 10240, 50.0, 2048
+        t = np.arange(fs)/fs
+        amps = np.zeros(51)
+        amps[[0, 2, 4, 10, 50]] = [1.0, 0.1, 0.05, 0.02, 0.01]
+        data = sum(a*np.sin(2*np.pi*f0*(h + 1)*t + h)
+                   for h, a in enumerate(amps) if a > 0)
+        mag, thd = goertzel_harmonics(data, fs, f0, 51, width)
+        ft = f0*np.arange(1, 52)
+        np.testing.assert_allclose(mag, goertzel_m(data, fs, ft, width),
+                                   atol=1e-12)
+        np.testing.assert_allclose(2*mag, amps, atol=1e-12)
+        self.assertAlmostEqual(thd, np.sqrt(np.sum(amps[1:]**2)))
+
+        _, thd = goertzel_harmonics(np.zeros(width), fs, f0, 3, width)
+        self.assertTrue(np.isnan(thd))
+        # 103rd harmonic is above Nyquist frequency
+        with self.assertRaises(ValueError):
+            goertzel_harmonics(data, fs, f0, 103, width)
+
+    def test_complex_input(self):
+        """ Positive and negative frequencies of IQ samples """
+        t = np.arange(3000)/self.fs
+        data = np.exp(2j*np.pi*60*t) + 0.5*np.exp(-2j*np.pi*120*t + 1j)
+        ft = np.array([60, -60, 120, -120, 200], dtype=float)
+        expected = fft_eval(data, self.fs, ft)
+        np.testing.assert_allclose(expected[[0, 3]], [1.0, 0.5])
+        np.testing.assert_allclose(
+            goertzel_m(data, self.fs, ft, data.size), expected, atol=1e-12)
+        np.testing.assert_allclose(
+            goertzel(data, self.fs, -120, data.size), 0.5)
+        # Single precision IQ samples are accepted as well
+        np.testing.assert_allclose(
+            goertzel_m(data.astype('complex64'), self.fs, ft, data.size),
+            expected, atol=1e-6)
+        for engine in ['loop', 'tiled', 'gemm']:
+            mag = goertzel_st_m(data, self.fs, ft, 500, engine=engine)
+            np.testing.assert_allclose(mag, expected, atol=1e-12)
+        with self.assertRaises(ValueError):
+            goertzel(data, self.fs, 60, data.size, rng=10)
+        with self.assertRaises(TypeError):
+            goertzel_st_mw(data, self.fs, ft, [500])
+
+    def test_cmp_ragged_with_gom(self):
+        """ Each clip should be evaluated as a call of `goertzel_m` """
+        ft = np.array([50, 60, 70, 120, 180], dtype=float)
+        rng = np.random.RandomState(0)
+        clips = [self.data[:n] for n in rng.randint(1000, 2000, 10)]
+        data, offsets = pack_ragged(clips)
+        self.assertEqual(offsets[-1], data.size)
+        for engine in ['loop', 'tiled']:
+            mag = goertzel_m_ragged(data, offsets, self.fs, ft, engine=engine)
+            self.assertEqual(mag.shape, (len(clips), ft.size))
+            for clip, row in zip(clips, mag):
+                np.testing.assert_allclose(
+                    row, goertzel_m(clip, self.fs, ft, len(clip)))
+            mag = goertzel_m_ragged(data, offsets, self.fs, ft, width=500,
+                                    engine=engine)
+            for clip, row in zip(clips, mag):
+                np.testing.assert_allclose(
+                    row, goertzel_m(clip, self.fs, ft, 500))
+
+    def test_ragged_offsets(self):
+        ft = np.array([50, 60], dtype=float)
+        mag = goertzel_m_ragged(self.data, [0, 0, 1000, 1000], self.fs, ft)
+        np.testing.assert_array_equal(mag[[0, 2]], 0)
+        with self.assertRaises(ValueError):
+            goertzel_m_ragged(self.data, [0, 10, 5], self.fs, ft)
+        with self.assertRaises(ValueError):
+            goertzel_m_ragged(self.data, [0, self.data.size + 1], self.fs, ft)
+        with self.assertRaises(ValueError):
+            goertzel_m_ragged(self.data, [], self.fs, ft)
+        # Arrays of other types are rejected by the extension
+        offsets = np.array([0, 1000], dtype='long')
+        with self.assertRaises(TypeError):
+            cext.goertzel_m_ragged(self.data.astype('float32'), offsets,
+                                   self.fs, ft, 1000, 0)
+        with self.assertRaises(TypeError):
+            cext.goertzel_m_ragged(self.data, offsets, self.fs,
+                                   ft.astype('int64'), 1000, 0)
+
+    def test_gostm_gate(self):
+        """ Silent blocks are skipped, others are evaluated as usual """
+        ft = np.array([50, 60, 70], dtype=float)
+        width = 250
+        data = np.concatenate([np.zeros(3*width), self.data[:2*width],
+                               1e-4*self.data[:3*width]])
+        ref = goertzel_st_m(data, self.fs, ft, width, engine='loop')
+        for engine in ['loop', 'tiled', 'gemm']:
+            mag, info = goertzel_st_m(data, self.fs, ft, width, engine=engine,
+                                      gate=1e-2, return_info=True)
+            self.assertEqual(info, {'blocks': 8, 'skipped': 6})
+            # Error of each skipped block is bounded by the gate
+            np.testing.assert_allclose(mag, ref, atol=1e-2)
+            mag, info = goertzel_st_m(data, self.fs, ft, width, engine=engine,
+                                      gate=0.0, return_info=True)
+            self.assertEqual(info['skipped'], 0)
+            np.testing.assert_allclose(mag, ref)
+
+    def test_gostdetect(self):
+        """ Early exit should not change results of detection """
+        ft = np.array([50, 60, 70, 180], dtype=float)
+        width = 200
+        data = np.concatenate([np.zeros(2*width), self.data,
+                               0.02*self.data[:width]])
+        cnt = len(data)//width
+        # DFT terms of the same bins as Goertzel algorithm
+        k = np.floor(0.5 + width*ft/self.fs)
+        basis = np.exp(-2j*np.pi*np.outer(np.arange(width), k)/width)
+        blocks = data[:cnt*width].reshape(cnt, width)
+        ref = np.abs(np.dot(blocks, basis))/width
+        for threshold in [0.01, 0.1, 0.4]:
+            full = goertzel_st_detect(data, self.fs, ft, width, threshold,
+                                      early_exit=False)
+            np.testing.assert_array_equal(full, ref >= threshold)
+            detected, info = goertzel_st_detect(data, self.fs, ft, width,
+                                                threshold, check_every=8,
+                                                return_info=True)
+            np.testing.assert_array_equal(detected, full)
+            self.assertEqual(info['blocks'], cnt)
+        self.assertEqual(info['skipped'], 3)
+        self.assertGreater(info['early_exits'], 0)
+        self.assertLess(info['work'], 1.0)
+
     def test_cmp_fft_eval_with_fft(self):
         ft = np.array([50, 60, 70], dtype=float)
         mag_ft_tmpl = self._fft(self.data, self.fs, ft)
@@ -90,3 +328,161 @@ class TestGoertzel(unittest.TestCase):
             mag += np.abs(spec[idx])
         mag /= cnt
         return mag
+
+
+class TestGoertzelND(unittest.TestCase):
+    def setUp(self):
+        self.fs = 1000
+        self.ft = np.array([50, 60, 70], dtype=float)
+        # (batch, channel, time)
+        self.data = np.random.RandomState(0).randn(2, 3, 2500)
+
+    def _per_lane(self, func, data, *args, **kwargs):
+        out = np.zeros(data.shape[:-1] + (self.ft.size,))
+        for idx in np.ndindex(*data.shape[:-1]):
+            out[idx] = func(data[idx], *args, **kwargs)
+        return out
+
+    def test_gom_last_axis(self):
+        expected = self._per_lane(goertzel_m, self.data, self.fs, self.ft,
+                                  self.fs)
+        for engine in ['loop', 'tiled']:
+            result = goertzel_m(self.data, self.fs, self.ft, self.fs,
+                                engine=engine)
+            self.assertEqual(result.shape, (2, 3, 3))
+            np.testing.assert_allclose(expected, result)
+
+    def test_gom_complex(self):
+        data = self.data + 1j*self.data[:, ::-1]
+        expected = np.zeros(data.shape[:-1] + (self.ft.size,))
+        for idx in np.ndindex(*data.shape[:-1]):
+            expected[idx] = goertzel_m(data[idx], self.fs, self.ft, self.fs)
+        result = goertzel_m(np.moveaxis(data, -1, 0), self.fs, self.ft,
+                            self.fs, axis=0)
+        np.testing.assert_allclose(np.moveaxis(expected, -1, 0), result)
+
+    def test_gom_first_axis(self):
+        """ Data along `axis` is not contiguous """
+        expected = self._per_lane(goertzel_m, self.data, self.fs, self.ft,
+                                  self.fs)
+        data = np.transpose(self.data, (2, 0, 1))
+        result = goertzel_m(data, self.fs, self.ft, self.fs, axis=0)
+        self.assertEqual(result.shape, (3, 2, 3))
+        np.testing.assert_allclose(np.transpose(expected, (2, 0, 1)), result)
+
+    def test_ext_dtype(self):
+        """ Arrays of other types are rejected by the extension """
+        with self.assertRaises(TypeError):
+            cext.goertzel_m_nd(self.data.astype('float32'), self.fs, self.ft,
+                               self.fs, -1, 0)
+        with self.assertRaises(TypeError):
+            cext.goertzel_m_nd(self.data, self.fs, self.ft.astype('int64'),
+                               self.fs, -1, 0)
+
+    def test_gostm(self):
+        for padding in [False, True]:
+            expected = self._per_lane(goertzel_st_m, self.data, self.fs,
+                                      self.ft, self.fs, padding=padding)
+            result = goertzel_st_m(self.data, self.fs, self.ft, self.fs,
+                                   padding=padding)
+            np.testing.assert_allclose(expected, result)
+
+    def test_gostm_gemm(self):
+        expected = self._per_lane(goertzel_st_m, self.data, self.fs, self.ft,
+                                  self.fs, padding=True, engine='loop')
+        data = np.transpose(self.data, (2, 0, 1))
+        result = goertzel_st_m(data, self.fs, self.ft, self.fs, padding=True,
+                               axis=0, engine='gemm')
+        self.assertEqual(result.shape, (3, 2, 3))
+        np.testing.assert_allclose(np.transpose(expected, (2, 0, 1)), result)
+
+    def test_fft_eval(self):
+        expected = self._per_lane(fft_eval, self.data, self.fs, self.ft)
+        data = np.transpose(self.data, (0, 2, 1))
+        result = fft_eval(data, self.fs, self.ft, axis=1)
+        np.testing.assert_allclose(np.transpose(expected, (0, 2, 1)), result)
+
+
+class TestDecimator(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.RandomState(0).randn(1000)
+
+    def test_streaming(self):
+        """ Feeding data in chunks should give the same result """
+        expected = Decimator(4).process(self.data)
+        decimator = Decimator(4)
+        chunks = np.split(self.data, [7, 10, 11, 250, 333, 999])
+        result = np.concatenate([decimator.process(c) for c in chunks])
+        np.testing.assert_allclose(expected, result)
+
+    def test_streaming_complex(self):
+        """ Real and imaginary parts are filtered with separated states """
+        iq = self.data + 1j*self.data[::-1]
+        expected = (Decimator(4).process(self.data) +
+                    1j*Decimator(4).process(self.data[::-1]))
+        decimator = Decimator(4)
+        chunks = np.split(iq, [7, 10, 11, 250, 333, 999])
+        result = np.concatenate([decimator.process(c) for c in chunks])
+        np.testing.assert_allclose(expected, result)
+        # Tail of imaginary part is kept when real data follows
+        tail = decimator.process(np.zeros(10))
+        self.assertTrue(np.iscomplexobj(tail))
+        self.assertTrue(np.any(tail.imag != 0))
+
+    def test_output_length(self):
+        out = Decimator(3).process(self.data)
+        self.assertEqual(out.size, (self.data.size + 2) // 3)
+
+    def test_ext_dtype(self):
+        """ Arrays of other types are rejected by the extension """
+        decimator = Decimator(4)
+        with self.assertRaises(TypeError):
+            cext.decimate(self.data.astype('float32'), decimator.taps, 4,
+                          decimator.state, 0)
+
+    def test_reset(self):
+        decimator = Decimator(4)
+        first = decimator.process(self.data)
+        decimator.reset()
+        np.testing.assert_allclose(first, decimator.process(self.data))
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.RandomState(0).randn(2000)
+        self.previous = enable_stats(False)
+        reset_stats()
+
+    def tearDown(self):
+        enable_stats(self.previous)
+        reset_stats()
+
+    def test_disabled(self):
+        goertzel_m(self.data, 1000, [50, 60], 1000)
+        self.assertEqual(stats()['goertzel_m']['calls'], 0)
+
+    def test_counters(self):
+        enable_stats(True)
+        goertzel_m(self.data, 1000, [50, 60], 1000)
+        # Non-contiguous input should be copied
+        goertzel_m(self.data[::2], 1000, [50, 60], 1000)
+        snapshot = stats(reset=True)
+
+        st = snapshot['goertzel_m']
+        self.assertEqual(st['calls'], 2)
+        self.assertEqual(st['samples'], 3000)
+        self.assertEqual(st['copies'], 1)
+        self.assertTrue(st['kernel_ns'] > 0)
+        self.assertEqual(snapshot['goertzel']['calls'], 0)
+        self.assertEqual(stats()['goertzel_m']['calls'], 0)
+
+    def test_auto_decimation(self):
+        enable_stats(True)
+        # Filter doesn't pay off for a single target frequency
+        goertzel_m(self.data, 1000, [20], 1000, decimate='auto')
+        self.assertEqual(stats(reset=True)['decimate']['calls'], 0)
+        goertzel_m(self.data, 1000, np.linspace(5, 25, 16), 1000,
+                   decimate='auto')
+        snapshot = stats()
+        self.assertEqual(snapshot['decimate']['calls'], 1)
+        self.assertEqual(snapshot['goertzel_m']['samples'], 200)
@@ -2,9 +2,33 @@ from __future__ import absolute_import, division, print_function
 
 from . import core
 from .core import *
+from . import discovery
+from .discovery import *
 from . import logger
 from .logger import *
+from . import importtime
+from .importtime import *
+from . import stats
+from .stats import *
+from . import store
+from .store import *
+from . import memory
+from .memory import *
+from . import signals
+from .signals import *
+from . import throughput
+from .throughput import *
+from . import accuracy
+from .accuracy import *
 
 __all__ = []
 __all__.extend(core.__all__)
+__all__.extend(discovery.__all__)
 __all__.extend(logger.__all__)
+__all__.extend(importtime.__all__)
+__all__.extend(stats.__all__)
+__all__.extend(store.__all__)
+__all__.extend(memory.__all__)
+__all__.extend(signals.__all__)
+__all__.extend(throughput.__all__)
+__all__.extend(accuracy.__all__)
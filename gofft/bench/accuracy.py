@@ -0,0 +1,349 @@
+from __future__ import absolute_import, division
+
+import csv
+import itertools
+import numpy as np
+
+__all__ = ['ACCURACY_COLUMNS', 'CrossCheckEngine', 'default_engines',
+           'reference_dft', 'reference_st_dft', 'cross_check',
+           'budget_failures', 'write_accuracy_csv']
+
+
+# Columns of records of `cross_check()`
+# - max_error: max absolute error of magnitudes relative to RMS of signal
+# - budget: error budget of engine
+# - time: median time (in seconds) of a call
+ACCURACY_COLUMNS = ['engine', 'dtype', 'length', 'width', 'n_bins',
+                    'max_error', 'budget', 'time', 'samples_per_s', 'passed']
+
+# pi in extended precision (`np.pi` is rounded to float64)
+_PI = np.arccos(np.longdouble(-1))
+
+
+class CrossCheckEngine(object):
+    """
+    An evaluation path to be cross-checked against a reference.
+
+    Parameters
+    ----------
+    name : str
+        Name of engine, e.g. 'goertzel_m[tiled]'.
+    func : callable
+        `func(data, fs, ft, width)`, returns magnitudes of `ft`.
+    reference : callable
+        `reference(data, fs, ft, width)` of the same signature, evaluated
+        in extended precision, e.g. `reference_dft`.
+    budget : float
+        Maximal error (relative to RMS of signal) allowed for this engine.
+    complex_input : bool, optional
+        Whether complex signals are supported.
+    max_ft : float, optional
+        Maximal absolute target frequency (relative to `fs`) evaluated by
+        this engine, e.g. for decimated evaluation. Other target frequencies
+        of the sweep are left out.
+    """
+    def __init__(self, name, func, reference, budget, complex_input=False,
+                 max_ft=None):
+        self.name = name
+        self.func = func
+        self.reference = reference
+        self.budget = budget
+        self.complex_input = complex_input
+        self.max_ft = max_ft
+
+
+def _goertzel_bins(fs, ft, width):
+    # Same bins as C kernels: k = floor(0.5 + width*ft/fs) (in float64)
+    ft = np.atleast_1d(np.asarray(ft, dtype='float64'))
+    return np.floor(0.5 + (width*ft)/float(fs)).astype('int64')
+
+
+def _fft_bins(fs, ft, length):
+    # Same bins as `fft_eval`: truncated `ft/fs*length`
+    ft = np.atleast_1d(np.asarray(ft, dtype='float64'))
+    return (ft/fs*length).astype('int64')
+
+
+def _dft_mag(x, bins, period):
+    """
+    Magnitudes of DFT terms `2*pi*bins/period` of rows of `x`, evaluated
+    in extended precision. Phases are reduced exactly by integer arithmetic,
+    and cos/sin are looked up from a table of `period` entries.
+    """
+    table = 2*_PI*np.arange(period, dtype='int64').astype(np.longdouble)
+    table /= period
+    cos_table, sin_table = np.cos(table), np.sin(table)
+    n = np.arange(x.shape[-1], dtype='int64')
+    idx = np.outer(n, bins) % period
+    cos, sin = cos_table[idx], sin_table[idx]
+    re = np.real(x).astype(np.longdouble)
+    if np.iscomplexobj(x):
+        im = np.imag(x).astype(np.longdouble)
+        real = np.dot(re, cos) + np.dot(im, sin)
+        imag = np.dot(im, cos) - np.dot(re, sin)
+    else:
+        real = np.dot(re, cos)
+        imag = -np.dot(re, sin)
+    return np.sqrt(real*real + imag*imag)
+
+
+def reference_dft(data, fs, ft, width, fft_bins=False):
+    """
+    Reference of `goertzel_m` (or `fft_eval` if `fft_bins` is True) in
+    extended precision (`np.longdouble`).
+
+    Returns
+    -------
+    mag : ndarray of longdouble
+        DFT terms over the whole `data` (1-D), normalized by its length.
+    """
+    if fft_bins:
+        bins, period = _fft_bins(fs, ft, len(data)), len(data)
+    else:
+        bins, period = _goertzel_bins(fs, ft, width), width
+    return _dft_mag(data, bins, period)/len(data)
+
+
+def reference_st_dft(data, fs, ft, width, padding=False, fft_bins=False):
+    """
+    Reference of `goertzel_st_m` (or `stfft_eval` if `fft_bins` is True)
+    in extended precision, i.e. mean of `reference_dft` of blocks.
+    """
+    cnt = len(data)//width
+    blocks = data[:cnt*width].reshape(cnt, width)
+    if padding and len(data)%width != 0:
+        last = np.zeros((1, width), dtype=data.dtype)
+        last[0, :len(data)%width] = data[cnt*width:]
+        blocks = np.vstack([blocks, last])
+    if fft_bins:
+        bins = _fft_bins(fs, ft, width)
+    else:
+        bins = _goertzel_bins(fs, ft, width)
+    return (_dft_mag(blocks, bins, width)/width).mean(axis=0)
+
+
+def _reference_rng(data, fs, ft, width, rng):
+    # Sum of magnitudes of bins in `[ft, ft + rng)`, see `goertzel_rng`
+    f_step = fs/float(width)
+    ks = np.floor(0.5 + ft/f_step).astype('int64')
+    ke = np.floor(0.5 + (ft + rng)/f_step).astype('int64')
+    # All bins are evaluated at once, then summed over ranges
+    bins = np.concatenate([np.arange(s, e) for s, e in zip(ks, ke)])
+    mag = _dft_mag(data, bins.astype('int64'), width)/len(data)
+    ends = np.cumsum(ke - ks)
+    return np.array([mag[e - n:e].sum() for n, e in zip(ke - ks, ends)])
+
+
+def default_engines():
+    """
+    Engines of `gofft.alg` to be cross-checked. Budgets leave a margin of
+    about two orders of magnitude over errors observed with signals of up
+    to 2**16 samples.
+
+    Returns
+    -------
+    engines : list of CrossCheckEngine
+    """
+    from gofft.alg import (goertzel, goertzel_m, goertzel_m_ragged,
+                           goertzel_st_m, fft_eval, stfft_eval)
+
+    def _goertzel(data, fs, ft, width):
+        return np.array([goertzel(data, fs, f, width) for f in ft])
+
+    def _goertzel_rng(data, fs, ft, width):
+        # 3 bins above each target frequency
+        rng = 3.0*fs/width
+        return np.array([goertzel(data, fs, f, width, rng=rng) for f in ft])
+
+    def _ref_rng(data, fs, ft, width):
+        return _reference_rng(data, fs, ft, width, 3.0*fs/width)
+
+    def _goertzel_m(engine):
+        return lambda data, fs, ft, width: goertzel_m(data, fs, ft, width,
+                                                      engine)
+
+    def _ragged(data, fs, ft, width):
+        return goertzel_m_ragged(data, [0, len(data)], fs, ft, width)[0]
+
+    def _decimated(data, fs, ft, width):
+        # The largest factor which keeps `fs / factor >= 4 * max(ft)`
+        q_max = int(fs // (4*np.max(np.abs(ft))))
+        q = max(q for q in range(1, max(q_max, 1) + 1)
+                if fs % q == 0 and width % q == 0)
+        return goertzel_m(data, fs, ft, width, decimate=q)
+
+    def _goertzel_st_m(engine):
+        return lambda data, fs, ft, width: goertzel_st_m(
+            data, fs, ft, width, engine=engine)
+
+    def _fft_eval(data, fs, ft, width):
+        return fft_eval(data, fs, ft)
+
+    def _ref_fft(data, fs, ft, width):
+        return reference_dft(data, fs, ft, width, fft_bins=True)
+
+    def _ref_stfft(data, fs, ft, width):
+        return reference_st_dft(data, fs, ft, width, fft_bins=True)
+
+    # Errors of Goertzel recurrence grow with the number of samples, errors
+    # of block-wise engines are bounded by the width of blocks.
+    return [
+        CrossCheckEngine('goertzel', _goertzel, reference_dft, 1e-10, True),
+        CrossCheckEngine('goertzel_rng', _goertzel_rng, _ref_rng, 1e-10),
+        CrossCheckEngine('goertzel_m[loop]', _goertzel_m('loop'),
+                         reference_dft, 1e-10, True),
+        CrossCheckEngine('goertzel_m[tiled]', _goertzel_m('tiled'),
+                         reference_dft, 1e-10),
+        CrossCheckEngine('goertzel_m_ragged', _ragged, reference_dft, 1e-10),
+        # Errors of decimation are aliases of stop-band of the anti-aliasing
+        # filter rather than round-off (observed below 5e-5), its budget
+        # still catches a biased filter (e.g. transient or delay in blocks)
+        CrossCheckEngine('goertzel_m[decimate]', _decimated, reference_dft,
+                         1e-3, True, max_ft=1/16.0),
+        CrossCheckEngine('goertzel_st_m[loop]', _goertzel_st_m('loop'),
+                         reference_st_dft, 1e-11, True),
+        CrossCheckEngine('goertzel_st_m[tiled]', _goertzel_st_m('tiled'),
+                         reference_st_dft, 1e-11, True),
+        CrossCheckEngine('goertzel_st_m[gemm]', _goertzel_st_m('gemm'),
+                         reference_st_dft, 1e-11, True),
+        CrossCheckEngine('fft_eval', _fft_eval, _ref_fft, 1e-14, True),
+        CrossCheckEngine('stfft_eval', stfft_eval, _ref_stfft, 1e-14, True),
+    ]
+
+
+def _make_signal(length, fs, dtype, rng):
+    from .signals import multitone
+
+    # Tones at random (not bin-centered) frequencies plus noise
+    freqs = rng.uniform(0, fs/2.0, 5)
+    seed = rng.randint(2**31)
+    if np.dtype(dtype).kind == 'c':
+        real = multitone(length, fs, freqs, noise_level=0.1, seed=seed)
+        imag = multitone(length, fs, freqs, noise_level=0.1, seed=seed + 1)
+        return (real + 1j*imag).astype(dtype)
+    return multitone(length, fs, freqs, noise_level=0.1, seed=seed,
+                     dtype=dtype)
+
+
+def _time_call(func, args, min_time, repeat=3):
+    """ Median time (in seconds) of a call, see also `BenchmarkCase`. """
+    from .core import default_timer_ns
+
+    func(*args)
+    loops = 1
+    while True:
+        st = default_timer_ns()
+        for _ in range(loops):
+            func(*args)
+        elapsed = (default_timer_ns() - st)*1e-9
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed*10 >= min_time else 10
+    times = [elapsed/loops]
+    for _ in range(repeat - 1):
+        st = default_timer_ns()
+        for _ in range(loops):
+            func(*args)
+        times.append((default_timer_ns() - st)*1e-9/loops)
+    return float(np.median(times))
+
+
+def cross_check(engines=None, lengths=(4000, 32000), widths=(250, 1000),
+                dtypes=('float64', 'float32', 'int16', 'complex128'),
+                n_bins=(1, 16, 128), fs=1000, seed=0, min_time=0.005,
+                stream=None):
+    """
+    Sweep random signals, widths, dtypes and numbers of target frequencies
+    (K), and record errors of engines against an extended-precision
+    reference next to their timing.
+
+    Parameters
+    ----------
+    engines : list of CrossCheckEngine, optional
+        Default: `default_engines()`.
+    lengths, widths, dtypes, n_bins : sequence
+        Values of the sweep. Combinations which are not accepted by
+        `goertzel_m` (`width > length` or `fs > length`) are skipped.
+    fs : int, optional
+        Sampling frequency.
+    seed : int, optional
+        Seed of random signals and target frequencies.
+    min_time : float, optional
+        Minimal time (in seconds) of a measurement. If it's None, engines
+        are not timed.
+    stream : file, optional
+        Stream of progress messages.
+
+    Returns
+    -------
+    records : list of dict
+        One record per engine and combination, keys are `ACCURACY_COLUMNS`.
+        An engine fails (`passed` is False) if its error exceeds its budget,
+        see also `budget_failures()`.
+    """
+    if engines is None:
+        engines = default_engines()
+    rng = np.random.RandomState(seed)
+    records = []
+    for length, width, dtype, k in itertools.product(lengths, widths,
+                                                     dtypes, n_bins):
+        if width > length or fs > length:
+            continue
+        data = _make_signal(length, fs, dtype, rng)
+        is_complex = np.iscomplexobj(data)
+        # Negative frequencies are distinct bins of complex signals
+        low = -fs/2.0 if is_complex else 0.0
+        ft = np.sort(rng.uniform(low, fs/2.0, k))
+        scale = np.sqrt(np.mean(np.abs(data.astype(np.clongdouble))**2))
+        if scale == 0:
+            scale = 1.0
+
+        refs = {}
+        for engine in engines:
+            if is_complex and not engine.complex_input:
+                continue
+            eft = ft
+            if engine.max_ft is not None:
+                eft = ft[np.abs(ft) <= engine.max_ft*fs]
+                if eft.size == 0:
+                    continue
+            key = (engine.reference, engine.max_ft)
+            if key not in refs:
+                refs[key] = engine.reference(data, fs, eft, width)
+            ref = refs[key]
+            args = (data, fs, eft, width)
+            val = np.asarray(engine.func(*args), dtype=np.longdouble)
+            error = float(np.max(np.abs(val - ref))/scale)
+            elapsed = (float('nan') if min_time is None else
+                       _time_call(engine.func, args, min_time))
+            records.append({
+                'engine': engine.name, 'dtype': np.dtype(dtype).name,
+                'length': length, 'width': width, 'n_bins': eft.size,
+                'max_error': error, 'budget': engine.budget,
+                'time': elapsed, 'samples_per_s': length/elapsed,
+                'passed': error <= engine.budget,
+            })
+            if stream is not None:
+                stream.write('{0:<22} {1:<10} length={2} width={3} K={4}: '
+                             'error {5:.2e}{6}\n'.format(
+                                 engine.name, np.dtype(dtype).name, length,
+                                 width, eft.size, error,
+                                 '' if records[-1]['passed'] else
+                                 ' (budget {0:.0e} exceeded)'.format(
+                                     engine.budget)))
+    return records
+
+
+def budget_failures(records):
+    """ Records of engines whose errors exceed their budgets. """
+    return [r for r in records if not r['passed']]
+
+
+def write_accuracy_csv(records, path):
+    """ Write records of `cross_check()` into a CSV file. """
+    with open(path, 'w') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(ACCURACY_COLUMNS)
+        for r in records:
+            writer.writerow([repr(r[c]) if isinstance(r[c], float) else r[c]
+                             for c in ACCURACY_COLUMNS])
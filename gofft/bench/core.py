@@ -3,28 +3,51 @@ from __future__ import absolute_import, division
 import os
 import sys
 import time
+import threading
 import numpy as np
-from .logger import LogWriter
-
-# Definition in `timeit` module
-if sys.platform == "win32":
-    # On Windows, the best timer is time.clock()
-    default_timer = time.clock
+from .discovery import DiscoveryIndex, match_patterns
+from .logger import LogWriter, log_columns
+from .memory import MemoryProfiler, MEMORY_COLUMNS
+from .stats import (summarize, latency_stats, latency_histogram,
+                    SUMMARY_COLUMNS, LATENCY_COLUMNS, LATENCY_BINS)
+from .store import ResultStore
+from .throughput import derive_throughput, THROUGHPUT_COLUMNS
+
+# Monotonic timer with the highest available resolution (in nanoseconds)
+if hasattr(time, 'perf_counter_ns'):
+    default_timer_ns = time.perf_counter_ns
 else:
-    # On most other platforms the best timer is time.time()
-    default_timer = time.time
+    _timer = getattr(time, 'perf_counter', time.time)
+
+    def default_timer_ns():
+        return int(_timer()*1e9)
+
+
+__all__ = ['BenchmarkCase', 'StreamingBenchmarkCase', 'BenchmarkSuite',
+           'BenchmarkLoader', 'BenchmarkRunner', 'expand_param_grid',
+           'format_params']
 
+# Environment variables of thread count of BLAS libraries
+_BLAS_THREAD_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                     'MKL_NUM_THREADS')
 
-__all__ = ['BenchmarkCase', 'BenchmarkSuite', 'BenchmarkLoader', 'BenchmarkRunner']
+# Optional results of a case, which are passed back from isolated workers
+_OPTIONAL_RESULTS = ('memlog', 'throughput', 'latency', 'histogram')
 
 
 class BenchmarkCase(object):
     data = None
+    # Grid of parameters, e.g. `{'width': [250, 1000], 'dtype': ['float64']}`.
+    # A case is expanded into one sub-case per combination of parameters by
+    # `BenchmarkLoader`, and the combination is available as `self.params`.
+    param_grid = {}
 
-    def __init__(self, func_name, enable_logging=True, stream=sys.stderr):
+    def __init__(self, func_name, enable_logging=True, stream=sys.stderr,
+                 params=None):
         self.func_name = func_name
         self.enable_logging = enable_logging
         self.stream = stream
+        self.params = dict(params) if params is not None else {}
 
         # Default arguments for benchmark. User can modify them in `self.set_up()`
         self.args = ()
@@ -32,6 +55,22 @@ class BenchmarkCase(object):
         self.step = 100
         self.rd = 3
 
+        # Number of calls before measurement of each step
+        self.warmup = 1
+        # Minimum time (in seconds) of a measurement. Function is called
+        # repeatedly in a measurement until this time is reached, so that
+        # kernels running in microseconds can be measured accurately.
+        self.min_time = 0.005
+        self.confidence = 0.95
+        # Profile peak memory usage of each step by an extra call
+        self.profile_memory = False
+
+        # Results of the latest run
+        self.loops = None
+        self.summary = None
+        self.memlog = None
+        self.throughput = None
+
     def set_up(self):
         pass
 
@@ -46,6 +85,28 @@ class BenchmarkCase(object):
     def tear_down_class(cls):
         pass
 
+    def work(self, length):
+        """
+        Op-count model of benchmarked function, i.e. amount of work done by
+        a call with data of given length. It's used to derive throughput
+        metrics (samples/s, bins*samples/s, FLOP/s and bandwidth).
+
+        By default, `work_<name>(length)` is called for `time_<name>` if it
+        is defined, otherwise only the number of samples is known.
+
+        Returns
+        -------
+        work : dict
+            Keys are in `WORK_KEYS`: 'samples', 'bins', 'flops', 'bytes'.
+        """
+        name = self.func_name.split('_', 1)[-1]
+        model = getattr(self, 'work_' + name, None)
+        if model is None:
+            return {'samples': length}
+        work = {'samples': length}
+        work.update(model(length))
+        return work
+
     def _check_bench_args(self):
         if self.data is None:
             raise ValueError('No data availabe.')
@@ -55,41 +116,241 @@ class BenchmarkCase(object):
             raise ValueError('Size of data is not large enough to be partitioned'
                 'proportionally. It should at least equal to `step`.')
 
+    def _time_loops(self, func, data, loops):
+        """ Return elapsed time (in nanoseconds) of calling `func` `loops` times. """
+        args, kwargs = self.args, self.kwargs
+        st = default_timer_ns()
+        for _ in range(loops):
+            func(data, *args, **kwargs)
+        et = default_timer_ns()
+        return et - st
+
+    def _calibrate(self, func, data):
+        """
+        Run warmup calls, then find the number of loops which makes a
+        measurement take at least `self.min_time` (1, 2, 5, 10, 20, ...).
+        """
+        for _ in range(self.warmup):
+            func(data, *self.args, **self.kwargs)
+
+        min_time_ns = self.min_time*1e9
+        i = 1
+        while True:
+            for j in (1, 2, 5):
+                loops = i*j
+                if self._time_loops(func, data, loops) >= min_time_ns:
+                    return loops
+            i *= 10
+
     def run(self):
         try:
             self.set_up()
             self._check_bench_args()
         except:
             raise
-        self.stream.write('Current running: {}\n'.format(self.func_name))
+        self.stream.write('Current running: {}{}\n'.format(
+            self.func_name, format_params(self.params)))
 
         # NOTE:
         # 1. First row should be zero (no data input) -> self.step + 1
         # 2. Data length in each step should be written in log too -> self.rd + 1
         tlog = np.zeros((self.step + 1, self.rd + 1))
+        self.loops = np.zeros(self.step + 1, dtype='int')
+        if self.profile_memory:
+            profiler = MemoryProfiler()
+            self.memlog = np.zeros((self.step + 1, len(MEMORY_COLUMNS)))
+        else:
+            self.memlog = None
 
         msg_progress = 'progress: {}/{}\r'
         func = getattr(self, self.func_name)
         try:
             for i in range(1, self.step+1):
                 rlen = len(self.data)*i//self.step
+                data = self.data[:rlen]
                 tlog[i, 0] = rlen
+                loops = self._calibrate(func, data)
+                self.loops[i] = loops
                 for r in range(self.rd):
-                    st = default_timer()
-                    func(self.data[:rlen], *self.args, **self.kwargs)
-                    et = default_timer()
-                    tlog[i, r+1] = et - st
+                    elapsed = self._time_loops(func, data, loops)
+                    tlog[i, r+1] = elapsed*1e-9/loops
+                if self.memlog is not None:
+                    self.memlog[i] = profiler.profile(func, data, *self.args,
+                                                      **self.kwargs)
                 self.stream.write(msg_progress.format(i, self.step))
         except:
             raise
         finally:
             self.tear_down()
+
+        self.summary = summarize(tlog, self.confidence)
+        # Throughput is derived from median of elapsed time
+        work = [self.work(int(v)) for v in self.summary[:, 0]]
+        self.throughput = derive_throughput(work, self.summary[:, 1])
+        self._report_summary()
         return tlog
 
+    def _report_summary(self):
+        if self.summary is None or len(self.summary) == 0:
+            return
+        length, med, iqr, lo, hi, outliers = self.summary[-1]
+        msg = ('\nlength {0:.0f}: median {1:.3e} s, IQR {2:.3e} s, '
+               '{3:.0%} CI [{4:.3e}, {5:.3e}] s, outliers: {6:.0f}/{7}\n')
+        self.stream.write(msg.format(length, med, iqr, self.confidence, lo, hi,
+                                     outliers, self.rd))
+        if self.throughput is None or len(self.throughput) == 0:
+            return
+        samples, bin_samples, flops, bandwidth = self.throughput[-1]
+        msg = '{0:.3e} samples/s'.format(samples)
+        if not np.isnan(bin_samples):
+            msg += ', {0:.3e} bins*samples/s'.format(bin_samples)
+        if not np.isnan(flops):
+            msg += ', {0:.3f} GFLOP/s'.format(flops*1e-9)
+        if not np.isnan(bandwidth):
+            msg += ', {0:.3f} GB/s'.format(bandwidth*1e-9)
+        self.stream.write(msg + '\n')
+
     def __call__(self):
         return self.run()
 
 
+class StreamingBenchmarkCase(BenchmarkCase):
+    """
+    Benchmark of per-chunk latency under streaming use. `self.data` is fed
+    into benchmark function chunk by chunk, i.e. `func(chunk, *args,
+    **kwargs)`, which is expected to keep its state (e.g. partial states of
+    Goertzel algorithm) between calls. The state should be cleared in
+    `reset_stream()`, which is called before each round.
+
+    Each row of log is a chunk size (column `length`), elapsed time of a
+    round is the median latency of chunks in that round, and percentiles
+    and jitter of latency of all rounds are appended as `LATENCY_COLUMNS`.
+    Throughput is derived from the mean latency (i.e. total time over number
+    of chunks), so that work done only at some chunks (e.g. at boundaries of
+    blocks) is amortized over all chunks; `work_<name>(n)` should be the
+    work per chunk of `n` samples on average.
+    Histograms of latency (bins: `LATENCY_BINS`) are kept in
+    `self.histogram`, one column per chunk size after the lower edges of
+    bins.
+    """
+    def __init__(self, func_name, enable_logging=True, stream=sys.stderr,
+                 params=None):
+        super(StreamingBenchmarkCase, self).__init__(
+            func_name, enable_logging=enable_logging, stream=stream,
+            params=params)
+        # Sizes of chunks to be benchmarked
+        self.chunk_sizes = [64, 256, 1024, 4096]
+        # Arrival rate of samples (samples/s). If it's given, a chunk arrives
+        # when all of its samples are available, and its latency includes the
+        # time waiting for previous chunks. Otherwise, chunks are fed
+        # back-to-back.
+        self.rate = None
+
+        # Results of the latest run
+        self.latency = None
+        self.histogram = None
+
+    def reset_stream(self):
+        pass
+
+    def _check_bench_args(self):
+        if self.data is None:
+            raise ValueError('No data availabe.')
+        if len(self.chunk_sizes) == 0:
+            raise ValueError('No chunk size is given.')
+        if min(self.chunk_sizes) < 1 or max(self.chunk_sizes) > len(self.data):
+            raise ValueError('Chunk size should be in the range of [1, {}].'
+                             .format(len(self.data)))
+
+    def _feed(self, func, chunk_size):
+        """ Return latency (in seconds) of each chunk of `self.data`. """
+        args, kwargs = self.args, self.kwargs
+        data = self.data
+        n_chunks = len(data) // chunk_size
+        latency = np.empty(n_chunks)
+        period_ns = None if self.rate is None else chunk_size*1e9/self.rate
+
+        t0 = default_timer_ns()
+        for k in range(n_chunks):
+            chunk = data[k*chunk_size:(k+1)*chunk_size]
+            if period_ns is None:
+                st = default_timer_ns()
+            else:
+                st = t0 + int((k+1)*period_ns)
+                _wait_until(st)
+            func(chunk, *args, **kwargs)
+            latency[k] = default_timer_ns() - st
+        return latency*1e-9
+
+    def run(self):
+        try:
+            self.set_up()
+            self._check_bench_args()
+        except:
+            raise
+        self.stream.write('Current running: {}{}\n'.format(
+            self.func_name, format_params(self.params)))
+
+        sizes = list(self.chunk_sizes)
+        tlog = np.zeros((len(sizes) + 1, self.rd + 1))
+        self.loops = np.zeros(len(sizes) + 1, dtype='int')
+        self.latency = np.zeros((len(sizes) + 1, len(LATENCY_COLUMNS)))
+        self.histogram = np.zeros((len(LATENCY_BINS) - 1, len(sizes) + 1))
+        self.histogram[:, 0] = LATENCY_BINS[:-1]
+        mean_latency = np.zeros(len(sizes))
+        # Memory is not profiled in streaming mode
+        self.memlog = None
+
+        msg_progress = 'progress: {}/{}\r'
+        func = getattr(self, self.func_name)
+        try:
+            for i, size in enumerate(sizes, 1):
+                tlog[i, 0] = size
+                self.loops[i] = len(self.data) // size
+                for _ in range(self.warmup):
+                    self.reset_stream()
+                    func(self.data[:size], *self.args, **self.kwargs)
+                latency = []
+                for r in range(self.rd):
+                    self.reset_stream()
+                    latency.append(self._feed(func, size))
+                    tlog[i, r+1] = np.median(latency[-1])
+                latency = np.concatenate(latency)
+                mean_latency[i-1] = latency.mean()
+                self.latency[i] = latency_stats(latency)
+                self.histogram[:, i] = latency_histogram(latency)
+                self.stream.write(msg_progress.format(i, len(sizes)))
+        except:
+            raise
+        finally:
+            self.tear_down()
+
+        self.summary = summarize(tlog, self.confidence)
+        work = [self.work(int(v)) for v in self.summary[:, 0]]
+        self.throughput = derive_throughput(work, mean_latency)
+        self._report_summary()
+        return tlog
+
+    def _report_summary(self):
+        super(StreamingBenchmarkCase, self)._report_summary()
+        if self.latency is None or len(self.latency) < 2:
+            return
+        p50, p99, p999, jitter = self.latency[-1]
+        msg = ('latency: p50 {0:.3e} s, p99 {1:.3e} s, p99.9 {2:.3e} s, '
+               'jitter {3:.3e} s\n')
+        self.stream.write(msg.format(p50, p99, p999, jitter))
+
+
+def _wait_until(deadline_ns):
+    # Sleep for most of the time, then spin for a precise deadline
+    while True:
+        remaining = deadline_ns - default_timer_ns()
+        if remaining <= 0:
+            return
+        if remaining > 2000000:
+            time.sleep((remaining - 1000000)*1e-9)
+
+
 class BenchmarkSuite(object):
     def __init__(self, cases=()):
         self._cases = []
@@ -115,15 +376,27 @@ class BenchmarkSuite(object):
 
 
 class BenchmarkLoader(object):
+    """
+    Parameters
+    ----------
+    cache_path : str, optional
+        Path of the cache of discovery index, see also `DiscoveryIndex`.
+    """
     bench_prefix = 'time'
     suite_class = BenchmarkSuite
     case_class = BenchmarkCase
 
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+
     def _find_benchmark_case_files(self, start_dir, pattern_dir, pattern_file):
         from fnmatch import fnmatch
         entry = os.path.abspath(start_dir)
         result = []
         for root, dirs, files in os.walk(entry):
+            # Hidden directories and caches of bytecode are never searched
+            dirs[:] = [d for d in dirs
+                       if not d.startswith('.') and d != '__pycache__']
             if len(files) == 0:
                 continue
             if not fnmatch(os.path.basename(root), pattern_dir):
@@ -132,23 +405,70 @@ class BenchmarkLoader(object):
         return result
 
     def discover(self, start_dir='.', pattern_dir='benchmarks', 
-                 pattern_file='bench_*.py'):
+                 pattern_file='bench_*.py', cases=None, classes=None):
+        """
+        Parameters
+        ----------
+        cases : list of str, optional
+            Patterns of cases (`<class name>.<function name>`) to be loaded,
+            see also `match_patterns()`. Default: all cases.
+        classes : list of str, optional
+            Patterns of class names to be loaded. Default: all classes.
+
+        Note
+        ----
+        If any selection is given, files are scanned without being imported
+        (results are cached by `cache_path`), and only files containing
+        selected cases are imported.
+        """
         case_files = self._find_benchmark_case_files(start_dir, pattern_dir, pattern_file)
         suite = BenchmarkSuite()
+        select = cases is not None or classes is not None
+        index = DiscoveryIndex(self.cache_path, self.bench_prefix)
         for f in case_files:
+            selected = None
+            if select:
+                selected = self._select_cases(index.get(f), cases, classes)
+                if len(selected) == 0:
+                    continue
             name = os.path.basename(f).split('.')[0]
-            des = ('.py', 'U', 1)   # (suffix, mode, type: PY_SOURCE)
-            mod = _load_module(name, f, info=des)
-            su = self.load_cases_from_module(mod)
+            mod = _load_module(name, f)
+            su = self.load_cases_from_module(mod, selected)
             suite.add_suite(su)
+        index.save()
         return suite
 
-    def load_cases(self, case_class):
+    def _select_cases(self, found, cases, classes):
+        selected = {}
+        for class_name, names in found.items():
+            if classes is not None and not _match_names(class_name, classes):
+                continue
+            names = [n for n in names if match_patterns(
+                '{0}.{1}'.format(class_name, n), cases)]
+            if len(names) > 0:
+                selected[class_name] = names
+        return selected
+
+    def load_cases(self, case_class, names=None):
+        """
+        Parameters
+        ----------
+        names : list of str, optional
+            Names of benchmark functions to be loaded. Default: all.
+        """
         if not issubclass(case_class, BenchmarkCase):
             raise TypeError('Given case is not a subclass of `BenchmarkCase`.')
-        names = self.get_case_names(case_class)
-        suite = self.suite_class(map(case_class, names))
-        return suite
+        all_names = self.get_case_names(case_class)
+        if names is None:
+            names = all_names
+        else:
+            names = [n for n in all_names if n in names]
+        grid = expand_param_grid(getattr(case_class, 'param_grid', None))
+        if len(grid) == 1 and len(grid[0]) == 0:
+            return self.suite_class(map(case_class, names))
+        cases = [case_class(name, params=params)
+                 for name in names for params in grid]
+        return self.suite_class(cases)
 
     def get_case_names(self, case_class):
         def is_bench_func(attrname, case_class=case_class, 
@@ -158,7 +478,14 @@ class BenchmarkLoader(object):
         names = [v for v in dir(case_class) if is_bench_func(v)]
         return names
 
-    def load_cases_from_module(self, mod):
+    def load_cases_from_module(self, mod, selected=None):
+        """
+        Parameters
+        ----------
+        selected : dict, optional
+            Names of benchmark functions to be loaded of each class, e.g.
+            `{'BenchDSP': ['time_goertzel']}`. Default: all cases.
+        """
         suite = self.suite_class()
         for v in dir(mod):
             attr = getattr(mod, v)
@@ -167,34 +494,164 @@ class BenchmarkLoader(object):
             # In case that user imports case_class by `from XXX import case_class`
             if attr is self.case_class:
                 continue
-            su = self.load_cases(attr)
+            if selected is not None and v not in selected:
+                continue
+            su = self.load_cases(attr, None if selected is None else selected[v])
             suite.add_cases([case for case in su])
         return suite
 
 
 class BenchmarkRunner(object):
     logdir_name = 'bench_log'
+    # Summaries (median, IQR, CI, ...) are written into a sub-directory, so
+    # that they won't be mixed up with logs of elapsed time.
+    summary_dir_name = 'summary'
+    # Results of parametrized cases are also written as tidy tables (one row
+    # per observation) into this sub-directory, one file per class.
+    tidy_dir_name = 'tidy'
+    # Derived throughput metrics, see also `BenchmarkCase.work()`
+    throughput_dir_name = 'throughput'
+    # Histograms of latency of streaming cases
+    latency_dir_name = 'latency'
     log_writer_class = LogWriter
 
-    def __init__(self, log_writer_class=None):
+    def __init__(self, log_writer_class=None, store=None, isolate=False,
+                 jobs=1, stream=sys.stderr, profile_memory=False):
+        """
+        Parameters
+        ----------
+        log_writer_class : LogWriter, optional
+            Class of log writer, e.g. `NpyLogWriter` for binary logs. See
+            also `LOG_WRITERS`.
+        store : ResultStore, optional
+            If it's given, results are also appended to this store, so that
+            they can be compared with results of other runs later.
+        isolate : bool, optional
+            If true, each case is ran in a fresh subprocess pinned to a CPU,
+            so that no state (caches, allocator, ...) leaks between cases.
+        jobs : int, optional
+            Number of cases to be ran in parallel (on different CPUs). It's
+            available only if `isolate` is true.
+        stream : file-like, optional
+            Stream for output of isolated cases.
+        profile_memory : bool, optional
+            If true, peak memory usage of all cases will be profiled.
+        """
+        if jobs < 1:
+            raise ValueError('`jobs` should not be less than 1.')
+        if jobs > 1 and not isolate:
+            raise ValueError('Cases can be ran in parallel only if `isolate` '
+                             'is true.')
+        self.isolate = isolate
+        self.jobs = jobs
+        self.stream = stream
+        self.profile_memory = profile_memory
+        self._lock = threading.Lock()
+        self._tidy_files = set()
         if log_writer_class is not None:
             if issubclass(log_writer_class, self.log_writer_class):
                 self.log_writer_class = log_writer_class
             else:
                 raise TypeError('`log_writer_class` should be a subclass of '
                                 '{}'.format(self.log_writer_class))
+        if store is not None and not isinstance(store, ResultStore):
+            raise TypeError('`store` should be an instance of ResultStore.')
+        self.store = store
+        self.run_info = None
+        # Records of cases ran by this runner
+        self.records = []
         self._previous_class = None
 
     def _write_log(self, case, log):
         logdir = os.path.join(os.getcwd(), self.logdir_name)
         if not os.path.exists(logdir):
             os.mkdir(logdir)
-        logname = '{0}_{1}.{2}'.format(case.__class__.__name__, 
-                                       case.func_name, 
-                                       'csv')
+        logname = '{0}_{1}{2}.{3}'.format(case.__class__.__name__, 
+                                          case.func_name, 
+                                          format_params(case.params),
+                                          self.log_writer_class.extension)
         logpath = os.path.join(logdir, logname)
         writer = self.log_writer_class()
-        writer.write(logpath, log)
+        # Memory usage and latency are written as extra columns with a header
+        extra, extra_columns = [], []
+        for name, columns in [('memlog', MEMORY_COLUMNS),
+                              ('latency', LATENCY_COLUMNS)]:
+            value = getattr(case, name, None)
+            if value is not None:
+                extra.append(value)
+                extra_columns.extend(columns)
+        if len(extra) == 0:
+            writer.write(logpath, log)
+        else:
+            columns = log_columns(log.shape[1] - 1, extra_columns)
+            writer.write(logpath, np.hstack([log] + extra),
+                         header=','.join(columns))
+
+        if getattr(case, 'summary', None) is not None:
+            summary_dir = os.path.join(logdir, self.summary_dir_name)
+            if not os.path.exists(summary_dir):
+                os.mkdir(summary_dir)
+            summary_path = os.path.join(summary_dir, logname)
+            writer.write(summary_path, case.summary,
+                         header=','.join(SUMMARY_COLUMNS))
+
+        if getattr(case, 'throughput', None) is not None:
+            throughput_dir = os.path.join(logdir, self.throughput_dir_name)
+            if not os.path.exists(throughput_dir):
+                os.mkdir(throughput_dir)
+            throughput_path = os.path.join(throughput_dir, logname)
+            writer.write(throughput_path,
+                         np.column_stack([case.summary[:, 0], case.throughput]),
+                         header=','.join(['length'] + THROUGHPUT_COLUMNS))
+
+        if getattr(case, 'histogram', None) is not None:
+            latency_dir = os.path.join(logdir, self.latency_dir_name)
+            if not os.path.exists(latency_dir):
+                os.mkdir(latency_dir)
+            columns = ['latency'] + ['count_{0:.0f}'.format(v)
+                                     for v in log[1:, 0]]
+            writer.write(os.path.join(latency_dir, logname), case.histogram,
+                         header=','.join(columns))
+
+        if len(case.params) > 0:
+            self._write_tidy(logdir, case, log)
+
+    def _write_tidy(self, logdir, case, log):
+        import csv
+
+        tidy_dir = os.path.join(logdir, self.tidy_dir_name)
+        if not os.path.exists(tidy_dir):
+            os.mkdir(tidy_dir)
+        class_name = case.__class__.__name__
+        path = os.path.join(tidy_dir, '{0}.csv'.format(class_name))
+        param_names = sorted(case.params.keys())
+
+        # Tidy table of a class is overwritten by the first case of this run
+        first = path not in self._tidy_files
+        self._tidy_files.add(path)
+        with open(path, 'w' if first else 'a') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            if first:
+                writer.writerow(['func'] + param_names +
+                                ['length', 'round', 'time'])
+            for row in log:
+                if row[0] == 0:
+                    continue
+                for r, t in enumerate(row[1:]):
+                    writer.writerow([case.func_name] +
+                                    [case.params[k] for k in param_names] +
+                                    [int(row[0]), r, repr(float(t))])
+
+    def _store_result(self, case, log):
+        if self.store is None:
+            return
+        if self.run_info is None:
+            self.run_info = ResultStore.make_run_info()
+        name = '{0}.{1}{2}'.format(case.__class__.__name__, case.func_name,
+                                   format_params(case.params))
+        records = ResultStore.make_records(name, log, self.run_info)
+        self.store.append(records)
+        self.records.extend(records)
 
     def _tear_down_previous_class(self, case):
         current_class = case.__class__
@@ -225,9 +682,12 @@ class BenchmarkRunner(object):
             self._tear_down_previous_class(case)
             self._set_up_current_class(case)
 
+            if self.profile_memory:
+                case.profile_memory = True
             log = case.run()
             if case.enable_logging:
                 self._write_log(case, log)
+            self._store_result(case, log)
 
             # Update this only after case ran sucessfully
             self._previous_class = case.__class__
@@ -237,6 +697,9 @@ class BenchmarkRunner(object):
     def run_benchmark_suite(self, suite):
         if not isinstance(suite, BenchmarkSuite):
             raise TypeError('Given suite is not a instance of BenchmarkSuite')
+        if self.isolate:
+            self._run_isolated_suite(suite)
+            return
         try:            
             for case in suite:
                 self.run_benchmark(case)
@@ -245,20 +708,179 @@ class BenchmarkRunner(object):
         except:
             raise
 
+    def run_isolated_benchmark(self, case, cpu=None):
+        """
+        Run a case in a subprocess, then write its log in the same way as
+        `run_benchmark()`.
+
+        Parameters
+        ----------
+        case : BenchmarkCase
+            Case to be ran. Its class should be defined in a module file,
+            which will be loaded by the subprocess.
+        cpu : int, optional
+            CPU which the subprocess is pinned to.
+        """
+        import inspect
+        import shutil
+        import subprocess
+        import tempfile
+
+        if self.profile_memory:
+            case.profile_memory = True
+        module_file = os.path.abspath(inspect.getfile(case.__class__))
+        tmpdir = tempfile.mkdtemp()
+        output = os.path.join(tmpdir, 'result.npz')
+        cmd = [sys.executable, '-m', 'gofft.bench.worker', module_file,
+               case.__class__.__name__, case.func_name, output]
+        if cpu is not None:
+            cmd.extend(['--cpu', str(cpu)])
+        if case.profile_memory:
+            cmd.append('--profile-memory')
+        if len(case.params) > 0:
+            import json
+            cmd.extend(['--params', json.dumps(case.params)])
+
+        # Make sure that subprocess imports the same `gofft` package
+        env = dict(os.environ)
+        pkg_root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        paths = [pkg_root] + [p for p in [env.get('PYTHONPATH')] if p]
+        env['PYTHONPATH'] = os.pathsep.join(paths)
+        if cpu is not None:
+            # A pinned case shouldn't spawn more BLAS threads than its CPU,
+            # unless the number of threads is given explicitly.
+            for name in _BLAS_THREAD_VARS:
+                env.setdefault(name, '1')
 
-def _load_module(name, fn, info=None):
-    import imp
+        try:
+            proc = subprocess.Popen(cmd, env=env, cwd=os.getcwd(),
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT)
+            out, _ = proc.communicate()
+            with self._lock:
+                self.stream.write(out.decode('utf-8', 'replace'))
+            if proc.returncode != 0:
+                raise RuntimeError('Failed to run {0}.{1} in subprocess.'.format(
+                    case.__class__.__name__, case.func_name))
+            with np.load(output) as result:
+                log = result['tlog']
+                case.summary = result['summary']
+                case.loops = result['loops']
+                case.enable_logging = bool(result['enable_logging'])
+                for name in _OPTIONAL_RESULTS:
+                    setattr(case, name, result[name] if name in result else None)
+        finally:
+            shutil.rmtree(tmpdir)
 
-    if info is None:
-        path = os.path.dirname(fn)
-        fo, fn, info = imp.find_module(name, [path])
-    else:
-        fo = open(fn, info[1])
+        with self._lock:
+            if case.enable_logging:
+                self._write_log(case, log)
+            self._store_result(case, log)
+        return log
 
+    def _run_isolated_suite(self, suite):
+        from multiprocessing.pool import ThreadPool
+        try:
+            from Queue import Queue
+        except ImportError:
+            from queue import Queue
+
+        cases = list(suite)
+        cpus = _available_cpus()
+        jobs = self.jobs if cpus is None else min(self.jobs, len(cpus))
+        if len(cases) == 0:
+            return
+
+        # CPUs are handed out to running cases, so that no CPU is shared by
+        # two cases at the same time.
+        cpu_queue = Queue()
+        for cpu in (cpus[-jobs:] if cpus is not None else [None]*jobs):
+            cpu_queue.put(cpu)
+
+        def _run(case):
+            cpu = cpu_queue.get()
+            try:
+                return self.run_isolated_benchmark(case, cpu=cpu)
+            finally:
+                cpu_queue.put(cpu)
+
+        pool = ThreadPool(jobs)
+        try:
+            pool.map(_run, cases)
+        finally:
+            pool.close()
+            pool.join()
+
+
+def expand_param_grid(param_grid):
+    """
+    Expand a grid of parameters into a list of combinations.
+
+    Parameters
+    ----------
+    param_grid : dict
+        Values of each parameter, e.g. `{'a': [1, 2], 'b': ['x']}`.
+
+    Returns
+    -------
+    combinations : list of dict
+        e.g. `[{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'x'}]`. If `param_grid` is
+        empty, a list of one empty combination is returned.
+    """
+    import itertools
+    if not param_grid:
+        return [{}]
+    keys = sorted(param_grid.keys())
+    for k in keys:
+        if len(param_grid[k]) == 0:
+            raise ValueError('No value is given for parameter: {0}'.format(k))
+    return [dict(zip(keys, values))
+            for values in itertools.product(*[param_grid[k] for k in keys])]
+
+
+def format_params(params):
+    """
+    Format a combination of parameters as a suffix of case name, e.g.
+    `[dtype=float32,width=250]`. Return an empty string if it's empty.
+    """
+    if not params:
+        return ''
+    return '[{0}]'.format(','.join('{0}={1}'.format(k, params[k])
+                                   for k in sorted(params.keys())))
+
+
+def _available_cpus():
+    """ Return CPUs available to current process, or None if unknown. """
+    if not hasattr(os, 'sched_getaffinity'):
+        return None
+    return sorted(os.sched_getaffinity(0))
+
+
+def _match_names(name, patterns):
+    # Class names are matched exactly, or by wildcards
+    from fnmatch import fnmatch
+    return any(fnmatch(name, p) for p in patterns)
+
+
+def _load_module(name, fn):
+    """ Import a module from the file `fn` as `name`. """
+    try:
+        from importlib.util import spec_from_file_location, module_from_spec
+    except ImportError:
+        # Python 2
+        import imp
+        with open(fn, 'r') as fo:
+            return imp.load_module(name, fo, fn, ('.py', 'r', imp.PY_SOURCE))
+
+    spec = spec_from_file_location(name, fn)
+    mod = module_from_spec(spec)
+    # Registered as `imp.load_module()` does, so that classes in it can be
+    # found by name (e.g. by `pickle` and `inspect`).
+    sys.modules[name] = mod
     try:
-        mod = imp.load_module(name, fo, fn, info)
-    except:
+        spec.loader.exec_module(mod)
+    except Exception:
+        del sys.modules[name]
         raise
-    finally:
-        fo.close()
     return mod
@@ -0,0 +1,169 @@
+from __future__ import absolute_import, division
+
+import ast
+import io
+import json
+import os
+from fnmatch import fnmatch
+
+__all__ = ['DiscoveryIndex', 'scan_benchmark_file', 'match_patterns']
+
+
+# Names of base classes which mark a class as a benchmark case, subclasses of
+# them (defined in the same file) are benchmark cases as well.
+CASE_BASE_NAMES = ('BenchmarkCase', 'StreamingBenchmarkCase')
+
+
+def scan_benchmark_file(path, prefix='time'):
+    """
+    Find benchmark cases in a file without importing it.
+
+    Parameters
+    ----------
+    path : str
+        Path of a file of benchmark cases.
+    prefix : str, optional
+        Prefix of benchmark functions.
+
+    Returns
+    -------
+    cases : dict
+        Names of benchmark functions (including inherited ones) of each
+        class, e.g. `{'BenchDSP': ['time_goertzel', ...]}`.
+
+    Note
+    ----
+    Classes are recognized by their base classes in the source, so classes
+    created dynamically are not found.
+    """
+    with io.open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    classes = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = [_base_name(b) for b in node.bases]
+        funcs = [n.name for n in node.body
+                 if isinstance(n, ast.FunctionDef) and
+                 n.name.startswith(prefix)]
+        classes[node.name] = (bases, funcs)
+
+    cases = {}
+    for name in classes:
+        funcs = _collect_funcs(name, classes, set())
+        if funcs is not None:
+            cases[name] = sorted(funcs)
+    return cases
+
+
+def _base_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _collect_funcs(name, classes, visited):
+    # Return benchmark functions of class `name`, or None if it's not a case
+    if name in visited:
+        return None
+    visited.add(name)
+    bases, funcs = classes[name]
+    result = set(funcs)
+    is_case = False
+    for base in bases:
+        if base in CASE_BASE_NAMES:
+            is_case = True
+        elif base in classes:
+            inherited = _collect_funcs(base, classes, visited)
+            if inherited is not None:
+                is_case = True
+                result.update(inherited)
+    return result if is_case else None
+
+
+def match_patterns(name, patterns):
+    """
+    Check whether `name` matches any of `patterns`. A pattern containing
+    wildcards (`*`, `?` or `[`) is matched by `fnmatch`, otherwise it's
+    matched as a substring. Everything is matched if `patterns` is None.
+    """
+    if patterns is None:
+        return True
+    for pattern in patterns:
+        if any(c in pattern for c in '*?['):
+            if fnmatch(name, pattern):
+                return True
+        elif pattern in name:
+            return True
+    return False
+
+
+class DiscoveryIndex(object):
+    """
+    Index of benchmark cases in files, entries are cached by modification
+    time and size of files, so that unchanged files are neither parsed nor
+    imported again.
+
+    Parameters
+    ----------
+    cache_path : str, optional
+        Path of the cache (JSON). If it's not given, the index is only kept
+        in memory.
+    prefix : str, optional
+        Prefix of benchmark functions.
+    """
+    def __init__(self, cache_path=None, prefix='time'):
+        self.cache_path = cache_path
+        self.prefix = prefix
+        self.entries = self._load()
+        self.modified = False
+
+    def _load(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                entries = json.load(f)
+        except ValueError:
+            # Broken cache, e.g. interrupted while writing
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def get(self, path):
+        """
+        Returns
+        -------
+        cases : dict
+            Same as `scan_benchmark_file()`.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if (entry is None or entry['mtime'] != stat.st_mtime or
+                entry['size'] != stat.st_size or
+                entry['prefix'] != self.prefix):
+            entry = {'mtime': stat.st_mtime, 'size': stat.st_size,
+                     'prefix': self.prefix,
+                     'cases': scan_benchmark_file(path, self.prefix)}
+            self.entries[path] = entry
+            self.modified = True
+        return entry['cases']
+
+    def save(self):
+        """ Write the index into `cache_path` if it has been changed. """
+        if self.cache_path is None or not self.modified:
+            return
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # Replace the cache at once, so that an incomplete file is never read
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.rename(tmp_path, self.cache_path)
+        self.modified = False
@@ -0,0 +1,57 @@
+from __future__ import absolute_import, division
+
+import os
+import sys
+import subprocess
+import numpy as np
+
+__all__ = ['measure_import_time']
+
+
+_SCRIPT = '''
+import time
+timer = getattr(time, 'perf_counter', time.time)
+st = timer()
+import {0}
+et = timer()
+print(repr(et - st))
+'''
+
+
+def measure_import_time(module, repeat=5, python=None, cwd=None):
+    """
+    Measure elapsed time of importing a module. Each measurement is done in a
+    fresh interpreter, so that the result is not affected by modules which
+    have been imported already.
+
+    Parameters
+    ----------
+    module : str
+        Name of module to be imported.
+    repeat : int, optional
+        Number of measurements.
+    python : str, optional
+        Path of python interpreter. Default: `sys.executable`.
+    cwd : str, optional
+        Working directory of interpreter. Default: current working directory.
+
+    Returns
+    -------
+    elapsed : ndarray
+        Elapsed time (in seconds) of each measurement.
+    """
+    if repeat < 1:
+        raise ValueError('`repeat` should not be less than 1.')
+    cmd = [python or sys.executable, '-c', _SCRIPT.format(module)]
+    cwd = os.getcwd() if cwd is None else cwd
+
+    elapsed = np.zeros(repeat)
+    for i in range(repeat):
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE)
+        out, err = proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError('Failed to import {0}:\n{1}'.format(
+                module, err.decode('utf-8', 'replace')))
+        elapsed[i] = float(out.decode('utf-8').strip().splitlines()[-1])
+    return elapsed
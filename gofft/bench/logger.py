@@ -1,7 +1,25 @@
 from __future__ import absolute_import
+import json
+import os
 import numpy as np
 
-__all__ = ['LogWriter', 'LogReader']
+__all__ = ['LogWriter', 'NpyLogWriter', 'LogReader', 'log_columns',
+           'read_tidy', 'export_csv', 'LOG_WRITERS']
+
+
+def log_columns(rd, extra_columns=()):
+    """
+    Get names of columns of a log.
+
+    Parameters
+    ----------
+    rd : int
+        Number of rounds of elapsed time.
+    extra_columns : list of str, optional
+        Names of extra columns after elapsed time, e.g. `MEMORY_COLUMNS`.
+    """
+    return (['length'] + ['time_{0}'.format(i) for i in range(rd)] +
+            list(extra_columns))
 
 
 class LogWriter(object):
@@ -9,7 +27,10 @@ class LogWriter(object):
     Default log writer. 
     User can create a custom writer by inheriting this class.
     """
-    def write(self, fn, content, delimiter=','):
+    # Extension of log files written by this writer
+    extension = 'csv'
+
+    def write(self, fn, content, delimiter=',', header=''):
         """
         Parameters
         ----------
@@ -19,15 +40,45 @@ class LogWriter(object):
             Content to be written into log file.
         delimiter : str
             The string used to separate values in `content`.
+        header : str, optional
+            Header written as a comment line at the beginning of log file.
         """
-        np.savetxt(fn, content, delimiter=delimiter)
+        np.savetxt(fn, content, delimiter=delimiter, header=header)
+
+
+class NpyLogWriter(LogWriter):
+    """
+    Binary log writer. Content is written into a `.npy` file in column-major
+    order (so that each column is contiguous on disk), and names of columns
+    are written into a JSON sidecar `<name>.json`. It's much faster than text
+    log to be written and read back, and it keeps full precision.
+    """
+    extension = 'npy'
+
+    def write(self, fn, content, delimiter=',', header=''):
+        content = np.asfortranarray(content, dtype='float64')
+        np.save(fn, content)
+        columns = None
+        if header:
+            columns = [v.strip() for v in header.split(delimiter)]
+        with open(_sidecar_path(fn), 'w') as f:
+            json.dump({'columns': columns}, f)
+
+
+# Available log writers, keyed by format name
+LOG_WRITERS = {'csv': LogWriter, 'npy': NpyLogWriter}
 
 
 class LogReader(object):
     """
-    Default log reader. 
+    Default log reader. Format of log is detected by extension of file,
+    `.npy` for binary logs written by `NpyLogWriter`, otherwise text logs
+    written by `LogWriter`.
     User can create a custom reader by inheriting this class.
     """
+    # Extensions of log files which can be read
+    extensions = ('.csv', '.npy')
+
     def read(self, fn, delimiter=','):
         """
         Parameters
@@ -44,7 +95,103 @@ class LogReader(object):
         y : ndarray
             Elapsed time of each step in benchmark.
         """
-        content = np.loadtxt(fn, delimiter=delimiter)
-        x = content[:, 0]
-        y = content[:, 1:]
+        columns = self.read_columns(fn, delimiter=delimiter)
+        x = columns.pop('length')
+        y = np.column_stack([v for k, v in columns.items()
+                             if k.startswith('time')])
         return x, y
+
+    def read_columns(self, fn, delimiter=','):
+        """
+        Read all columns of a log. Names of columns are given by the header
+        of log file. If there is no header, first column is taken as data
+        length and the others are elapsed time.
+
+        Binary logs are memory-mapped, so columns are loaded lazily when
+        they are accessed.
+
+        Returns
+        -------
+        columns : OrderedDict
+            Columns keyed by name, e.g. 'length', 'time_0', 'rss_peak'.
+        """
+        from collections import OrderedDict
+        if fn.endswith('.npy'):
+            names = _read_sidecar(fn)
+            content = np.load(fn, mmap_mode='r')
+            if content.ndim == 1:
+                content = content[None, :]
+        else:
+            names = _read_header(fn, delimiter)
+            content = np.loadtxt(fn, delimiter=delimiter, ndmin=2)
+        if names is None or len(names) != content.shape[1]:
+            names = log_columns(content.shape[1] - 1)
+        return OrderedDict((k, content[:, i]) for i, k in enumerate(names))
+
+
+def _read_header(fn, delimiter):
+    with open(fn, 'r') as f:
+        line = f.readline()
+    if not line.startswith('#'):
+        return None
+    return [v.strip() for v in line.lstrip('#').split(delimiter)]
+
+
+def _sidecar_path(fn):
+    return os.path.splitext(fn)[0] + '.json'
+
+
+def _read_sidecar(fn):
+    path = _sidecar_path(fn)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f).get('columns')
+
+
+def export_csv(fn, csv_fn=None, log_reader_class=LogReader):
+    """
+    Export a log (e.g. a binary one) as a text log with header.
+
+    Parameters
+    ----------
+    fn : str
+        Path of log file.
+    csv_fn : str, optional
+        Path of exported file. Default: path of `fn` with `.csv` extension.
+
+    Returns
+    -------
+    csv_fn : str
+    """
+    if csv_fn is None:
+        csv_fn = os.path.splitext(fn)[0] + '.csv'
+    columns = log_reader_class().read_columns(fn)
+    content = np.column_stack(list(columns.values()))
+    LogWriter().write(csv_fn, content, header=','.join(columns.keys()))
+    return csv_fn
+
+
+def read_tidy(fn):
+    """
+    Read a tidy table written by `BenchmarkRunner` for parametrized cases.
+
+    Returns
+    -------
+    rows : list of dict
+        One dict per observation. Values which look like numbers are
+        converted to int or float.
+    """
+    import csv
+    with open(fn, 'r') as f:
+        return [dict((k, _to_number(v)) for k, v in row.items())
+                for row in csv.DictReader(f)]
+
+
+def _to_number(value):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
@@ -0,0 +1,103 @@
+from __future__ import absolute_import, division
+
+import sys
+
+__all__ = ['MemoryProfiler', 'MEMORY_COLUMNS']
+
+
+# Columns of log written by memory profiler (in bytes)
+MEMORY_COLUMNS = ['tracemalloc_peak', 'rss_peak']
+
+
+class MemoryProfiler(object):
+    """
+    Profile peak memory usage of a function call.
+
+    - tracemalloc_peak: peak of memory traced by `tracemalloc` during the
+      call, relative to the traced memory before the call. Data buffers of
+      NumPy arrays are included, since NumPy reports them to `tracemalloc`.
+    - rss_peak: peak resident set size of the process. On Linux, the peak is
+      reset before the call (via `/proc/self/clear_refs`), so it is the peak
+      during the call. Otherwise, it is the peak since the process started.
+    """
+    def __init__(self):
+        self._tracemalloc = _import_tracemalloc()
+        self._can_reset_rss = _reset_peak_rss()
+
+    def profile(self, func, *args, **kwargs):
+        """
+        Call `func(*args, **kwargs)` and return peak memory usage.
+
+        Returns
+        -------
+        usage : list
+            Peak memory usage (in bytes) in the order of `MEMORY_COLUMNS`.
+        """
+        tm = self._tracemalloc
+        tracemalloc_peak = float('nan')
+
+        if self._can_reset_rss:
+            _reset_peak_rss()
+
+        if tm is not None:
+            was_tracing = tm.is_tracing()
+            if not was_tracing:
+                tm.start()
+            _reset_traced_peak(tm)
+            base, _ = tm.get_traced_memory()
+            try:
+                func(*args, **kwargs)
+                _, peak = tm.get_traced_memory()
+            finally:
+                if not was_tracing:
+                    tm.stop()
+            tracemalloc_peak = peak - base
+        else:
+            func(*args, **kwargs)
+
+        return [tracemalloc_peak, _get_peak_rss()]
+
+
+def _import_tracemalloc():
+    try:
+        import tracemalloc
+    except ImportError:
+        return None
+    return tracemalloc
+
+
+def _reset_traced_peak(tm):
+    if hasattr(tm, 'reset_peak'):
+        tm.reset_peak()
+    else:
+        # Peak is reset when tracing restarts (Python < 3.9)
+        tm.clear_traces()
+
+
+def _reset_peak_rss():
+    """ Reset peak RSS of current process, return False if it's not supported. """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def _get_peak_rss():
+    """ Get peak RSS (in bytes) of current process. """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return float(line.split()[1]) * 1024
+    except (IOError, OSError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # `ru_maxrss` is in bytes on macOS, and in kilobytes on other platforms
+    return float(maxrss) if sys.platform == 'darwin' else float(maxrss) * 1024
@@ -0,0 +1,256 @@
+from __future__ import absolute_import, division
+
+import hashlib
+import os
+import tempfile
+import numpy as np
+
+__all__ = ['multitone', 'chirp', 'noise', 'dtmf', 'int16_stream',
+           'cached_signal', 'DTMF_FREQS']
+
+
+# Number of samples generated at once, it bounds the size of temporaries
+CHUNK_SIZE = 2**20
+
+# (low, high) frequencies of DTMF keys
+DTMF_FREQS = {
+    '1': (697, 1209), '2': (697, 1336), '3': (697, 1477), 'A': (697, 1633),
+    '4': (770, 1209), '5': (770, 1336), '6': (770, 1477), 'B': (770, 1633),
+    '7': (852, 1209), '8': (852, 1336), '9': (852, 1477), 'C': (852, 1633),
+    '*': (941, 1209), '0': (941, 1336), '#': (941, 1477), 'D': (941, 1633),
+}
+
+
+def multitone(n, fs, freqs, amps=None, phases=None, noise_level=0.0,
+              seed=None, dtype='float64'):
+    """
+    Sum of sinusoids with optional white gaussian noise.
+
+    Parameters
+    ----------
+    n : int
+        Number of samples.
+    fs : float
+        Sampling frequency.
+    freqs : array_like
+        Frequencies of tones.
+    amps : array_like, optional
+        Amplitudes of tones. Default: 1 / number of tones, so that the sum
+        is bounded by 1.
+    phases : array_like, optional
+        Initial phases (in radians) of tones. Default: random phases.
+    noise_level : float, optional
+        Standard deviation of additive white gaussian noise.
+    seed : int, optional
+        Seed of random number generator.
+    dtype : str or np.dtype, optional
+        Output type. For integer types, the signal is scaled to full scale
+        of the type and clipped.
+
+    Returns
+    -------
+    sig : ndarray
+    """
+    freqs = np.atleast_1d(np.asarray(freqs, dtype='float64'))
+    rng = np.random.RandomState(seed)
+    if amps is None:
+        amps = np.full(freqs.shape, 1.0/max(len(freqs), 1))
+    amps = np.broadcast_to(np.asarray(amps, dtype='float64'), freqs.shape)
+    if phases is None:
+        phases = rng.uniform(0, 2*np.pi, freqs.shape)
+    phases = np.broadcast_to(np.asarray(phases, dtype='float64'), freqs.shape)
+
+    # Tones are evaluated once for a chunk and rotated to the initial phase
+    # of following chunks (sin(a+b) = sin(a)cos(b) + cos(a)sin(b)), which is
+    # much faster than calling `np.sin()` for every sample.
+    idx = np.arange(min(n, CHUNK_SIZE), dtype='float64')
+    bases = [(np.sin(2*np.pi*f/fs*idx), np.cos(2*np.pi*f/fs*idx))
+             for f in freqs]
+
+    dtype = np.dtype(dtype)
+    out = np.empty(n, dtype=dtype)
+    for start in range(0, n, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n)
+        m = stop - start
+        chunk = np.zeros(m)
+        for (bsin, bcos), f, a, p in zip(bases, freqs, amps, phases):
+            # Wrap cycles before scaling to radians, so that the phase keeps
+            # its precision in long signals
+            b = 2*np.pi*((start*f/fs) % 1.0) + p
+            chunk += (a*np.cos(b))*bsin[:m]
+            chunk += (a*np.sin(b))*bcos[:m]
+        if noise_level > 0:
+            chunk += rng.normal(0.0, noise_level, stop - start)
+        _store(out, start, stop, chunk)
+    return out
+
+
+def chirp(n, fs, f0, f1, method='linear', amp=1.0, dtype='float64'):
+    """
+    Sweep from `f0` to `f1` over `n` samples.
+
+    Parameters
+    ----------
+    method : str, optional
+        'linear' or 'exponential' (`f0` and `f1` should be positive).
+    """
+    duration = n/fs
+    dtype = np.dtype(dtype)
+    out = np.empty(n, dtype=dtype)
+    for start in range(0, n, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n)
+        t = np.arange(start, stop, dtype='float64')/fs
+        if method == 'linear':
+            k = (f1 - f0)/duration
+            cycles = f0*t + 0.5*k*t**2
+        elif method == 'exponential':
+            k = np.log(f1/f0)/duration
+            cycles = f0*(np.exp(k*t) - 1)/k
+        else:
+            raise ValueError('Invalid `method`: {}'.format(method))
+        _store(out, start, stop, amp*np.sin(2*np.pi*np.mod(cycles, 1.0)))
+    return out
+
+
+def noise(n, color='white', seed=None, dtype='float64'):
+    """
+    Gaussian noise with unit standard deviation.
+
+    Parameters
+    ----------
+    color : str, optional
+        'white', 'pink' (1/f power) or 'brown' (1/f^2 power).
+    """
+    rng = np.random.RandomState(seed)
+    if color == 'white':
+        sig = rng.standard_normal(n)
+    elif color == 'pink':
+        spec = np.fft.rfft(rng.standard_normal(n))
+        scale = np.arange(len(spec), dtype='float64')
+        scale[0] = 1.0
+        sig = np.fft.irfft(spec/np.sqrt(scale), n)
+    elif color == 'brown':
+        sig = np.cumsum(rng.standard_normal(n))
+        sig -= sig.mean()
+    else:
+        raise ValueError('Invalid `color`: {}'.format(color))
+    std = sig.std()
+    if std > 0:
+        sig /= std
+
+    dtype = np.dtype(dtype)
+    out = np.empty(n, dtype=dtype)
+    _store(out, 0, n, sig)
+    return out
+
+
+def dtmf(keys, fs=8000, tone_duration=0.05, pause_duration=0.05, amp=0.5,
+         dtype='float64'):
+    """
+    Dual-tone multi-frequency signal of a sequence of keys, each tone is
+    followed by a pause.
+
+    Parameters
+    ----------
+    keys : str
+        Keys in `DTMF_FREQS`, e.g. '0123456789*#'.
+    """
+    n_tone = int(round(tone_duration*fs))
+    n_pause = int(round(pause_duration*fs))
+    try:
+        pairs = np.array([DTMF_FREQS[k] for k in keys.upper()], dtype='float64')
+    except KeyError as e:
+        raise ValueError('Invalid DTMF key: {}'.format(e.args[0]))
+
+    # Tones of all keys are generated at once, shape: (n_keys, n_tone)
+    t = np.arange(n_tone, dtype='float64')/fs
+    tones = 0.5*amp*(np.sin(2*np.pi*pairs[:, :1]*t) +
+                     np.sin(2*np.pi*pairs[:, 1:]*t))
+    sig = np.zeros((len(pairs), n_tone + n_pause))
+    sig[:, :n_tone] = tones
+
+    dtype = np.dtype(dtype)
+    out = np.empty(sig.size, dtype=dtype)
+    _store(out, 0, sig.size, sig.ravel())
+    return out
+
+
+def int16_stream(n, fs, freqs, full_scale=0.5, noise_level=0.01, seed=None):
+    """
+    Long 16-bit PCM stream of tones, e.g. for benchmarks of large inputs.
+
+    Parameters
+    ----------
+    full_scale : float, optional
+        Peak amplitude relative to full scale of int16.
+    noise_level : float, optional
+        Standard deviation of noise relative to full scale of int16.
+    """
+    freqs = np.atleast_1d(freqs)
+    amps = full_scale/len(freqs)
+    return multitone(n, fs, freqs, amps=amps, noise_level=noise_level,
+                     seed=seed, dtype='int16')
+
+
+def cached_signal(name, func, cache_dir=None, mmap_mode='r', **kwargs):
+    """
+    Load a generated signal from cache, or generate it by `func(**kwargs)`
+    and save it as a `.npy` file.
+
+    Parameters
+    ----------
+    name : str
+        Prefix of cached file.
+    func : callable
+        Generator of signal, e.g. `multitone`.
+    cache_dir : str, optional
+        Directory of cached files. Default: environment variable
+        `GOFFT_SIGNAL_CACHE` or `./bench_data`.
+    mmap_mode : str, optional
+        Mode of `np.load`. Default: 'r', so that large signals are not read
+        into memory until they are used.
+
+    Returns
+    -------
+    sig : ndarray or np.memmap
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get('GOFFT_SIGNAL_CACHE',
+                                   os.path.join(os.getcwd(), 'bench_data'))
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    path = os.path.join(cache_dir, '{0}-{1}.npy'.format(
+        name, _cache_key(func, kwargs)))
+
+    if not os.path.exists(path):
+        sig = func(**kwargs)
+        # Write to a temporary file first, so that an incomplete file is
+        # never loaded by other processes
+        fd, tmp_path = tempfile.mkstemp(suffix='.npy', dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, sig)
+            os.rename(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return np.load(path, mmap_mode=mmap_mode)
+
+
+def _cache_key(func, kwargs):
+    items = []
+    for k in sorted(kwargs.keys()):
+        v = kwargs[k]
+        if isinstance(v, np.ndarray):
+            v = v.tolist()
+        items.append((k, v))
+    desc = repr((func.__module__, func.__name__, items))
+    return hashlib.sha1(desc.encode('utf-8')).hexdigest()[:12]
+
+
+def _store(out, start, stop, chunk):
+    if np.issubdtype(out.dtype, np.integer):
+        info = np.iinfo(out.dtype)
+        chunk = np.clip(np.round(chunk*info.max), info.min, info.max)
+    out[start:stop] = chunk
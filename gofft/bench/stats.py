@@ -0,0 +1,126 @@
+from __future__ import absolute_import, division
+import numpy as np
+
+__all__ = ['summarize', 'median_ci', 'count_outliers', 'SUMMARY_COLUMNS',
+           'latency_stats', 'latency_histogram', 'LATENCY_COLUMNS',
+           'LATENCY_BINS']
+
+
+# Columns of the array returned by `summarize()`
+SUMMARY_COLUMNS = ['length', 'median', 'iqr', 'ci_low', 'ci_high', 'outliers']
+
+# Columns of the array returned by `latency_stats()`
+LATENCY_COLUMNS = ['p50', 'p99', 'p999', 'jitter']
+
+# Edges of latency histogram (in seconds), 10 bins per decade in [10ns, 1s]
+LATENCY_BINS = np.logspace(-8, 0, 81)
+
+# z-scores of two-sided confidence levels
+_Z_SCORES = {0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+
+def median_ci(samples, confidence=0.95):
+    """
+    Distribution-free confidence interval of median, which is given by order
+    statistics (normal approximation of binomial distribution).
+
+    Parameters
+    ----------
+    samples : array-like
+        Measured values.
+    confidence : float, optional
+        Confidence level, available levels: [0.9, 0.95, 0.99].
+
+    Returns
+    -------
+    low, high : float
+        Bounds of the confidence interval.
+    """
+    if confidence not in _Z_SCORES:
+        raise ValueError('Unsupported confidence level: {0}'.format(confidence))
+    x = np.sort(np.asarray(samples, dtype='float'))
+    n = x.size
+    if n == 0:
+        raise ValueError('No sample is given.')
+    half_width = _Z_SCORES[confidence] * np.sqrt(n) / 2.0
+    lo = int(np.floor(n / 2.0 - half_width))
+    hi = int(np.ceil(n / 2.0 + half_width))
+    return x[max(lo, 0)], x[min(hi, n - 1)]
+
+
+def count_outliers(samples, k=1.5):
+    """
+    Count outliers by Tukey's fences, i.e. values outside of
+    `[Q1 - k*IQR, Q3 + k*IQR]`.
+    """
+    x = np.asarray(samples, dtype='float')
+    q1, q3 = np.percentile(x, [25, 75])
+    iqr = q3 - q1
+    return int(np.sum((x < q1 - k*iqr) | (x > q3 + k*iqr)))
+
+
+def summarize(tlog, confidence=0.95):
+    """
+    Summarize a log of benchmark per data length.
+
+    Parameters
+    ----------
+    tlog : ndarray
+        Log returned by `BenchmarkCase.run()`. First column is data length,
+        the others are elapsed time of each round.
+    confidence : float, optional
+        Confidence level of the interval of median.
+
+    Returns
+    -------
+    summary : ndarray
+        One row per data length (rows of zero length are skipped), columns
+        are listed in `SUMMARY_COLUMNS`.
+    """
+    rows = []
+    for row in tlog:
+        if row[0] == 0:
+            continue
+        y = row[1:]
+        q1, med, q3 = np.percentile(y, [25, 50, 75])
+        lo, hi = median_ci(y, confidence)
+        rows.append([row[0], med, q3 - q1, lo, hi, count_outliers(y)])
+    return np.array(rows, dtype='float').reshape(-1, len(SUMMARY_COLUMNS))
+
+
+def latency_stats(latency):
+    """
+    Percentiles and jitter of per-chunk latency of a stream.
+
+    Parameters
+    ----------
+    latency : array-like
+        Latency (in seconds) of each chunk, in the order of arrival.
+
+    Returns
+    -------
+    stats : list
+        Values in the order of `LATENCY_COLUMNS`. Jitter is the mean absolute
+        difference of latency between consecutive chunks (RFC 3550).
+    """
+    x = np.asarray(latency, dtype='float')
+    if x.size == 0:
+        raise ValueError('No sample is given.')
+    p50, p99, p999 = np.percentile(x, [50, 99, 99.9])
+    jitter = np.mean(np.abs(np.diff(x))) if x.size > 1 else 0.0
+    return [p50, p99, p999, jitter]
+
+
+def latency_histogram(latency, bins=LATENCY_BINS):
+    """
+    Histogram of latency, values out of range are counted in the first or
+    the last bin.
+
+    Returns
+    -------
+    counts : ndarray
+        Counts of each bin, `len(bins) - 1` values.
+    """
+    x = np.clip(np.asarray(latency, dtype='float'), bins[0], bins[-1])
+    counts, _ = np.histogram(x, bins=bins)
+    return counts
@@ -0,0 +1,217 @@
+from __future__ import absolute_import, division
+
+import os
+import json
+import time
+import hashlib
+import platform
+import subprocess
+import numpy as np
+from .stats import median_ci
+
+__all__ = ['ResultStore', 'compare_results', 'git_commit', 'resolve_commit',
+           'host_fingerprint']
+
+
+def git_commit(cwd=None):
+    """
+    Get the commit hash of HEAD. Return 'unknown' if it's not available.
+    A '+dirty' suffix is added if there are uncommitted changes.
+    """
+    try:
+        with open(os.devnull, 'w') as devnull:
+            commit = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], cwd=cwd, stderr=devnull)
+            status = subprocess.check_output(
+                ['git', 'status', '--porcelain', '--untracked-files=no'],
+                cwd=cwd, stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    commit = commit.decode('utf-8').strip()
+    if status.strip():
+        commit += '+dirty'
+    return commit
+
+
+def resolve_commit(ref, cwd=None):
+    """
+    Resolve a git revision (e.g. 'main', 'HEAD~1' or an abbreviated hash)
+    into a full commit hash. Return None if it can't be resolved.
+    """
+    try:
+        with open(os.devnull, 'w') as devnull:
+            commit = subprocess.check_output(
+                ['git', 'rev-parse', '--verify', '--quiet',
+                 '{0}^{{commit}}'.format(ref)], cwd=cwd, stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit.decode('utf-8').strip() or None
+
+
+def host_fingerprint():
+    """
+    Get a short identifier of current host and environment. Results measured
+    on different machines (or with different versions of Python and NumPy)
+    should not be compared with each other.
+    """
+    info = [platform.node(), platform.machine(), platform.processor(),
+            platform.system(), platform.python_version(), np.__version__]
+    try:
+        import multiprocessing
+        info.append(str(multiprocessing.cpu_count()))
+    except NotImplementedError:
+        pass
+    digest = hashlib.sha1('|'.join(info).encode('utf-8')).hexdigest()
+    return digest[:12]
+
+
+class ResultStore(object):
+    """
+    Store of benchmark results in JSON-lines format. Each line is a record
+    of a benchmark case at a data length, keyed by git commit, host
+    fingerprint and timestamp of the run.
+
+    Parameters
+    ----------
+    path : str
+        Path of the store file. It will be created on first write.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def make_run_info(commit=None, host=None, timestamp=None):
+        """ Create information of a benchmark run. """
+        return {
+            'commit': git_commit() if commit is None else commit,
+            'host': host_fingerprint() if host is None else host,
+            'timestamp': time.time() if timestamp is None else timestamp,
+        }
+
+    @staticmethod
+    def make_records(case_name, tlog, run_info):
+        """
+        Convert a log returned by `BenchmarkCase.run()` into records.
+        """
+        records = []
+        for row in tlog:
+            if row[0] == 0:
+                continue
+            samples = [float(v) for v in row[1:]]
+            lo, hi = median_ci(samples)
+            rec = dict(run_info)
+            rec.update({
+                'case': case_name,
+                'length': int(row[0]),
+                'samples': samples,
+                'median': float(np.median(samples)),
+                'ci_low': float(lo),
+                'ci_high': float(hi),
+            })
+            records.append(rec)
+        return records
+
+    def append(self, records):
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(dirname):
+            os.makedirs(dirname)
+        with open(self.path, 'a') as f:
+            for rec in records:
+                f.write(json.dumps(rec, sort_keys=True))
+                f.write('\n')
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+        return records
+
+    def runs(self):
+        """
+        Return a list of runs `(timestamp, commit, host)` sorted by timestamp.
+        """
+        keys = set((r['timestamp'], r['commit'], r['host']) for r in self.load())
+        return sorted(keys)
+
+    def find_run(self, commit=None, host=None, exclude=None,
+                 include_dirty=True):
+        """
+        Get records of the latest run matching given commit (prefix) and host.
+
+        Parameters
+        ----------
+        commit : str, optional
+            Prefix of commit hash.
+        host : str, optional
+            Host fingerprint.
+        exclude : iterable of float, optional
+            Timestamps of runs to be skipped, e.g. the current run.
+        include_dirty : bool, optional
+            Whether runs with uncommitted changes ('+dirty') are matched.
+
+        Returns
+        -------
+        records : list
+            Records of the matched run. It's empty if no run is matched.
+        """
+        records = self.load()
+        exclude = set(exclude or ())
+        candidates = [r for r in records
+                      if (commit is None or r['commit'].startswith(commit))
+                      and (host is None or r['host'] == host)
+                      and r['timestamp'] not in exclude
+                      and (include_dirty or
+                           not r['commit'].endswith('+dirty'))]
+        if len(candidates) == 0:
+            return []
+        latest = max(r['timestamp'] for r in candidates)
+        return [r for r in candidates if r['timestamp'] == latest]
+
+
+def compare_results(baseline, current, threshold=0.05):
+    """
+    Compare records of two runs, and find out significant slowdowns.
+
+    A slowdown is significant if the median of current run is larger than the
+    one of baseline by `threshold` (relative), and the confidence intervals of
+    median do not overlap.
+
+    Parameters
+    ----------
+    baseline : list
+        Records of baseline run.
+    current : list
+        Records of current run.
+    threshold : float, optional
+        Minimal relative slowdown to be reported.
+
+    Returns
+    -------
+    report : list of dict
+        One entry per case and data length measured in both runs, with keys
+        `case`, `length`, `baseline`, `current`, `ratio` and `slowdown`.
+    """
+    base = dict(((r['case'], r['length']), r) for r in baseline)
+    report = []
+    for rec in sorted(current, key=lambda r: (r['case'], r['length'])):
+        key = (rec['case'], rec['length'])
+        if key not in base:
+            continue
+        ref = base[key]
+        ratio = rec['median'] / ref['median'] if ref['median'] > 0 else np.inf
+        slowdown = bool(ratio > 1.0 + threshold and
+                        rec['ci_low'] > ref['ci_high'])
+        report.append({
+            'case': rec['case'],
+            'length': rec['length'],
+            'baseline': ref['median'],
+            'current': rec['median'],
+            'ratio': ratio,
+            'slowdown': slowdown,
+        })
+    return report
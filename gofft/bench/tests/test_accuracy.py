@@ -0,0 +1,86 @@
+from __future__ import absolute_import, division
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from gofft.alg import goertzel_m
+from gofft.bench import (ACCURACY_COLUMNS, CrossCheckEngine, default_engines,
+                         reference_dft, reference_st_dft, cross_check,
+                         budget_failures, write_accuracy_csv)
+
+
+class TestReference(unittest.TestCase):
+    def test_cmp_with_fft(self):
+        # Bins on the grid of FFT: width == length, ft = m * fs / length
+        fs, n = 1000, 4000
+        x = np.random.RandomState(0).randn(n) + 0.5j
+        ft = np.array([-250.0, 0.0, 12.5, 333.25])
+        spec = np.abs(np.fft.fft(x))/n
+        expected = spec[np.floor(0.5 + ft/fs*n).astype('int') % n]
+        np.testing.assert_allclose(reference_dft(x, fs, ft, n).astype(float),
+                                   expected, rtol=1e-12, atol=1e-16)
+        # Bins of short-time version are the same in each block
+        ref = reference_st_dft(x, fs, ft, n//4).astype(float)
+        blocks = np.abs(np.fft.fft(x.reshape(4, n//4), axis=-1))/(n//4)
+        idx = np.floor(0.5 + ft/fs*(n//4)).astype('int') % (n//4)
+        np.testing.assert_allclose(ref, blocks[:, idx].mean(axis=0),
+                                   rtol=1e-12, atol=1e-16)
+
+
+class TestCrossCheck(unittest.TestCase):
+    def test_default_engines(self):
+        records = cross_check(lengths=(2000,), widths=(250, 1000),
+                              n_bins=(1, 16), min_time=None)
+        for r in records:
+            self.assertEqual(sorted(r.keys()), sorted(ACCURACY_COLUMNS))
+        # Complex signals are only evaluated by engines supporting them
+        names = set(e.name for e in default_engines())
+        self.assertEqual(set(r['engine'] for r in records), names)
+        self.assertNotIn('goertzel_rng', [r['engine'] for r in records
+                                          if r['dtype'] == 'complex128'])
+
+        failures = budget_failures(records)
+        self.assertEqual(failures, [], '\n'.join(
+            '{engine} ({dtype}, width={width}, K={n_bins}): error '
+            '{max_error:.2e} > {budget:.0e}'.format(**r) for r in failures))
+
+    def test_budget_exceeded(self):
+        def lossy(data, fs, ft, width):
+            # A "fast" path which evaluates in single precision
+            return goertzel_m(data.astype('float32'), fs, ft, width)
+
+        engines = [CrossCheckEngine('lossy', lossy, reference_dft, 1e-10)]
+        records = cross_check(engines, lengths=(2000,), widths=(1000,),
+                              dtypes=('float64', 'int16'), n_bins=(4,),
+                              min_time=0.001)
+        self.assertEqual(len(records), 2)
+        failed = budget_failures(records)
+        # int16 samples are exact in float32
+        self.assertEqual([r['dtype'] for r in failed], ['float64'])
+        for r in records:
+            self.assertGreater(r['time'], 0)
+            self.assertAlmostEqual(r['samples_per_s'], 2000/r['time'])
+
+    def test_write_csv(self):
+        records = cross_check(default_engines()[2:4], lengths=(2000,),
+                              widths=(500,), dtypes=('float64',),
+                              n_bins=(3,), min_time=None)
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'accuracy.csv')
+            write_accuracy_csv(records, path)
+            with open(path) as f:
+                rows = list(csv.reader(f))
+        finally:
+            shutil.rmtree(tmp_dir)
+        self.assertEqual(rows[0], ACCURACY_COLUMNS)
+        self.assertEqual(len(rows), len(records) + 1)
+        idx = ACCURACY_COLUMNS.index('max_error')
+        self.assertEqual(float(rows[1][idx]), records[0]['max_error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,17 @@
 from __future__ import absolute_import, division
+import os
+import shutil
+import sys
+import tempfile
+import time
 import unittest
 import numpy as np
 
-from gofft.bench import (BenchmarkCase, BenchmarkSuite, BenchmarkLoader,
-                         BenchmarkRunner)
+from gofft.bench import (BenchmarkCase, StreamingBenchmarkCase, BenchmarkSuite, BenchmarkLoader,
+                         BenchmarkRunner, measure_import_time,
+                         expand_param_grid, format_params, read_tidy,
+                         NpyLogWriter, LogReader, LATENCY_COLUMNS,
+                         LATENCY_BINS)
 
 
 class FakeStream(object):
@@ -21,6 +29,7 @@ class BenchArrayMultiplication(BenchmarkCase):
         self.kwargs = {}
         self.step = 10
         self.rd = 3
+        self.min_time = 1e-4
 
     def time_foo(self, data, *args, **kwargs):
         foo(data, np.array([2.0]))
@@ -29,6 +38,30 @@ class BenchArrayMultiplication(BenchmarkCase):
         bar(np.array([2.0]), data)
 
 
+class BenchScaledMultiplication(BenchArrayMultiplication):
+    param_grid = {'scale': [1, 2], 'dtype': ['float64', 'float32']}
+
+    def set_up(self):
+        super(BenchScaledMultiplication, self).set_up()
+        self.enable_logging = True
+        self.data = self.data.astype(self.params['dtype'])*self.params['scale']
+
+
+class BenchStreamingSum(StreamingBenchmarkCase):
+    def set_up(self):
+        self.stream = FakeStream()
+        self.enable_logging = False
+        self.data = np.ones(1000, dtype='float')
+        self.chunk_sizes = [10, 100]
+        self.rd = 3
+
+    def reset_stream(self):
+        self.total = 0.0
+
+    def time_sum(self, chunk):
+        self.total += chunk.sum()
+
+
 # ----- Functions with different order of input parameters -----
 def foo(data, mask):
     return data*mask
@@ -53,6 +86,139 @@ class TestBenchmarkLoader(unittest.TestCase):
         for case in suite:
             self.assertTrue(case.func_name in tests)
 
+    def test_load_parametrized_cases(self):
+        loader = BenchmarkLoader()
+        suite = list(loader.load_cases(BenchScaledMultiplication))
+        # 2 functions x 4 combinations of parameters
+        self.assertEqual(len(suite), 8)
+        params = [case.params for case in suite if case.func_name == 'time_foo']
+        self.assertIn({'scale': 2, 'dtype': 'float32'}, params)
+
+    def test_discover_with_selection(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            bench_dir = os.path.join(tmp_dir, 'benchmarks')
+            os.makedirs(bench_dir)
+            for name in ['bench_sel_a', 'bench_sel_b']:
+                with open(os.path.join(bench_dir, name + '.py'), 'w') as f:
+                    f.write(SELECTION_SOURCE.format(name=name))
+            cache_path = os.path.join(tmp_dir, 'discovery.json')
+            loader = BenchmarkLoader(cache_path)
+
+            suite = loader.discover(tmp_dir, cases=['bench_sel_a.time_foo'])
+            self.assertEqual([(type(c).__name__, c.func_name) for c in suite],
+                             [('Bench_bench_sel_a', 'time_foo')])
+            # Files without any selected case are not imported
+            self.assertNotIn('bench_sel_b', sys.modules)
+            self.assertTrue(os.path.exists(cache_path))
+
+            suite = loader.discover(tmp_dir, classes=['Bench_bench_sel_b'])
+            self.assertEqual(sorted(c.func_name for c in suite),
+                             ['time_bar', 'time_foo'])
+            self.assertEqual(len(list(loader.discover(tmp_dir))), 4)
+        finally:
+            for name in ['bench_sel_a', 'bench_sel_b']:
+                sys.modules.pop(name, None)
+            shutil.rmtree(tmp_dir)
+
+
+SELECTION_SOURCE = '''
+from gofft.bench import BenchmarkCase
+
+
+class Bench_{name}(BenchmarkCase):
+    def time_foo(self, data):
+        pass
+
+    def time_bar(self, data):
+        pass
+'''
+
+
+class TestParamGrid(unittest.TestCase):
+    def test_expand(self):
+        grid = expand_param_grid({'b': [1, 2], 'a': ['x']})
+        self.assertEqual(grid, [{'a': 'x', 'b': 1}, {'a': 'x', 'b': 2}])
+        self.assertEqual(expand_param_grid({}), [{}])
+
+    def test_format(self):
+        self.assertEqual(format_params({'b': 1, 'a': 'x'}), '[a=x,b=1]')
+        self.assertEqual(format_params({}), '')
+
+
+class TestBenchmarkCase(unittest.TestCase):
+    def test_run(self):
+        case = BenchArrayMultiplication('time_foo')
+        tlog = case.run()
+        self.assertEqual(tlog.shape, (case.step + 1, case.rd + 1))
+        self.assertTrue(np.all(tlog[1:, 1:] > 0))
+        # Inner loops are scaled to reach `min_time`
+        self.assertTrue(np.all(case.loops[1:] >= 1))
+        self.assertEqual(case.summary.shape, (case.step, 6))
+        np.testing.assert_allclose(case.summary[:, 0], tlog[1:, 0])
+        self.assertIsNone(case.memlog)
+
+    def test_throughput(self):
+        case = BenchArrayMultiplication('time_foo')
+        case.run()
+        # No op-count model of `time_foo`, only samples/s is available
+        self.assertEqual(case.throughput.shape, (case.step, 4))
+        np.testing.assert_allclose(case.throughput[:, 0],
+                                   case.summary[:, 0]/case.summary[:, 1])
+        self.assertTrue(np.all(np.isnan(case.throughput[:, 2])))
+
+        # Op-count model of `time_bar`
+        case = BenchArrayMultiplication('time_bar')
+        case.work_bar = lambda n: {'flops': n, 'bytes': 16*n}
+        case.run()
+        np.testing.assert_allclose(case.throughput[:, 2],
+                                   case.throughput[:, 0])
+        np.testing.assert_allclose(case.throughput[:, 3],
+                                   16*case.throughput[:, 0])
+
+    def test_run_with_memory_profiling(self):
+        case = BenchArrayMultiplication('time_foo')
+        case.profile_memory = True
+        case.run()
+        self.assertEqual(case.memlog.shape, (case.step + 1, 2))
+        # An array of `data.size` floats is allocated in `foo()`
+        self.assertTrue(np.all(case.memlog[-1] >= case.data.nbytes))
+
+
+class TestStreamingBenchmarkCase(unittest.TestCase):
+    def test_load_cases(self):
+        suite = BenchmarkLoader().load_cases(BenchStreamingSum)
+        self.assertEqual([case.func_name for case in suite], ['time_sum'])
+
+    def test_run(self):
+        case = BenchStreamingSum('time_sum')
+        tlog = case.run()
+        # All chunks are fed in each round
+        self.assertEqual(case.total, 1000)
+        self.assertEqual(tlog.shape, (3, case.rd + 1))
+        np.testing.assert_array_equal(tlog[1:, 0], [10, 100])
+        self.assertEqual(list(case.loops[1:]), [100, 10])
+        self.assertEqual(case.latency.shape, (3, len(LATENCY_COLUMNS)))
+        p50, p99, p999, jitter = case.latency[1]
+        self.assertTrue(0 < p50 <= p99 <= p999)
+        # 3 rounds of 100 chunks of size 10
+        self.assertEqual(case.histogram.shape, (len(LATENCY_BINS) - 1, 3))
+        self.assertEqual(case.histogram[:, 1].sum(), 300)
+        # Throughput is derived from the mean latency of chunks
+        self.assertEqual(case.throughput.shape, (2, 4))
+        self.assertTrue(np.all(case.throughput[:, 0] > 0))
+
+    def test_rate(self):
+        case = BenchStreamingSum('time_sum')
+        case.set_up = lambda: (BenchStreamingSum.set_up(case),
+                               setattr(case, 'chunk_sizes', [100]),
+                               setattr(case, 'rd', 1),
+                               setattr(case, 'rate', 1e5))
+        st = time.time()
+        case.run()
+        # 1000 samples arrive at 1e5 samples/s
+        self.assertTrue(time.time() - st >= 0.01)
+
 
 class TestBenchmarkRunner(unittest.TestCase):
     def test_run_suite(self):
@@ -60,3 +226,69 @@ class TestBenchmarkRunner(unittest.TestCase):
         suite = loader.load_cases(BenchArrayMultiplication)
         runner = BenchmarkRunner()
         runner.run_benchmark_suite(suite)
+
+    def test_run_suite_isolated(self):
+        loader = BenchmarkLoader()
+        suite = loader.load_cases(BenchArrayMultiplication)
+        runner = BenchmarkRunner(isolate=True, jobs=2, stream=FakeStream())
+        runner.run_benchmark_suite(suite)
+        for case in suite:
+            # Results are merged back from subprocesses (`step` is 10)
+            self.assertEqual(case.summary.shape, (10, 6))
+
+    def test_write_tidy_table(self):
+        cwd = os.getcwd()
+        tmpdir = tempfile.mkdtemp()
+        try:
+            os.chdir(tmpdir)
+            suite = BenchmarkLoader().load_cases(BenchScaledMultiplication)
+            runner = BenchmarkRunner(stream=FakeStream())
+            runner.run_benchmark_suite(suite)
+            rows = read_tidy(os.path.join(
+                tmpdir, 'bench_log', 'tidy', 'BenchScaledMultiplication.csv'))
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(tmpdir)
+        # 8 cases x 10 steps x 3 rounds
+        self.assertEqual(len(rows), 240)
+        self.assertEqual(set(rows[0].keys()),
+                         set(['func', 'dtype', 'scale', 'length', 'round',
+                              'time']))
+        self.assertEqual(set(r['scale'] for r in rows), set([1, 2]))
+
+    def test_write_binary_log(self):
+        cwd = os.getcwd()
+        tmpdir = tempfile.mkdtemp()
+        try:
+            os.chdir(tmpdir)
+            suite = BenchmarkLoader().load_cases(BenchScaledMultiplication)
+            runner = BenchmarkRunner(log_writer_class=NpyLogWriter,
+                                     stream=FakeStream())
+            runner.run_benchmark_suite(suite)
+            fn = os.path.join(tmpdir, 'bench_log',
+                'BenchScaledMultiplication_time_foo[dtype=float32,scale=2].npy')
+            x, y = LogReader().read(fn)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(tmpdir)
+        self.assertEqual(y.shape, (11, 3))
+
+    def test_parallel_requires_isolation(self):
+        with self.assertRaises(ValueError):
+            BenchmarkRunner(jobs=2)
+
+
+class TestMeasureImportTime(unittest.TestCase):
+    def test_measure(self):
+        elapsed = measure_import_time('os', repeat=2)
+        self.assertEqual(elapsed.shape, (2,))
+        self.assertTrue(np.all(elapsed >= 0))
+
+    def test_heavy_modules_are_not_imported(self):
+        """ `import gofft` should not import scipy and matplotlib """
+        import subprocess
+        import sys
+        script = ('import sys, gofft; '
+                  'print(any(m in sys.modules for m in ["scipy", "matplotlib"]))')
+        out = subprocess.check_output([sys.executable, '-c', script])
+        self.assertEqual(out.decode('utf-8').strip(), 'False')
@@ -0,0 +1,82 @@
+from __future__ import absolute_import, division
+import os
+import shutil
+import tempfile
+import textwrap
+import unittest
+
+from gofft.bench import DiscoveryIndex, scan_benchmark_file, match_patterns
+
+
+BENCH_SOURCE = textwrap.dedent('''
+    from gofft.bench import BenchmarkCase, StreamingBenchmarkCase
+
+    class BenchBase(BenchmarkCase):
+        def set_up(self):
+            pass
+
+        def time_foo(self, data):
+            pass
+
+    class BenchDerived(BenchBase):
+        def time_bar(self, data):
+            pass
+
+    class BenchStream(StreamingBenchmarkCase):
+        def time_chunk(self, chunk):
+            pass
+
+    class Helper(object):
+        def time_not_a_case(self):
+            pass
+''')
+
+
+class TestScan(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'bench_foo.py')
+        with open(self.path, 'w') as f:
+            f.write(BENCH_SOURCE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_scan(self):
+        cases = scan_benchmark_file(self.path)
+        self.assertEqual(cases, {
+            'BenchBase': ['time_foo'],
+            'BenchDerived': ['time_bar', 'time_foo'],
+            'BenchStream': ['time_chunk'],
+        })
+
+    def test_index_cache(self):
+        cache_path = os.path.join(self.tmp_dir, 'cache', 'index.json')
+        index = DiscoveryIndex(cache_path)
+        cases = index.get(self.path)
+        index.save()
+        self.assertTrue(os.path.exists(cache_path))
+
+        # Unchanged files are not parsed again
+        index = DiscoveryIndex(cache_path)
+        self.assertEqual(index.get(self.path), cases)
+        self.assertFalse(index.modified)
+
+        with open(self.path, 'a') as f:
+            f.write('\n\nclass BenchNew(BenchmarkCase):\n'
+                    '    def time_new(self, data):\n        pass\n')
+        stat = os.stat(self.path)
+        os.utime(self.path, (stat.st_atime, stat.st_mtime + 1))
+        self.assertIn('BenchNew', index.get(self.path))
+        self.assertTrue(index.modified)
+
+
+class TestMatchPatterns(unittest.TestCase):
+    def test_match(self):
+        name = 'BenchDSP.time_goertzel_m'
+        self.assertTrue(match_patterns(name, None))
+        self.assertTrue(match_patterns(name, ['goertzel_m']))
+        self.assertTrue(match_patterns(name, ['foo', 'BenchDSP.']))
+        self.assertTrue(match_patterns(name, ['Bench*.time_goertzel_?']))
+        self.assertFalse(match_patterns(name, ['goertzel_st']))
+        self.assertFalse(match_patterns(name, ['*.time_goertzel']))
@@ -0,0 +1,72 @@
+from __future__ import absolute_import, division
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from gofft.bench import (LogWriter, NpyLogWriter, LogReader, log_columns,
+                         export_csv, MEMORY_COLUMNS)
+
+
+class TestLog(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fn = os.path.join(self.tmpdir, 'log.csv')
+        self.log = np.arange(24, dtype='float').reshape(4, 6)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_without_header(self):
+        LogWriter().write(self.fn, self.log)
+        x, y = LogReader().read(self.fn)
+        np.testing.assert_allclose(x, self.log[:, 0])
+        np.testing.assert_allclose(y, self.log[:, 1:])
+
+    def test_read_extra_columns(self):
+        columns = log_columns(3, MEMORY_COLUMNS)
+        LogWriter().write(self.fn, self.log, header=','.join(columns))
+
+        reader = LogReader()
+        x, y = reader.read(self.fn)
+        np.testing.assert_allclose(x, self.log[:, 0])
+        # Extra columns are not elapsed time
+        np.testing.assert_allclose(y, self.log[:, 1:4])
+
+        content = reader.read_columns(self.fn)
+        self.assertEqual(list(content.keys()), columns)
+        np.testing.assert_allclose(content['rss_peak'], self.log[:, 5])
+
+
+class TestNpyLog(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fn = os.path.join(self.tmpdir, 'log.npy')
+        self.log = np.random.RandomState(0).rand(4, 6)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_without_header(self):
+        NpyLogWriter().write(self.fn, self.log)
+        x, y = LogReader().read(self.fn)
+        # Binary logs keep full precision
+        np.testing.assert_array_equal(x, self.log[:, 0])
+        np.testing.assert_array_equal(y, self.log[:, 1:])
+
+    def test_read_extra_columns(self):
+        columns = log_columns(3, MEMORY_COLUMNS)
+        NpyLogWriter().write(self.fn, self.log, header=','.join(columns))
+        content = LogReader().read_columns(self.fn)
+        self.assertEqual(list(content.keys()), columns)
+        np.testing.assert_array_equal(content['rss_peak'], self.log[:, 5])
+
+    def test_export_csv(self):
+        columns = log_columns(3, MEMORY_COLUMNS)
+        NpyLogWriter().write(self.fn, self.log, header=','.join(columns))
+        csv_fn = export_csv(self.fn)
+        self.assertTrue(csv_fn.endswith('.csv'))
+        content = LogReader().read_columns(csv_fn)
+        self.assertEqual(list(content.keys()), columns)
+        np.testing.assert_allclose(content['time_2'], self.log[:, 3])
@@ -0,0 +1,97 @@
+from __future__ import absolute_import, division
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from gofft.bench import (multitone, chirp, noise, dtmf, int16_stream,
+                         cached_signal)
+from gofft.bench import signals
+
+
+class TestGenerators(unittest.TestCase):
+    def test_multitone(self):
+        fs, n = 1000, 3000
+        sig = multitone(n, fs, [50, 120], amps=[1.0, 0.5], phases=[0, 1])
+        t = np.arange(n)/fs
+        expected = np.sin(2*np.pi*50*t) + 0.5*np.sin(2*np.pi*120*t + 1)
+        np.testing.assert_allclose(sig, expected, atol=1e-9)
+
+    def test_multitone_across_chunks(self):
+        fs, n = 1000, 2500
+        old_size = signals.CHUNK_SIZE
+        signals.CHUNK_SIZE = 1000
+        try:
+            sig = multitone(n, fs, [33.3], phases=0.5)
+        finally:
+            signals.CHUNK_SIZE = old_size
+        expected = np.sin(2*np.pi*33.3*np.arange(n)/fs + 0.5)
+        np.testing.assert_allclose(sig, expected, atol=1e-9)
+
+    def test_seed(self):
+        a = multitone(1000, 1000, [50], noise_level=0.1, seed=1)
+        b = multitone(1000, 1000, [50], noise_level=0.1, seed=1)
+        c = multitone(1000, 1000, [50], noise_level=0.1, seed=2)
+        np.testing.assert_array_equal(a, b)
+        self.assertFalse(np.array_equal(a, c))
+        np.testing.assert_array_equal(noise(100, 'pink', seed=3),
+                                      noise(100, 'pink', seed=3))
+
+    def test_chirp(self):
+        sig = chirp(1000, 1000, 10, 100)
+        self.assertEqual(sig.shape, (1000,))
+        self.assertTrue(np.all(np.abs(sig) <= 1))
+        with self.assertRaises(ValueError):
+            chirp(1000, 1000, 10, 100, method='foo')
+
+    def test_noise(self):
+        for color in ['white', 'pink', 'brown']:
+            sig = noise(4096, color, seed=0)
+            self.assertAlmostEqual(sig.std(), 1.0)
+        with self.assertRaises(ValueError):
+            noise(10, 'blue')
+
+    def test_dtmf(self):
+        fs = 8000
+        sig = dtmf('15', fs=fs, tone_duration=0.1, pause_duration=0.05)
+        self.assertEqual(len(sig), 2*(800 + 400))
+        spec = np.abs(np.fft.rfft(sig[:800]))
+        freqs = np.fft.rfftfreq(800, 1/fs)
+        peaks = sorted(freqs[np.argsort(spec)[-2:]])
+        np.testing.assert_allclose(peaks, [697, 1209], atol=fs/800)
+        self.assertTrue(np.all(sig[800:1200] == 0))
+        with self.assertRaises(ValueError):
+            dtmf('1x')
+
+    def test_int16_stream(self):
+        sig = int16_stream(10000, 8000, [697, 1209], seed=0)
+        self.assertEqual(sig.dtype, np.int16)
+        self.assertTrue(np.abs(sig).max() < 0.6*np.iinfo(np.int16).max)
+
+
+class TestCachedSignal(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache(self):
+        calls = []
+
+        def gen(n, seed):
+            calls.append(n)
+            return noise(n, seed=seed)
+
+        kwargs = dict(cache_dir=self.cache_dir, n=100, seed=0)
+        a = cached_signal('foo', gen, **kwargs)
+        b = cached_signal('foo', gen, **kwargs)
+        np.testing.assert_array_equal(a, b)
+        self.assertEqual(len(calls), 1)
+        self.assertIsInstance(b, np.memmap)
+
+        # Different arguments are cached separately
+        cached_signal('foo', gen, cache_dir=self.cache_dir, n=100, seed=1)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
@@ -0,0 +1,51 @@
+from __future__ import absolute_import, division
+import unittest
+import numpy as np
+
+from gofft.bench import (summarize, median_ci, count_outliers, latency_stats,
+                         latency_histogram, LATENCY_BINS)
+
+
+class TestStats(unittest.TestCase):
+    def test_median_ci(self):
+        x = np.arange(100, dtype='float')
+        lo, hi = median_ci(x)
+        self.assertTrue(lo < np.median(x) < hi)
+        self.assertTrue(lo >= 35 and hi <= 65)
+
+    def test_median_ci_few_samples(self):
+        lo, hi = median_ci([3.0, 1.0, 2.0])
+        self.assertEqual((lo, hi), (1.0, 3.0))
+
+    def test_count_outliers(self):
+        x = np.ones(20)
+        x[:10] = 1.1
+        x[0] = 100.0
+        self.assertEqual(count_outliers(x), 1)
+
+    def test_summarize(self):
+        tlog = np.array([[0, 0, 0, 0],
+                         [10, 1.0, 2.0, 3.0],
+                         [20, 2.0, 4.0, 6.0]])
+        summary = summarize(tlog)
+        self.assertEqual(summary.shape, (2, 6))
+        np.testing.assert_allclose(summary[:, 0], [10, 20])
+        np.testing.assert_allclose(summary[:, 1], [2.0, 4.0])
+        np.testing.assert_allclose(summary[:, 2], [1.0, 2.0])
+
+    def test_latency_stats(self):
+        x = np.ones(1000)*1e-5
+        x[-1] = 1e-3
+        p50, p99, p999, jitter = latency_stats(x)
+        self.assertAlmostEqual(p50, 1e-5)
+        self.assertAlmostEqual(p99, 1e-5)
+        self.assertTrue(p999 > 1e-5)
+        # Only the last chunk differs from the previous one
+        self.assertAlmostEqual(jitter, (1e-3 - 1e-5)/999)
+
+    def test_latency_histogram(self):
+        counts = latency_histogram([1e-5, 1e-5, 1e-3, 10.0])
+        self.assertEqual(len(counts), len(LATENCY_BINS) - 1)
+        self.assertEqual(counts.sum(), 4)
+        # Values out of range are counted in the last bin
+        self.assertEqual(counts[-1], 1)
@@ -0,0 +1,86 @@
+from __future__ import absolute_import, division
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from gofft.bench import (ResultStore, compare_results, git_commit,
+                         resolve_commit)
+
+
+def _make_tlog(scale, rd=5):
+    tlog = np.zeros((3, rd + 1))
+    tlog[1:, 0] = [100, 200]
+    noise = np.linspace(0.99, 1.01, rd)
+    tlog[1, 1:] = 1.0 * scale * noise
+    tlog[2, 1:] = 2.0 * scale * noise
+    return tlog
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ResultStore(os.path.join(self.tmpdir, 'results.jsonl'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _append_run(self, commit, timestamp, scale):
+        info = ResultStore.make_run_info(commit=commit, host='host',
+                                         timestamp=timestamp)
+        records = ResultStore.make_records('Bench.time_foo', _make_tlog(scale),
+                                           info)
+        self.store.append(records)
+        return records
+
+    def test_append_and_load(self):
+        records = self._append_run('abc123', 1.0, 1.0)
+        self.assertEqual(len(records), 2)
+        self.assertEqual(self.store.load(), records)
+
+    def test_find_run(self):
+        self._append_run('abc123', 1.0, 1.0)
+        self._append_run('abc123', 2.0, 1.5)
+        self._append_run('def456', 3.0, 2.0)
+        self.assertEqual(len(self.store.runs()), 3)
+
+        found = self.store.find_run(commit='abc')
+        self.assertEqual(len(found), 2)
+        self.assertTrue(all(r['timestamp'] == 2.0 for r in found))
+        self.assertEqual(self.store.find_run(commit='xyz'), [])
+
+    def test_find_run_exclude(self):
+        self._append_run('abc123', 1.0, 1.0)
+        self._append_run('abc123+dirty', 2.0, 1.5)
+        self._append_run('abc123', 3.0, 2.0)
+        # e.g. the current run of the same commit, which was just stored
+        found = self.store.find_run(commit='abc123', exclude=[3.0])
+        self.assertTrue(all(r['timestamp'] == 2.0 for r in found))
+        found = self.store.find_run(commit='abc123', exclude=[3.0],
+                                    include_dirty=False)
+        self.assertTrue(all(r['timestamp'] == 1.0 for r in found))
+
+    @unittest.skipIf(git_commit() == 'unknown', 'Not in a git repository.')
+    def test_resolve_commit(self):
+        head = resolve_commit('HEAD')
+        self.assertEqual(len(head), 40)
+        self.assertEqual(resolve_commit(head[:10]), head)
+        self.assertIsNone(resolve_commit('no-such-ref-0123'))
+
+    def test_compare(self):
+        base = self._append_run('abc123', 1.0, 1.0)
+        same = self._append_run('def456', 2.0, 1.0)
+        slow = self._append_run('ghi789', 3.0, 1.5)
+
+        report = compare_results(base, same)
+        self.assertEqual(len(report), 2)
+        self.assertFalse(any(r['slowdown'] for r in report))
+
+        report = compare_results(base, slow)
+        self.assertTrue(all(r['slowdown'] for r in report))
+        np.testing.assert_allclose([r['ratio'] for r in report], 1.5)
+
+        # Slowdown below threshold should not be reported
+        report = compare_results(base, slow, threshold=0.6)
+        self.assertFalse(any(r['slowdown'] for r in report))
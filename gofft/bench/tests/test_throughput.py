@@ -0,0 +1,35 @@
+from __future__ import absolute_import, division
+import unittest
+import numpy as np
+
+from gofft.bench import derive_throughput, roofline, THROUGHPUT_COLUMNS
+
+
+class TestDeriveThroughput(unittest.TestCase):
+    def test_derive(self):
+        work = [{'samples': 100, 'bins': 3, 'flops': 900, 'bytes': 800},
+                {'samples': 200, 'bins': 3, 'flops': 1800, 'bytes': 1600}]
+        res = derive_throughput(work, [1e-3, 2e-3])
+        self.assertEqual(res.shape, (2, len(THROUGHPUT_COLUMNS)))
+        np.testing.assert_allclose(res[0], [1e5, 3e5, 9e5, 8e5])
+        np.testing.assert_allclose(res[1], res[0])
+
+    def test_unknown_work(self):
+        res = derive_throughput([{'samples': 100}, {'samples': 0}], [1e-3, 0])
+        self.assertEqual(res[0, 0], 1e5)
+        self.assertTrue(np.all(np.isnan(res[0, 1:])))
+        # No elapsed time, no throughput
+        self.assertTrue(np.all(np.isnan(res[1])))
+
+
+class TestRoofline(unittest.TestCase):
+    def test_bound(self):
+        peaks = {'flops': 1e10, 'bandwidth': 1e10}
+        res = roofline(1e9, 1e10, peaks)
+        self.assertEqual(res['bound'], 'memory')
+        self.assertAlmostEqual(res['intensity'], 0.1)
+        self.assertAlmostEqual(res['efficiency'], 1.0)
+
+        res = roofline(5e9, 1e9, peaks)
+        self.assertEqual(res['bound'], 'compute')
+        self.assertAlmostEqual(res['efficiency'], 0.5)
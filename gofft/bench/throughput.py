@@ -0,0 +1,119 @@
+from __future__ import absolute_import, division
+
+import numpy as np
+
+__all__ = ['THROUGHPUT_COLUMNS', 'WORK_KEYS', 'derive_throughput',
+           'measure_peaks', 'roofline']
+
+
+# Amount of work done by a call of benchmarked function, see also
+# `BenchmarkCase.work()`.
+# - samples: number of input samples
+# - bins: number of evaluated frequency bins
+# - flops: number of floating point operations
+# - bytes: number of bytes moved from/to memory
+WORK_KEYS = ['samples', 'bins', 'flops', 'bytes']
+
+# Columns of derived metrics (per second)
+THROUGHPUT_COLUMNS = ['samples_per_s', 'bin_samples_per_s', 'flops',
+                      'bandwidth']
+
+
+def derive_throughput(work, elapsed):
+    """
+    Derive throughput metrics from the amount of work and elapsed time.
+
+    Parameters
+    ----------
+    work : list of dict
+        Amount of work of each step, keys are in `WORK_KEYS`. Missing keys
+        are taken as unknown.
+    elapsed : array_like
+        Elapsed time (in seconds) of each step.
+
+    Returns
+    -------
+    throughput : ndarray
+        Metrics in the order of `THROUGHPUT_COLUMNS`, one row per step. Metrics
+        of unknown amount of work are NaN.
+    """
+    elapsed = np.asarray(elapsed, dtype='float64')
+    nan = float('nan')
+    amount = np.array([[w.get(k, nan) for k in WORK_KEYS] for w in work],
+                      dtype='float64').reshape(-1, len(WORK_KEYS))
+    samples, bins, flops, nbytes = amount.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.column_stack([samples, samples*bins, flops, nbytes])
+        rate /= np.where(elapsed > 0, elapsed, nan)[:, None]
+    return rate
+
+
+def measure_peaks(size=1024, repeat=5):
+    """
+    Measure attainable peaks of current machine, which are used as the roof
+    of roofline model.
+
+    - flops: FLOP/s of matrix multiplication (`np.dot`, usually by BLAS) of
+      two `size` x `size` matrices.
+    - bandwidth: bytes/s of copying an array much larger than caches.
+
+    Returns
+    -------
+    peaks : dict
+        Best results of `repeat` measurements.
+    """
+    from .core import default_timer_ns
+
+    a = np.random.RandomState(0).rand(size, size)
+    b = np.random.RandomState(1).rand(size, size)
+    np.dot(a, b)
+    best = float('inf')
+    for _ in range(repeat):
+        st = default_timer_ns()
+        np.dot(a, b)
+        best = min(best, (default_timer_ns() - st)*1e-9)
+    flops = 2.0*size**3/best
+
+    # 64 MiB of float64, it's copied by reading and writing each byte once
+    src = np.ones(2**23)
+    dst = np.empty_like(src)
+    np.copyto(dst, src)
+    best = float('inf')
+    for _ in range(repeat):
+        st = default_timer_ns()
+        np.copyto(dst, src)
+        best = min(best, (default_timer_ns() - st)*1e-9)
+    bandwidth = 2.0*src.nbytes/best
+    return {'flops': flops, 'bandwidth': bandwidth}
+
+
+def roofline(flops, bandwidth, peaks):
+    """
+    Compare achieved throughput with the roofline of machine.
+
+    Parameters
+    ----------
+    flops : float
+        Achieved FLOP/s.
+    bandwidth : float
+        Achieved memory bandwidth (bytes/s).
+    peaks : dict
+        Result of `measure_peaks()`.
+
+    Returns
+    -------
+    result : dict
+        - intensity: arithmetic intensity (FLOP/byte)
+        - attainable: attainable FLOP/s at this intensity
+        - efficiency: achieved FLOP/s relative to `attainable`
+        - bound: 'memory' or 'compute'
+    """
+    intensity = flops/bandwidth if bandwidth > 0 else float('inf')
+    memory_roof = intensity*peaks['bandwidth']
+    attainable = min(peaks['flops'], memory_roof)
+    return {
+        'intensity': intensity,
+        'attainable': attainable,
+        'efficiency': flops/attainable if attainable > 0 else float('nan'),
+        'bound': 'memory' if memory_roof < peaks['flops'] else 'compute',
+    }
@@ -0,0 +1,78 @@
+"""
+Entry of a subprocess which runs a single benchmark case, so that cases can
+be isolated from each other. Usage:
+
+    python -m gofft.bench.worker <module file> <class name> <func name> \
+        <output file> [--cpu <cpu id>] [--profile-memory] [--params <json>]
+
+Result is saved into `<output file>` (.npz), which contains `tlog`,
+`summary`, `loops`, `enable_logging` and optional results of the case
+(`memlog`, `throughput`, `latency` and `histogram`) if they are available.
+"""
+from __future__ import absolute_import
+
+import os
+import sys
+import json
+import numpy as np
+from argparse import ArgumentParser
+
+__all__ = ['pin_cpu', 'run_case']
+
+
+def pin_cpu(cpu):
+    """
+    Pin current process to the given CPU. Return False if it's not supported
+    on current platform.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    os.sched_setaffinity(0, set([cpu]))
+    return True
+
+
+def run_case(module_file, class_name, func_name, output, profile_memory=False,
+             params=None):
+    from .core import _load_module, _OPTIONAL_RESULTS
+
+    name = os.path.basename(module_file).split('.')[0]
+    mod = _load_module(name, module_file)
+    case_class = getattr(mod, class_name)
+
+    case_class.set_up_class()
+    try:
+        case = case_class(func_name, params=params)
+        case.profile_memory = profile_memory
+        tlog = case.run()
+    finally:
+        case_class.tear_down_class()
+
+    summary = case.summary if case.summary is not None else np.zeros((0, 0))
+    result = dict(tlog=tlog, summary=summary, loops=case.loops,
+                  enable_logging=case.enable_logging)
+    for name in _OPTIONAL_RESULTS:
+        value = getattr(case, name, None)
+        if value is not None:
+            result[name] = value
+    np.savez(output, **result)
+
+
+def main(argv=None):
+    parser = ArgumentParser()
+    parser.add_argument('module_file')
+    parser.add_argument('class_name')
+    parser.add_argument('func_name')
+    parser.add_argument('output')
+    parser.add_argument('--cpu', type=int, default=None)
+    parser.add_argument('--profile-memory', action='store_true', default=False)
+    parser.add_argument('--params', type=json.loads, default=None)
+    args = parser.parse_args(argv)
+
+    if args.cpu is not None:
+        pin_cpu(args.cpu)
+    run_case(args.module_file, args.class_name, args.func_name, args.output,
+             profile_memory=args.profile_memory, params=args.params)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
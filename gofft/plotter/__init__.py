@@ -1,7 +1,10 @@
 from __future__ import absolute_import
 from . import plotter
 from .plotter import *
+from . import report
+from .report import *
 
 
 __all__ = []
 __all__.extend(plotter.__all__)
+__all__.extend(report.__all__)
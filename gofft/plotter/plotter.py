@@ -2,11 +2,10 @@ from __future__ import absolute_import
 import os
 import re
 import numpy as np
-import matplotlib.pylab as plt
-from gofft.bench import LogReader
+from gofft.bench import LogReader, read_tidy
 
 
-__all__ = ['LogPlotter']
+__all__ = ['LogPlotter', 'GridPlotter']
 
 
 COLORS = ['b', 'g', 'r', 'c', 'm', 'y', 'k', 'w']
@@ -18,10 +17,34 @@ REGRESSION_LINE_TYPE = {
     'median': lambda x, axis: np.median(x, axis=axis)
 }
 
+METRIC_LABELS = {
+    'time': 'Time (s)',
+    'tracemalloc_peak': 'Peak traced memory (bytes)',
+    'rss_peak': 'Peak RSS (bytes)',
+    'p50': 'Latency (s)',
+    'p99': 'Latency (s)',
+    'p999': 'Latency (s)',
+    'jitter': 'Jitter (s)',
+}
+
+METRIC_TITLES = {
+    'time': 'Comparision of running time',
+    'tracemalloc_peak': 'Comparision of traced memory',
+    'rss_peak': 'Comparision of resident memory',
+    'p50': 'Median latency per chunk',
+    'p99': '99th percentile of latency per chunk',
+    'p999': '99.9th percentile of latency per chunk',
+    'jitter': 'Jitter of latency per chunk',
+}
+
+
+PARAMS_REGEX = re.compile(r'\[.*\]$')
+
+
 class LogPlotter(object):
     log_reader_class = LogReader
 
-    def __init__(self, log_dir_name, file_pattern='Bench*.csv', log_reader_class=None,
+    def __init__(self, log_dir_name, file_pattern='Bench*', log_reader_class=None,
                  alg_pat=r'time_(\w+)'):
         self.log_dir_name = log_dir_name
         self.file_pat = file_pattern
@@ -43,20 +66,37 @@ class LogPlotter(object):
             raise IOError('No such directory: {}'.format(log_dir))
 
         files = os.listdir(log_dir)
-        log_files = [os.path.join(log_dir ,f) for f in files if fnmatch(f, self.file_pat)]
-        return log_files
+        # Only files in formats supported by log reader (e.g. not sidecars
+        # of binary logs)
+        exts = self.log_reader_class.extensions
+        log_files = [os.path.join(log_dir ,f) for f in files
+                     if fnmatch(f, self.file_pat) and
+                     os.path.splitext(f)[1] in exts]
+
+        # A case may have been logged in several formats (e.g. `--log_format`
+        # was changed between runs), only the newest log of it is kept.
+        newest = {}
+        for fn in log_files:
+            key = os.path.splitext(fn)[0]
+            if (key not in newest or
+                    os.path.getmtime(fn) > os.path.getmtime(newest[key])):
+                newest[key] = fn
+        return sorted(newest.values())
 
     def _get_alg_name(self, fn):
         # Get file name without extension
-        fn_wo_ext = os.path.basename(fn).split('.')[0]
+        fn_wo_ext = os.path.splitext(os.path.basename(fn))[0]
         res = self.alg_regex.search(fn_wo_ext)
         if len(res.groups()) != 1:
             raise Exception('Filename does not match to the pattern.')
-        return res.group(1)
+        # Keep parameters of parametrized cases, e.g. `[width=250]`
+        params = PARAMS_REGEX.search(fn_wo_ext)
+        return res.group(1) + (params.group(0) if params else '')
 
-    def plot(self, reg_line_type='median', line_plot=True, scatter_plot=False):
+    def plot(self, reg_line_type='median', line_plot=True, scatter_plot=False,
+             metrics=('time',)):
         """
-        Plot all log files. (currently, only .csv file is supported)
+        Plot all log files in formats supported by log reader.
 
         Parameters
         ----------
@@ -67,11 +107,22 @@ class LogPlotter(object):
             If true, regression line will be plotted.
         sactter_plot : bool, optional.
             If true, all data points in a log will be plotted.
+        metrics : list of str, optional
+            Metrics to be plotted side by side, available metrics: 'time',
+            columns written by memory profiler ('tracemalloc_peak',
+            'rss_peak') and latency of streaming cases ('p50', 'p99', 'p999',
+            'jitter').
         """
+        # matplotlib is imported on first use to keep `import gofft` fast.
+        import matplotlib.pylab as plt
+
         if reg_line_type not in REGRESSION_LINE_TYPE:
             raise ValueError('Invalid `reg_line_type`.')
         if not line_plot and not scatter_plot:
             raise ValueError('At least one plot should be selected.')
+        for metric in metrics:
+            if metric not in METRIC_LABELS:
+                raise ValueError('Invalid metric: {}'.format(metric))
 
         log_files = self._get_log_files()
         if len(log_files) == 0:
@@ -79,15 +130,35 @@ class LogPlotter(object):
 
         log_reader = self.log_reader_class()
 
-        fig = plt.figure().add_subplot(1, 1, 1)
+        if len(metrics) > 1:
+            figure = plt.figure(figsize=(6*len(metrics), 5))
+        else:
+            figure = plt.figure()
+        for j, metric in enumerate(metrics):
+            fig = figure.add_subplot(1, len(metrics), j+1)
+            self._plot_metric(fig, log_reader, log_files, metric,
+                              reg_line_type, line_plot, scatter_plot)
+        plt.show()
+
+    def _read_metric(self, log_reader, fn, metric):
+        if metric == 'time':
+            return log_reader.read(fn)
+        columns = log_reader.read_columns(fn)
+        if metric not in columns:
+            raise ValueError('Metric {} is not available in log: {}'.format(
+                             metric, fn))
+        return columns['length'], columns[metric][:, None]
+
+    def _plot_metric(self, fig, log_reader, log_files, metric, reg_line_type,
+                     line_plot, scatter_plot):
         handles = []
         labels = []
 
-        for i, f in enumerate(log_files):     # test
-            x, y = log_reader.read(f)
+        for i, f in enumerate(log_files):
+            x, y = self._read_metric(log_reader, f, metric)
             if scatter_plot:
-                fig.plot(x, y, marker='+', linestyle='None', 
-                         color=COLORS[i%len(COLORS)])
+                handle = fig.plot(x, y, marker='+', linestyle='None', 
+                                  color=COLORS[i%len(COLORS)])[0]
             if line_plot:
                 reg_line = REGRESSION_LINE_TYPE[reg_line_type](y, axis=1)
                 handle, = fig.plot(x, reg_line, linestyle='-', 
@@ -98,9 +169,99 @@ class LogPlotter(object):
             labels.append(alg_name)
 
         fig.legend(handles, labels, loc=2)
-        plt.xlim(xmax=x[-1])
-        plt.title('Comparision of running time')
-        plt.xlabel('Data length')
-        plt.ylabel('Time (s)')
-        plt.grid()
+        fig.set_xlim(right=x[-1])
+        fig.set_title(METRIC_TITLES[metric])
+        fig.set_xlabel('Data length')
+        fig.set_ylabel(METRIC_LABELS[metric])
+        fig.grid()
+
+
+class GridPlotter(object):
+    """
+    Plot scaling curves of parametrized benchmark cases from a tidy table,
+    see also `BenchmarkCase.param_grid`.
+
+    Parameters
+    ----------
+    tidy_file : str
+        Path of tidy table, e.g. `bench_log/tidy/<Class>.csv`.
+    """
+    def __init__(self, tidy_file):
+        self.tidy_file = tidy_file
+
+    def plot(self, x='length', col='func', length=None, reg_line_type='median',
+             logscale=True):
+        """
+        Parameters
+        ----------
+        x : str, optional
+            Parameter (or 'length') for x-axis.
+        col : str, optional
+            Parameter whose values are plotted in separated subplots.
+        length : int, optional
+            Data length to be plotted if `x` is not 'length'. Default: the
+            largest one.
+        reg_line_type : str, optional
+            Statistic of rounds, available mode: ['max', 'min', 'mean',
+            'median']
+        logscale : bool, optional
+            If true, both axes are in log scale.
+
+        Note
+        ----
+        Each line corresponds to a combination of the remaining parameters.
+        """
+        import matplotlib.pylab as plt
+
+        if reg_line_type not in REGRESSION_LINE_TYPE:
+            raise ValueError('Invalid `reg_line_type`.')
+        rows = read_tidy(self.tidy_file)
+        if len(rows) == 0:
+            raise Exception('No data can be plotted.')
+        for name in [x, col]:
+            if name is not None and name not in rows[0]:
+                raise ValueError('Invalid column: {}'.format(name))
+
+        if x != 'length':
+            if length is None:
+                length = max(r['length'] for r in rows)
+            rows = [r for r in rows if r['length'] == length]
+
+        fixed = set([x, col, 'length', 'round', 'time'])
+        hue_keys = sorted(k for k in rows[0].keys() if k not in fixed)
+        col_values = sorted(set(r[col] for r in rows)) if col else [None]
+
+        figure = plt.figure(figsize=(6*len(col_values), 5))
+        for j, cv in enumerate(col_values):
+            fig = figure.add_subplot(1, len(col_values), j+1)
+            sub = [r for r in rows if col is None or r[col] == cv]
+            lines = {}
+            for r in sub:
+                hue = tuple(r[k] for k in hue_keys)
+                lines.setdefault(hue, {}).setdefault(r[x], []).append(r['time'])
+
+            for i, hue in enumerate(sorted(lines.keys())):
+                points = lines[hue]
+                xs = sorted(points.keys())
+                ys = [REGRESSION_LINE_TYPE[reg_line_type](
+                      np.asarray(points[v]), axis=0) for v in xs]
+                label = ','.join('{}={}'.format(k, v)
+                                 for k, v in zip(hue_keys, hue))
+                fig.plot(xs, ys, marker='o', linestyle='-',
+                         color=COLORS[i%len(COLORS)], label=label or None)
+
+            if logscale:
+                fig.set_xscale('log')
+                fig.set_yscale('log')
+            title = 'Scaling over {}'.format(x)
+            if col is not None:
+                title += ' ({}={})'.format(col, cv)
+            if x != 'length':
+                title += ', length={}'.format(length)
+            fig.set_title(title)
+            fig.set_xlabel(x)
+            fig.set_ylabel('Time (s)')
+            fig.grid()
+            if len(lines) > 1 or hue_keys:
+                fig.legend(loc=2, fontsize='small')
         plt.show()
@@ -0,0 +1,229 @@
+from __future__ import absolute_import, division
+import io
+import json
+import os
+import numpy as np
+from .plotter import LogPlotter, COLORS, REGRESSION_LINE_TYPE
+
+
+__all__ = ['ReportGenerator', 'scaling_exponent']
+
+
+def scaling_exponent(x, y):
+    """
+    Fit `y = c * x**k` in log-log scale and return the exponent `k`, e.g.
+    1 for an algorithm running in linear time.
+
+    Returns
+    -------
+    k : float
+        NaN if there are less than 2 valid (positive) points.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    valid = (x > 0) & (y > 0)
+    if np.count_nonzero(valid) < 2:
+        return float('nan')
+    k, _ = np.polyfit(np.log(x[valid]), np.log(y[valid]), 1)
+    return float(k)
+
+
+class ReportGenerator(LogPlotter):
+    """
+    Render static figures (SVG/PNG) and an HTML summary from benchmark logs
+    without a display (Agg backend), one figure per benchmark class.
+
+    Parsed logs are cached by modification time of log files in
+    `<out_dir>/cache.json`, and figures are regenerated only if any of their
+    logs has changed.
+
+    Parameters
+    ----------
+    log_dir_name : str
+        Directory of logs.
+    out_dir_name : str, optional
+        Directory of report. Default: `<log_dir_name>/report`.
+    formats : list of str, optional
+        Formats of figures.
+    reg_line_type : str, optional
+        Statistic of rounds, available mode: ['max', 'min', 'mean', 'median']
+    """
+    cache_name = 'cache.json'
+    index_name = 'index.html'
+
+    def __init__(self, log_dir_name, out_dir_name=None, file_pattern='Bench*',
+                 formats=('svg', 'png'), reg_line_type='median', **kwargs):
+        super(ReportGenerator, self).__init__(log_dir_name,
+                                              file_pattern=file_pattern,
+                                              **kwargs)
+        if reg_line_type not in REGRESSION_LINE_TYPE:
+            raise ValueError('Invalid `reg_line_type`.')
+        if out_dir_name is None:
+            out_dir_name = os.path.join(log_dir_name, 'report')
+        self.out_dir_name = out_dir_name
+        self.formats = list(formats)
+        self.reg_line_type = reg_line_type
+
+    def generate(self):
+        """
+        Returns
+        -------
+        index_path : str
+            Path of generated HTML summary.
+        rendered : list of str
+            Names of classes whose figures were (re)generated.
+        """
+        out_dir = os.path.join(os.getcwd(), self.out_dir_name)
+        if not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        log_files = sorted(self._get_log_files())
+        if len(log_files) == 0:
+            raise Exception('No log file can be reported.')
+
+        cache_path = os.path.join(out_dir, self.cache_name)
+        cache = self._load_cache(cache_path)
+        logs = {}
+        for fn in log_files:
+            key = os.path.basename(fn)
+            stat = os.stat(fn)
+            entry = cache['logs'].get(key)
+            if (entry is None or entry['mtime'] != stat.st_mtime or
+                    entry['size'] != stat.st_size or
+                    entry['reg_line_type'] != self.reg_line_type):
+                entry = self._parse_log(fn)
+                entry.update(mtime=stat.st_mtime, size=stat.st_size)
+            logs[key] = entry
+
+        groups = {}
+        for key in sorted(logs.keys()):
+            groups.setdefault(self._get_class_name(key), []).append(key)
+
+        rendered = []
+        figures = {}
+        for class_name, keys in sorted(groups.items()):
+            signature = [[k, logs[k]['mtime'], logs[k]['size']] for k in keys]
+            signature.append(self.reg_line_type)
+            figures[class_name] = signature
+            paths = [os.path.join(out_dir, '{0}.{1}'.format(class_name, ext))
+                     for ext in self.formats]
+            if (cache['figures'].get(class_name) == signature and
+                    all(os.path.exists(p) for p in paths)):
+                continue
+            self._render(class_name, [logs[k] for k in keys], paths)
+            rendered.append(class_name)
+
+        index_path = os.path.join(out_dir, self.index_name)
+        self._write_index(index_path, groups, logs)
+        with open(cache_path, 'w') as f:
+            json.dump({'logs': logs, 'figures': figures}, f)
+        return index_path, rendered
+
+    def _load_cache(self, path):
+        empty = {'logs': {}, 'figures': {}}
+        if not os.path.exists(path):
+            return empty
+        try:
+            with open(path, 'r') as f:
+                cache = json.load(f)
+        except ValueError:
+            # Broken cache, e.g. interrupted while writing
+            return empty
+        if not isinstance(cache, dict):
+            return empty
+        for k, v in empty.items():
+            cache.setdefault(k, v)
+        return cache
+
+    def _get_class_name(self, fn):
+        fn_wo_ext = os.path.splitext(os.path.basename(fn))[0]
+        res = self.alg_regex.search(fn_wo_ext)
+        if res is None:
+            return fn_wo_ext
+        return fn_wo_ext[:res.start()].rstrip('_')
+
+    def _parse_log(self, fn):
+        x, y = self.log_reader_class().read(fn)
+        x = np.asarray(x, dtype='float64')
+        y = REGRESSION_LINE_TYPE[self.reg_line_type](np.asarray(y), axis=1)
+        # First row is data length 0 (the baseline of each round)
+        valid = x > 0
+        x, y = x[valid], y[valid]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            throughput = np.where(y > 0, x/y, np.nan)
+        return {
+            'name': self._get_alg_name(fn),
+            'reg_line_type': self.reg_line_type,
+            'length': x.tolist(),
+            'time': y.tolist(),
+            'throughput': [float(v) for v in throughput],
+            'exponent': scaling_exponent(x, y),
+        }
+
+    def _render(self, class_name, entries, paths):
+        # Figures are drawn by the Agg canvas directly, so that neither a
+        # display nor `pyplot` (and its global state) is required.
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        figure = Figure(figsize=(12, 5))
+        FigureCanvasAgg(figure)
+        ax_time = figure.add_subplot(1, 2, 1)
+        ax_tput = figure.add_subplot(1, 2, 2)
+        for i, entry in enumerate(entries):
+            color = COLORS[i%len(COLORS)]
+            label = '{0} (k={1:.2f})'.format(entry['name'], entry['exponent'])
+            ax_time.plot(entry['length'], entry['time'], linestyle='-',
+                         color=color, label=label)
+            ax_tput.plot(entry['length'], entry['throughput'], linestyle='-',
+                         color=color, label=entry['name'])
+
+        ax_time.set_title('{0}: running time'.format(class_name))
+        ax_time.set_xlabel('Data length')
+        ax_time.set_ylabel('Time (s)')
+        ax_tput.set_title('{0}: throughput'.format(class_name))
+        ax_tput.set_xlabel('Data length')
+        ax_tput.set_ylabel('Throughput (samples/s)')
+        for ax in [ax_time, ax_tput]:
+            ax.grid()
+            ax.legend(loc=2, fontsize='small')
+        figure.tight_layout()
+        for path in paths:
+            figure.savefig(path)
+
+    def _write_index(self, path, groups, logs):
+        lines = ['<!DOCTYPE html>', '<html>', '<head>',
+                 '<meta charset="utf-8">',
+                 '<title>Benchmark report</title>',
+                 '<style>table {border-collapse: collapse;} '
+                 'td, th {border: 1px solid #999; padding: 2px 8px; '
+                 'text-align: right;}</style>',
+                 '</head>', '<body>', '<h1>Benchmark report</h1>']
+        for class_name, keys in sorted(groups.items()):
+            lines.append('<h2>{0}</h2>'.format(_escape(class_name)))
+            if self.formats:
+                lines.append('<img src="{0}.{1}" alt="{2}">'.format(
+                    _escape(class_name), self.formats[0], _escape(class_name)))
+            lines.append('<table>')
+            lines.append('<tr><th>case</th><th>max length</th>'
+                         '<th>{0} time (s)</th><th>throughput (samples/s)</th>'
+                         '<th>scaling exponent</th></tr>'.format(
+                             self.reg_line_type))
+            for k in keys:
+                entry = logs[k]
+                if len(entry['length']) == 0:
+                    continue
+                lines.append('<tr><td style="text-align: left">{0}</td>'
+                             '<td>{1:.0f}</td><td>{2:.3e}</td><td>{3:.3e}</td>'
+                             '<td>{4:.2f}</td></tr>'.format(
+                                 _escape(entry['name']), entry['length'][-1],
+                                 entry['time'][-1], entry['throughput'][-1],
+                                 entry['exponent']))
+            lines.append('</table>')
+        lines.extend(['</body>', '</html>', ''])
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(u'\n'.join(lines))
+
+
+def _escape(text):
+    return (text.replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;').replace('"', '&quot;'))
@@ -0,0 +1,76 @@
+from __future__ import absolute_import, division
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from gofft.bench import LogWriter, NpyLogWriter
+from gofft.plotter import ReportGenerator, scaling_exponent
+
+
+def write_log(fn, exponent, rd=3, writer_class=LogWriter):
+    length = np.arange(0, 1100, 100, dtype='float64')
+    elapsed = 1e-6*length**exponent
+    writer_class().write(fn, np.column_stack([length] + [elapsed]*rd))
+
+
+class TestScalingExponent(unittest.TestCase):
+    def test_fit(self):
+        x = np.array([10, 100, 1000, 10000])
+        self.assertAlmostEqual(scaling_exponent(x, 3*x**1.5), 1.5)
+        self.assertTrue(np.isnan(scaling_exponent([0, 10], [1, 2])))
+
+
+class TestReportGenerator(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.mkdtemp()
+        os.chdir(self.tmpdir)
+        os.mkdir('bench_log')
+        write_log(os.path.join('bench_log', 'BenchFoo_time_linear.csv'), 1)
+        write_log(os.path.join('bench_log', 'BenchFoo_time_quad.csv'), 2)
+        write_log(os.path.join('bench_log', 'BenchBar_time_linear.csv'), 1)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmpdir)
+
+    def test_generate(self):
+        generator = ReportGenerator('bench_log', formats=['svg'])
+        index, rendered = generator.generate()
+        self.assertEqual(rendered, ['BenchBar', 'BenchFoo'])
+        report_dir = os.path.join('bench_log', 'report')
+        self.assertTrue(os.path.exists(os.path.join(report_dir, 'BenchFoo.svg')))
+        with open(index) as f:
+            html = f.read()
+        self.assertIn('BenchFoo.svg', html)
+        # Throughput at length 1000 of the linear case is 1e6 samples/s
+        self.assertIn('1.000e+06', html)
+        self.assertIn('<td>2.00</td>', html)
+
+    def test_regenerate_changed_figures_only(self):
+        generator = ReportGenerator('bench_log', formats=['svg'])
+        generator.generate()
+        _, rendered = generator.generate()
+        self.assertEqual(rendered, [])
+
+        fn = os.path.join('bench_log', 'BenchBar_time_linear.csv')
+        write_log(fn, 1.5)
+        # Make sure that mtime is changed on filesystems of low resolution
+        mtime = os.stat(fn).st_mtime + 1
+        os.utime(fn, (mtime, mtime))
+        _, rendered = generator.generate()
+        self.assertEqual(rendered, ['BenchBar'])
+
+    def test_newest_log_per_case(self):
+        # The same case logged again in another format
+        fn = os.path.join('bench_log', 'BenchFoo_time_quad.npy')
+        write_log(fn, 2, writer_class=NpyLogWriter)
+        mtime = os.stat(fn).st_mtime + 1
+        os.utime(fn, (mtime, mtime))
+        generator = ReportGenerator('bench_log', formats=['svg'])
+        names = [os.path.basename(f) for f in generator._get_log_files()]
+        self.assertEqual(names, ['BenchBar_time_linear.csv',
+                                 'BenchFoo_time_linear.csv',
+                                 'BenchFoo_time_quad.npy'])
@@ -0,0 +1,12 @@
+from __future__ import absolute_import
+from . import protocol
+from .protocol import *
+from . import server
+from .server import *
+from . import client
+from .client import *
+
+__all__ = []
+__all__.extend(protocol.__all__)
+__all__.extend(server.__all__)
+__all__.extend(client.__all__)
@@ -0,0 +1,123 @@
+from __future__ import absolute_import, division
+
+import socket
+import threading
+
+import numpy as np
+
+from .protocol import default_socket_path, send_message, recv_message
+
+__all__ = ['GoertzelClient']
+
+
+# Errors re-raised by client as they are, others are raised as RuntimeError
+_ERRORS = {'ValueError': ValueError, 'TypeError': TypeError,
+           'KeyError': KeyError}
+
+
+class GoertzelClient(object):
+    """
+    Client of `GoertzelServer`, methods have the same signatures as
+    functions in `gofft.alg`.
+
+    Samples are copied into a segment of shared memory owned by the client,
+    which is reused by following requests (and replaced when a larger one
+    is needed), so they are never serialized. A client can be shared by
+    threads, but its requests are sent one at a time.
+
+    Parameters
+    ----------
+    socket_path : str, optional
+        Path of the socket of daemon, see also `default_socket_path()`.
+    timeout : float, optional
+        Timeout (in seconds) of socket operations.
+    """
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(self.socket_path)
+        self._shm = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._sock.close()
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
+
+    def ping(self):
+        return self._request({'op': 'ping'})['result'] == 'pong'
+
+    def stats(self):
+        """ Counters of the daemon, e.g. number of requests and batches. """
+        return self._request({'op': 'stats'})['result']
+
+    def goertzel_m(self, data, fs, ft, width, engine='loop', decimate=None,
+                   axis=-1):
+        """ Same as `gofft.alg.goertzel_m`, evaluated by the daemon. """
+        params = {'fs': fs, 'ft': _to_list(ft), 'width': width,
+                  'engine': engine, 'decimate': decimate, 'axis': axis}
+        val, _ = self._evaluate('goertzel_m', data, params)
+        return val
+
+    def goertzel_st_m(self, data, fs, ft, width, padding=False, decimate=None,
+                      axis=-1, engine='auto', gate=None, return_info=False):
+        """ Same as `gofft.alg.goertzel_st_m`, evaluated by the daemon. """
+        params = {'fs': fs, 'ft': _to_list(ft), 'width': width,
+                  'padding': padding, 'decimate': decimate, 'axis': axis,
+                  'engine': engine, 'gate': gate, 'return_info': return_info}
+        val, info = self._evaluate('goertzel_st_m', data, params)
+        return (val, info) if return_info else val
+
+    def _evaluate(self, op, data, params):
+        data = np.asarray(data)
+        dtype = np.dtype('complex' if np.iscomplexobj(data) else 'float')
+        with self._lock:
+            shm = self._reserve(max(data.size*dtype.itemsize, 1))
+            view = np.ndarray(data.shape, dtype=dtype, buffer=shm.buf)
+            view[...] = data
+            del view
+            resp = self._request_locked({
+                'op': op, 'params': params, 'shm': shm.name,
+                'shape': list(data.shape), 'dtype': dtype.str})
+        val = np.array(resp['result'], dtype='float').reshape(resp['shape'])
+        return val, resp.get('info')
+
+    def _reserve(self, nbytes):
+        from multiprocessing import shared_memory
+        if self._shm is None or self._shm.size < nbytes:
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
+            # Grow geometrically, so that segments are rarely replaced
+            size = 1 << max(16, (nbytes - 1).bit_length())
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        return self._shm
+
+    def _request(self, msg):
+        with self._lock:
+            return self._request_locked(msg)
+
+    def _request_locked(self, msg):
+        send_message(self._sock, msg)
+        resp = recv_message(self._sock)
+        if resp is None:
+            raise RuntimeError('Connection is closed by daemon.')
+        if 'error' in resp:
+            raise _ERRORS.get(resp['error'], RuntimeError)(resp['message'])
+        return resp
+
+
+def _to_list(ft):
+    ft = np.asarray(ft, dtype='float')
+    return ft.tolist()
@@ -0,0 +1,73 @@
+from __future__ import absolute_import, division
+
+import json
+import os
+import struct
+import tempfile
+
+__all__ = ['default_socket_path', 'send_message', 'recv_message',
+           'attach_shared_memory']
+
+
+# Messages are JSON objects prefixed by their size (4-byte, big-endian)
+_HEADER = struct.Struct('>I')
+
+
+def default_socket_path():
+    """
+    Path of the socket of daemon, it's given by environment variable
+    `GOFFT_SERVE_SOCKET`, or `<tmpdir>/gofft-<uid>.sock`.
+    """
+    path = os.environ.get('GOFFT_SERVE_SOCKET')
+    if path:
+        return path
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return os.path.join(tempfile.gettempdir(), 'gofft-{0}.sock'.format(uid))
+
+
+def send_message(sock, msg):
+    payload = json.dumps(msg).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    """ Return None if the connection is closed by peer. """
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exactly(sock, _HEADER.unpack(header)[0])
+    if payload is None:
+        return None
+    return json.loads(payload.decode('utf-8'))
+
+
+def _recv_exactly(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def attach_shared_memory(name):
+    """
+    Attach an existing segment of shared memory, which is owned (and will be
+    unlinked) by another process.
+    """
+    from multiprocessing import shared_memory, resource_tracker
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    # Python < 3.13 always registers attached segments to the resource
+    # tracker, which would unlink them when this process exits. Registration
+    # is skipped rather than undone, since the tracker may be shared with the
+    # owner (e.g. both ends in a process).
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
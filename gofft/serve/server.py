@@ -0,0 +1,375 @@
+from __future__ import absolute_import, division
+
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from ..alg import dsp
+from .protocol import (default_socket_path, send_message, recv_message,
+                       attach_shared_memory)
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+__all__ = ['GoertzelServer', 'Plan', 'serve']
+
+
+# Maximal number of plans kept by a server, they are keyed by
+# `(fs, ft, width)`.
+PLAN_CACHE_SIZE = 64
+
+
+class Plan(object):
+    """
+    Precomputed setup of a `(fs, ft, width)` configuration, which is shared
+    by all requests of it. The basis of gemm engine is computed on first use
+    and kept as long as the plan, regardless of `GEMM_BASIS_CACHE_SIZE`.
+    """
+    def __init__(self, fs, ft, width):
+        self.fs = fs
+        self.ft = np.ascontiguousarray(ft, dtype='float')
+        self.ft.flags.writeable = False
+        self.width = width
+        self._basis = None
+
+    @property
+    def basis(self):
+        if self._basis is None:
+            self._basis = dsp._gemm_basis(self.fs, self.ft, self.width)
+        return self._basis
+
+
+class _Request(object):
+    def __init__(self, msg, data):
+        self.op = msg['op']
+        self.params = msg['params']
+        self.data = data
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class GoertzelServer(object):
+    """
+    Evaluation daemon listening on a Unix domain socket.
+
+    Clients (see `GoertzelClient`) pass samples through shared memory and
+    only parameters go through the socket. Requests of concurrent clients
+    are evaluated by a single thread, which batches compatible ones:
+
+    - `goertzel_m` of real 1-D data with the same `(fs, ft, width, engine)`
+      are evaluated by a single call of `goertzel_m_ragged`.
+    - `goertzel_st_m` of 1-D data with the same parameters and length are
+      stacked into 2-D data and evaluated at once.
+
+    Other requests are evaluated one by one.
+
+    Parameters
+    ----------
+    socket_path : str, optional
+        Path of the socket, see also `default_socket_path()`.
+    max_batch : int, optional
+        Maximal number of requests evaluated in a batch.
+    batch_window : float, optional
+        Time (in seconds) to wait for more requests before a batch is
+        evaluated. By default, only requests that are already queued (i.e.
+        arrived while the previous batch was evaluated) are batched, which
+        adds no latency.
+    """
+    def __init__(self, socket_path=None, max_batch=64, batch_window=0.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.stats = {'requests': 0, 'batches': 0, 'kernel_calls': 0}
+        self._plans = OrderedDict()
+        self._queue = Queue()
+        self._stopped = threading.Event()
+        self._sock = None
+        self._threads = []
+
+    def plan(self, fs, ft, width):
+        """ Get the plan of a configuration, recently used ones are cached. """
+        ft = np.asarray(ft, dtype='float')
+        key = (fs, width, ft.shape, ft.tobytes())
+        plan = self._plans.pop(key, None)
+        if plan is None:
+            plan = Plan(fs, ft, width)
+            while len(self._plans) >= PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        self._plans[key] = plan
+        return plan
+
+    def start(self):
+        """ Start serving in background threads. """
+        self._bind()
+        for target in (self._accept_loop, self._batch_loop):
+            t = threading.Thread(target=target)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def serve_forever(self):
+        """ Serve until `shutdown()` is called (or interrupted). """
+        self.start()
+        try:
+            while not self._stopped.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._sock is not None:
+            try:
+                # Wake up the thread blocked in `accept()`
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+            self._sock.close()
+        for t in self._threads:
+            t.join()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def _bind(self):
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except socket.error:
+                # Stale socket of a daemon which was not shut down cleanly
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError('A daemon is already listening on '
+                                   '{0}'.format(self.socket_path))
+            finally:
+                probe.close()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socket_path)
+        self._sock.listen(16)
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.error:
+                break
+            t = threading.Thread(target=self._handle, args=(conn,))
+            t.daemon = True
+            t.start()
+
+    def _handle(self, conn):
+        # Segments of shared memory attached for this connection
+        segments = {}
+        try:
+            while True:
+                msg = recv_message(conn)
+                if msg is None:
+                    break
+                try:
+                    resp = self._respond(msg, segments)
+                except Exception as e:
+                    # Malformed request (e.g. missing keys, unknown dtype or
+                    # a shape exceeding the segment), the connection is kept.
+                    resp = {'error': type(e).__name__, 'message': str(e)}
+                send_message(conn, resp)
+        except socket.error:
+            pass
+        finally:
+            _close_segments(segments)
+            conn.close()
+
+    def _respond(self, msg, segments):
+        op = msg.get('op')
+        if op == 'ping':
+            return {'result': 'pong'}
+        if op == 'stats':
+            return {'result': dict(self.stats, plans=len(self._plans))}
+        if op not in ('goertzel_m', 'goertzel_st_m'):
+            return {'error': 'ValueError',
+                    'message': 'Unknown operation: {0}'.format(op)}
+
+        if np.ndim(msg['params']['ft']) != 1:
+            # Kernels expect a 1-D array, other shapes may crash the daemon
+            return {'error': 'ValueError',
+                    'message': 'Target frequency should be a 1-D array.'}
+
+        shm = segments.get(msg['shm'])
+        if shm is None:
+            # A client keeps a single segment, which is replaced when it
+            # grows, so the previous one is released.
+            _close_segments(segments)
+            shm = segments[msg['shm']] = attach_shared_memory(msg['shm'])
+        data = np.ndarray(msg['shape'], dtype=msg['dtype'], buffer=shm.buf)
+        req = _Request(msg, data)
+        self._queue.put(req)
+        req.done.wait()
+        # The view must be released before the segment can be closed
+        req.data = data = None
+
+        if req.error is not None:
+            return {'error': req.error[0], 'message': req.error[1]}
+        val, info = req.result
+        resp = {'result': np.asarray(val).tolist(),
+                'shape': list(np.shape(val))}
+        if info is not None:
+            resp['info'] = info
+        return resp
+
+    def _batch_loop(self):
+        while not self._stopped.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+            except Empty:
+                continue
+            deadline = time.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.time()
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            self._evaluate(batch)
+
+    def _evaluate(self, batch):
+        self.stats['requests'] += len(batch)
+        self.stats['batches'] += 1
+        groups = OrderedDict()
+        for req in batch:
+            try:
+                key = self._batch_key(req)
+            except Exception:
+                key = None
+            groups.setdefault(key, []).append(req)
+
+        for key, reqs in groups.items():
+            if key is None:
+                for req in reqs:
+                    self._run(self._evaluate_single, [req])
+            elif key[0] == 'goertzel_m':
+                self._run(self._evaluate_m, reqs)
+            else:
+                self._run(self._evaluate_st_m, reqs)
+
+    def _run(self, func, reqs):
+        self.stats['kernel_calls'] += 1
+        try:
+            results = func(reqs)
+        except Exception as e:
+            # Only the description is kept, a traceback would keep views of
+            # shared memory alive.
+            for req in reqs:
+                req.error = (type(e).__name__, str(e))
+        else:
+            for req, result in zip(reqs, results):
+                req.result = result
+        for req in reqs:
+            req.done.set()
+
+    def _batch_key(self, req):
+        # Key of requests which can be evaluated together, or None
+        p = req.params
+        data = req.data
+        if (p.get('decimate') is not None or data.ndim != 1 or
+                np.ndim(p['ft']) != 1 or
+                p['fs'] > len(data) or p['width'] > len(data)):
+            return None
+        ft = tuple(p['ft'])
+        if req.op == 'goertzel_m':
+            if (np.iscomplexobj(data) or
+                    p['engine'] not in dsp.GOERTZEL_M_ENGINES):
+                return None
+            return ('goertzel_m', p['fs'], ft, p['width'], p['engine'])
+        if (p.get('gate') is not None or p.get('return_info') or
+                p['engine'] not in dsp.GOERTZEL_ST_M_ENGINES):
+            return None
+        return ('goertzel_st_m', p['fs'], ft, p['width'], p['engine'],
+                bool(p['padding']), len(data), data.dtype.str)
+
+    def _evaluate_m(self, reqs):
+        p = reqs[0].params
+        plan = self.plan(p['fs'], p['ft'], p['width'])
+        clips = [req.data for req in reqs]
+        data, offsets = dsp.pack_ragged(clips)
+        mag = dsp.goertzel_m_ragged(data, offsets, plan.fs, plan.ft,
+                                    plan.width, p['engine'])
+        return [(row, None) for row in mag]
+
+    def _evaluate_st_m(self, reqs):
+        p = reqs[0].params
+        plan = self.plan(p['fs'], p['ft'], p['width'])
+        rows = dsp._as_input(np.stack([req.data for req in reqs]))
+        engine = p['engine']
+        if engine == 'auto':
+            # Same choice as `goertzel_st_m` makes for each request
+            engine = dsp._select_st_m_engine(plan.ft.size,
+                                             rows.shape[-1]//plan.width)
+        basis = plan.basis if engine == 'gemm' else None
+        val, _ = dsp._goertzel_st_m_blocks(rows, plan.fs, plan.ft,
+                                           plan.width, p['padding'], -1,
+                                           engine, basis=basis)
+        return [(row, None) for row in val]
+
+    def _evaluate_single(self, reqs):
+        req = reqs[0]
+        p = dict(req.params)
+        return_info = p.pop('return_info', False)
+        func = getattr(dsp, req.op)
+        if req.op == 'goertzel_st_m':
+            p['return_info'] = return_info
+        val = func(req.data, **p)
+        if return_info:
+            return [val]
+        return [(val, None)]
+
+
+def _close_segments(segments):
+    for shm in segments.values():
+        try:
+            shm.close()
+        except BufferError:
+            # Still exported by a pending request, it's unmapped on exit
+            pass
+    segments.clear()
+
+
+def serve(socket_path=None, max_batch=64, batch_window=0.0):
+    """ Run a daemon in foreground, see also `GoertzelServer`. """
+    server = GoertzelServer(socket_path, max_batch, batch_window)
+
+    def _terminate(signum, frame):
+        raise SystemExit(0)
+    # Shut down cleanly (i.e. remove the socket) when terminated
+    signal.signal(signal.SIGTERM, _terminate)
+    server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Local evaluation daemon of gofft.')
+    parser.add_argument('--socket', dest='socket_path', default=None,
+                        help='Path of Unix domain socket, default: '
+                             '$GOFFT_SERVE_SOCKET or {0}'.format(
+                                 default_socket_path()))
+    parser.add_argument('--max_batch', type=int, default=64,
+                        help='Maximal number of requests in a batch.')
+    parser.add_argument('--batch_window', type=float, default=0.0,
+                        help='Time (in seconds) to wait for more requests '
+                             'before evaluating a batch.')
+    args = parser.parse_args(argv)
+    serve(args.socket_path, args.max_batch, args.batch_window)
@@ -0,0 +1,147 @@
+from __future__ import absolute_import, division
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import numpy as np
+
+from gofft.alg import goertzel_m, goertzel_st_m
+from gofft.serve import GoertzelServer, GoertzelClient
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+__all__ = ['TestServe']
+
+
+@unittest.skipIf(shared_memory is None or not hasattr(socket, 'AF_UNIX'),
+                 'Shared memory or Unix domain socket is not available.')
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.server = GoertzelServer(os.path.join(self.tmp_dir, 'gofft.sock'))
+        self.server.start()
+        self.client = GoertzelClient(self.server.socket_path)
+        self.fs = 1000
+        self.ft = np.arange(10, 490, 7, dtype=float)
+        self.data = np.random.RandomState(0).randn(3210)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cmp_with_gom(self):
+        for engine in ['loop', 'tiled']:
+            expected = goertzel_m(self.data, self.fs, self.ft, 1000, engine)
+            result = self.client.goertzel_m(self.data, self.fs, self.ft, 1000,
+                                            engine)
+            np.testing.assert_allclose(result, expected)
+
+        # Requests which are not batched: N-D data, decimation
+        data = self.data[:3000].reshape(3, 1000)
+        expected = goertzel_m(data, self.fs, self.ft, 1000, axis=-1)
+        result = self.client.goertzel_m(data, self.fs, self.ft, 1000)
+        np.testing.assert_allclose(result, expected)
+        expected = goertzel_m(self.data, self.fs, [100.0], 1000, decimate=2)
+        result = self.client.goertzel_m(self.data, self.fs, [100.0], 1000,
+                                        decimate=2)
+        np.testing.assert_allclose(result, expected)
+
+    def test_cmp_with_gostm(self):
+        for engine in ['auto', 'loop', 'gemm']:
+            for padding in [False, True]:
+                expected = goertzel_st_m(self.data, self.fs, self.ft, 200,
+                                         padding, engine=engine)
+                result = self.client.goertzel_st_m(self.data, self.fs,
+                                                   self.ft, 200, padding,
+                                                   engine=engine)
+                np.testing.assert_allclose(result, expected)
+
+        iq = self.data[:3000] + 1j*self.data[210:]
+        expected, info = goertzel_st_m(iq, self.fs, self.ft, 200, gate=0.5,
+                                       return_info=True)
+        result = self.client.goertzel_st_m(iq, self.fs, self.ft, 200,
+                                           gate=0.5, return_info=True)
+        np.testing.assert_allclose(result[0], expected)
+        self.assertEqual(result[1], info)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self.client.goertzel_m(self.data[:100], self.fs, self.ft, 100)
+        with self.assertRaises(ValueError):
+            self.client.goertzel_st_m(self.data, self.fs, self.ft, 200,
+                                      engine='fft')
+        with self.assertRaises(ValueError):
+            self.client.goertzel_m(self.data, self.fs, 100.0, 1000)
+        # Connection is still usable after errors
+        self.assertTrue(self.client.ping())
+
+    def test_malformed_requests(self):
+        self.client.goertzel_m(self.data, self.fs, self.ft, 1000)
+        shm_name = self.client._shm.name
+        params = {'fs': self.fs, 'ft': self.ft.tolist(), 'width': 1000,
+                  'engine': 'loop', 'decimate': None, 'axis': -1}
+        msg = {'op': 'goertzel_m', 'params': params, 'shm': shm_name,
+               'shape': [len(self.data)], 'dtype': '<f8'}
+        with self.assertRaises(TypeError):
+            # Larger than the segment
+            self.client._request(dict(msg, shape=[10**9]))
+        with self.assertRaises(TypeError):
+            self.client._request(dict(msg, dtype='foo'))
+        with self.assertRaises(KeyError):
+            self.client._request(dict(msg, params={'width': 1000}))
+        # Connection is still usable after errors
+        self.assertTrue(self.client.ping())
+        np.testing.assert_allclose(
+            self.client.goertzel_m(self.data, self.fs, self.ft, 1000),
+            goertzel_m(self.data, self.fs, self.ft, 1000))
+
+    def test_growing_buffer(self):
+        for n in [1000, 100000, 2000, 300000]:
+            data = np.random.RandomState(n).randn(n)
+            expected = goertzel_m(data, self.fs, self.ft, 1000)
+            result = self.client.goertzel_m(data, self.fs, self.ft, 1000)
+            np.testing.assert_allclose(result, expected)
+
+    def test_concurrent_clients(self):
+        n_clients = 8
+        rng = np.random.RandomState(1)
+        clips = [rng.randn(rng.randint(1000, 5000)) for _ in range(n_clients)]
+        results = [None]*n_clients
+        barrier = threading.Barrier(n_clients)
+
+        def run(i):
+            with GoertzelClient(self.server.socket_path) as client:
+                barrier.wait()
+                for _ in range(20):
+                    results[i] = (
+                        client.goertzel_m(clips[i], self.fs, self.ft, 1000),
+                        client.goertzel_st_m(clips[i][:2000], self.fs,
+                                             self.ft, 250))
+
+        threads = [threading.Thread(target=run, args=(i,))
+                   for i in range(n_clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        for clip, (mag, st_mag) in zip(clips, results):
+            np.testing.assert_allclose(
+                mag, goertzel_m(clip, self.fs, self.ft, 1000))
+            np.testing.assert_allclose(
+                st_mag, goertzel_st_m(clip[:2000], self.fs, self.ft, 250))
+        stats = self.client.stats()
+        self.assertEqual(stats['requests'], n_clients*20*2)
+        self.assertLessEqual(stats['batches'], stats['requests'])
+        self.assertEqual(stats['plans'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 from argparse import ArgumentParser
+import os
+import sys
 import traceback as tb
 
 
@@ -9,6 +11,54 @@ def parse_args():
                         help='If this flag is true, benchmark will be skipped.')
     parser.add_argument('--skip_plot', action='store_true', default=False, 
                         help=('If this flag is true, no log will be plotted.'))
+    parser.add_argument('--report', action='store_true', default=False,
+                        help=('Render figures (SVG/PNG) and an HTML summary into '
+                              '`bench_log/report` without a display.'))
+    parser.add_argument('--roofline', action='store_true', default=False,
+                        help=('Measure peak FLOP/s and memory bandwidth of this '
+                              'machine, and compare throughput of cases with '
+                              'them (roofline model).'))
+    parser.add_argument('--accuracy', action='store_true', default=False,
+                        help=('Cross-check errors of all engines against an '
+                              'extended-precision reference next to their '
+                              'timing, results are written into '
+                              '`bench_log/accuracy.csv`. Exit with nonzero '
+                              'code if any error budget is exceeded.'))
+    parser.add_argument('--isolate', action='store_true', default=False,
+                        help=('Run each case in a fresh subprocess pinned to a '
+                              'CPU.'))
+    parser.add_argument('--jobs', type=int, default=1,
+                        help=('Number of isolated cases to be ran in parallel, '
+                              'each on its own CPU. (implies `--isolate` if '
+                              'it\'s larger than 1)'))
+    parser.add_argument('--profile_memory', action='store_true', default=False,
+                        help=('Profile peak memory usage (tracemalloc and RSS) '
+                              'of each step, and plot it next to time.'))
+    parser.add_argument('--log_format', choices=['csv', 'npy'], default='csv',
+                        help=('Format of logs, `npy` is a binary format which is '
+                              'faster to be written and plotted. (default: csv)'))
+    parser.add_argument('--store', default=os.path.join('bench_log', 'results.jsonl'),
+                        help=('Path of the store of results (JSON-lines), results '
+                              'are appended to it after benchmark.'))
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help=('Compare results with a baseline run, which is a '
+                              'commit (prefix) in the store or a JSON-lines file '
+                              'of results. Exit with nonzero code if there is any '
+                              'significant slowdown.'))
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help=('Minimal relative slowdown to be reported by '
+                              '`--compare`. (default: 0.05)'))
+    parser.add_argument('-k', '--case', action='append', default=None,
+                        dest='cases', metavar='PATTERN',
+                        help=('Only run cases whose `<class>.<function>` '
+                              'contains PATTERN (or matches it if it contains '
+                              'wildcards), e.g. `-k goertzel_st_m`. Can be '
+                              'given multiple times.'))
+    parser.add_argument('--class', action='append', default=None,
+                        dest='classes', metavar='NAME',
+                        help=('Only run cases of class NAME (wildcards are '
+                              'allowed), e.g. `--class BenchSpectrogram`. Can '
+                              'be given multiple times.'))
 
     try:
         args = parser.parse_args()
@@ -17,30 +67,239 @@ def parse_args():
     return args
 
 
-def run_bench():
-    from gofft.bench import BenchmarkLoader, BenchmarkRunner
-    loader = BenchmarkLoader()
-    suite = loader.discover('gofft')
-    BenchmarkRunner().run_benchmark_suite(suite)
+def run_bench(store_path, isolate=False, jobs=1, profile_memory=False,
+              log_format='csv', cases=None, classes=None):
+    from gofft.bench import (BenchmarkLoader, BenchmarkRunner, ResultStore,
+                             LOG_WRITERS)
+    # Only files containing selected cases are imported, files are scanned
+    # for cases once and cached until they are modified.
+    loader = BenchmarkLoader(os.path.join('bench_log', 'discovery.json'))
+    suite = loader.discover('gofft', cases=cases, classes=classes)
+    runner = BenchmarkRunner(log_writer_class=LOG_WRITERS[log_format],
+                             store=ResultStore(store_path),
+                             isolate=isolate or jobs > 1, jobs=jobs,
+                             profile_memory=profile_memory)
+    runner.run_benchmark_suite(suite)
+    return runner.records
 
 
-def plot_log():
+def run_import_bench():
+    import sys
+    import numpy as np
+    from gofft.bench import measure_import_time
+
+    msg = 'Import time of {0:<12}: median {1:8.2f} ms, min {2:8.2f} ms\n'
+    for mod in ['numpy', 'gofft', 'gofft.alg']:
+        elapsed = measure_import_time(mod, repeat=5)*1e3
+        sys.stderr.write(msg.format(mod, np.median(elapsed), np.min(elapsed)))
+
+
+def plot_log(profile_memory=False, classes=None, log_dir='bench_log'):
+    from fnmatch import fnmatch
     from gofft.plotter import LogPlotter
-    plotter = LogPlotter('bench_log', 'BenchDSP_*.csv')
-    plotter.plot(scatter_plot=True)
+
+    files = os.listdir(log_dir) if os.path.isdir(log_dir) else []
+
+    def should_plot(class_name):
+        # Classes deselected by `--class`, or without any log (e.g. all of
+        # their cases are deselected by `-k`), are skipped
+        if classes is not None and not any(fnmatch(class_name, p)
+                                           for p in classes):
+            return False
+        return any(fnmatch(f, class_name + '_*') for f in files)
+
+    if should_plot('BenchDSP'):
+        plotter = LogPlotter(log_dir, 'BenchDSP_*')
+        metrics = ['time']
+        if profile_memory:
+            metrics.extend(['tracemalloc_peak', 'rss_peak'])
+        plotter.plot(scatter_plot=True, metrics=metrics)
+
+    # Latency of streaming cases (x-axis: chunk size)
+    if should_plot('BenchGoertzelStream'):
+        plotter = LogPlotter(log_dir, 'BenchGoertzelStream_*')
+        plotter.plot(metrics=['p50', 'p99', 'p999'])
+
+    # Scaling curves of parametrized cases
+    from gofft.plotter import GridPlotter
+    tidy_file = os.path.join(log_dir, 'tidy', 'BenchDSPGrid.csv')
+    if should_plot('BenchDSPGrid') and os.path.exists(tidy_file):
+        GridPlotter(tidy_file).plot(x='n_targets', col='func')
+
+    # Decimation against number of target frequencies (a line per function)
+    tidy_file = os.path.join(log_dir, 'tidy', 'BenchDecimate.csv')
+    if should_plot('BenchDecimate') and os.path.exists(tidy_file):
+        GridPlotter(tidy_file).plot(x='n_targets', col=None)
+
+
+def write_report():
+    from gofft.plotter import ReportGenerator
+    index, rendered = ReportGenerator('bench_log').generate()
+    sys.stdout.write('Report: {} ({} figure(s) updated)\n'.format(
+        index, len(rendered)))
+
+
+def print_roofline(log_dir='bench_log'):
+    """
+    Print achieved throughput (at the largest data length) of cases which
+    have an op-count model, relative to the roofline of this machine.
+    """
+    import numpy as np
+    from gofft.bench import LogReader, measure_peaks, roofline
+
+    throughput_dir = os.path.join(log_dir, 'throughput')
+    if not os.path.exists(throughput_dir):
+        raise IOError('No such directory: {}'.format(throughput_dir))
+    peaks = measure_peaks()
+    sys.stdout.write('Peak: {0:.2f} GFLOP/s (GEMM), {1:.2f} GB/s (copy)\n'.format(
+        peaks['flops']*1e-9, peaks['bandwidth']*1e-9))
+
+    reader = LogReader()
+    header = '{0:<48} {1:>10} {2:>9} {3:>9} {4:>9} {5:>8}  {6}\n'
+    row = '{0:<48} {1:>10.3e} {2:>9.3f} {3:>9.3f} {4:>9.3f} {5:>7.1%}  {6}\n'
+    sys.stdout.write(header.format('case', 'samples/s', 'GFLOP/s', 'GB/s',
+                                   'FLOP/byte', 'of roof', 'bound'))
+    for fn in sorted(os.listdir(throughput_dir)):
+        if os.path.splitext(fn)[1] not in reader.extensions:
+            continue
+        columns = reader.read_columns(os.path.join(throughput_dir, fn))
+        flops, bandwidth = columns['flops'][-1], columns['bandwidth'][-1]
+        if np.isnan(flops) or np.isnan(bandwidth):
+            continue
+        res = roofline(flops, bandwidth, peaks)
+        sys.stdout.write(row.format(os.path.splitext(fn)[0],
+                                    columns['samples_per_s'][-1], flops*1e-9,
+                                    bandwidth*1e-9, res['intensity'],
+                                    res['efficiency'], res['bound']))
+
+
+def run_accuracy_check(log_dir='bench_log'):
+    """
+    Returns
+    -------
+    n_failures : int
+        Number of evaluations exceeding error budgets.
+    """
+    import numpy as np
+    from gofft.bench import cross_check, budget_failures, write_accuracy_csv
+
+    records = cross_check()
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+    path = os.path.join(log_dir, 'accuracy.csv')
+    write_accuracy_csv(records, path)
+
+    # Worst error and median throughput of each engine
+    header = '{0:<22} {1:>10} {2:>10} {3:>12}  {4}\n'
+    row = '{0:<22} {1:>10.2e} {2:>10.0e} {3:>12.3e}  {4}\n'
+    sys.stdout.write(header.format('engine', 'max error', 'budget',
+                                   'samples/s', ''))
+    engines = []
+    for r in records:
+        if r['engine'] not in engines:
+            engines.append(r['engine'])
+    for name in engines:
+        rs = [r for r in records if r['engine'] == name]
+        n_failed = sum(1 for r in rs if not r['passed'])
+        sys.stdout.write(row.format(
+            name, max(r['max_error'] for r in rs), rs[0]['budget'],
+            np.median([r['samples_per_s'] for r in rs]),
+            'FAILED ({0}/{1})'.format(n_failed, len(rs)) if n_failed else ''))
+
+    failures = budget_failures(records)
+    msg = '{0} of {1} evaluation(s) exceeded error budgets, see {2}\n'
+    sys.stdout.write(msg.format(len(failures), len(records), path))
+    return len(failures)
+
+
+def compare_with_baseline(baseline, store_path, current=None, threshold=0.05):
+    """
+    Returns
+    -------
+    n_slowdowns : int
+        Number of significant slowdowns.
+    """
+    from gofft.bench import (ResultStore, compare_results, host_fingerprint,
+                             resolve_commit)
+
+    store = ResultStore(store_path)
+    if current is None:
+        # Compare the latest run in store if benchmark is skipped
+        runs = store.runs()
+        if len(runs) == 0:
+            raise ValueError('No result in store: {}'.format(store_path))
+        current = store.find_run(commit=runs[-1][1], host=runs[-1][2])
+    if len(current) == 0:
+        raise ValueError('No result of current run.')
+
+    # The current run (already appended to the store) and runs with
+    # uncommitted changes are never taken as baseline
+    exclude = set(r['timestamp'] for r in current)
+    if os.path.isfile(baseline):
+        base_store = ResultStore(baseline)
+        base_records = base_store.find_run(host=current[0]['host'],
+                                           exclude=exclude)
+        if len(base_records) == 0:
+            base_records = base_store.find_run(exclude=exclude)
+    else:
+        # Refs (e.g. `main`, `HEAD~1`) are resolved by git, a prefix which
+        # can't be resolved (e.g. a commit not in this clone) is used as is
+        commit = resolve_commit(baseline) or baseline
+        base_records = store.find_run(commit=commit, host=host_fingerprint(),
+                                      exclude=exclude, include_dirty=False)
+    if len(base_records) == 0:
+        raise ValueError('No result of baseline: {}'.format(baseline))
+
+    report = compare_results(base_records, current, threshold=threshold)
+    msg = '{0:<40} {1:>10} {2:>12.4e} {3:>12.4e} {4:>7.3f} {5}\n'
+    sys.stdout.write('Baseline: {} ({})\n'.format(base_records[0]['commit'],
+                                                  base_records[0]['host']))
+    sys.stdout.write('{0:<40} {1:>10} {2:>12} {3:>12} {4:>7}\n'.format(
+        'case', 'length', 'baseline', 'current', 'ratio'))
+    for r in report:
+        flag = 'SLOWDOWN' if r['slowdown'] else ''
+        sys.stdout.write(msg.format(r['case'], r['length'], r['baseline'],
+                                    r['current'], r['ratio'], flag))
+
+    n_slowdowns = sum(1 for r in report if r['slowdown'])
+    sys.stdout.write('{} significant slowdown(s) in {} comparison(s).\n'.format(
+        n_slowdowns, len(report)))
+    return n_slowdowns
 
 
 def main():
     args = parse_args()
+    records = None
     if not args.skip_bench:
-        run_bench()
+        run_import_bench()
+        records = run_bench(args.store, isolate=args.isolate, jobs=args.jobs,
+                            profile_memory=args.profile_memory,
+                            log_format=args.log_format, cases=args.cases,
+                            classes=args.classes)
     if not args.skip_plot:
-        plot_log()
+        plot_log(profile_memory=args.profile_memory, classes=args.classes)
+    if args.report:
+        write_report()
+    if args.roofline:
+        print_roofline()
+    code = 0
+    if args.accuracy:
+        if run_accuracy_check() > 0:
+            code = 1
+    if args.compare is not None:
+        n_slowdowns = compare_with_baseline(args.compare, args.store,
+                                            current=records,
+                                            threshold=args.threshold)
+        if n_slowdowns > 0:
+            code = 1
+    return code
 
 
 if __name__ == '__main__':
     try:
-        main()
+        code = main()
     except Exception as ex:
         print(ex)
         tb.print_exc()
+        code = 1
+    sys.exit(code)